@@ -4,6 +4,11 @@ from flask_jwt_extended import JWTManager
 from flask_socketio import SocketIO
 from config import Config
 from models import db, bcrypt
+from services.question_bank import question_bank
+from services.job_queue import job_queue
+from services.metrics import instrument_engine
+import services.personalized_setup  # registers the personalized_setup job handler
+import services.evaluation_jobs  # registers the session_evaluation and overall_assessment job handlers
 import os
 
 # Import blueprints
@@ -20,8 +25,10 @@ from routes.upload_routes import upload_bp
 from routes.websocket_routes import init_socketio_events
 
 # Initialize SocketIO — allow specific origins later
+# message_queue fans emit(..., room=...) out to clients connected to any worker
 socketio = SocketIO(
     async_mode="threading",
+    message_queue=Config.SOCKETIO_MESSAGE_QUEUE,
     logger=True,
     engineio_logger=True
 )
@@ -84,6 +91,23 @@ def create_app():
         print("[DEBUG] Finished db.create_all()!")
         print("[INFO] Database tables created")
 
+        # SQL statement counts for /api/metrics
+        instrument_engine(db.engine)
+
+        # Build the read-only question bank index once per worker
+        try:
+            question_bank.load()
+        except Exception as e:
+            print(f"[WARN] Question bank index not loaded: {str(e)}")
+
+    # Background jobs: progress goes out over Socket.IO; pick up jobs left by a restart
+    job_queue.init_app(app, socketio)
+    if Config.JOB_RESUME_ON_STARTUP:
+        try:
+            job_queue.resume_pending()
+        except Exception as e:
+            print(f"[WARN] Background jobs not resumed: {str(e)}")
+
     print("[INFO] TrueMirror backend started")
     return app
 
@@ -0,0 +1,387 @@
+"""
+Benchmark: concurrent Socket.IO interview load.
+
+Simulates N candidates running the whole interview flow against the real
+HTTP routes and Socket.IO handlers (routes/websocket_routes.py):
+register + login → /api/interview/setup → join_session → send_message × T →
+evaluate_session → end_session.
+
+By default the backend and a fake LLM (devtools/fake_openai.py) are started
+in-process on a throwaway SQLite database, so runs are reproducible offline.
+With --target the harness drives an already running backend instead (start
+it with AZURE_OPENAI_BASE_URL pointing at the fake server for offline runs).
+
+Reports p50/p95/p99 time to first `ai_chunk`, full-turn latency, evaluation
+latency (first `evaluation_chunk` and total), messages/sec, worker RSS and SQL statement counts (both read from
+/api/metrics), and can save everything as JSON so runs can be diffed.
+
+Usage (from backend/):
+    python benchmarks/interview_load.py --candidates 20 --turns 5
+    python benchmarks/interview_load.py --candidates 50 --llm-ttft-ms 600 --json runs/baseline.json
+    python benchmarks/interview_load.py --target http://127.0.0.1:5000 --candidates 10
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'devtools'))
+
+import requests
+import socketio
+
+from fake_openai import FakeConfig, FakeOpenAIServer
+
+ANSWERS = [
+    "Em có 3 năm kinh nghiệm làm backend với Python và Flask, chủ yếu xây dựng API cho hệ thống thương mại điện tử.",
+    "Trong dự án gần nhất, em tối ưu truy vấn PostgreSQL bằng cách thêm index và cache Redis, giảm 60% độ trễ.",
+    "Khi có bất đồng trong nhóm, em thường đề xuất làm một bản thử nghiệm nhỏ để cả nhóm có số liệu cụ thể.",
+    "Em muốn phát triển lên vai trò tech lead trong 2-3 năm tới và đóng góp nhiều hơn vào thiết kế hệ thống.",
+    "Em đã từng xử lý sự cố production lúc nửa đêm, việc đầu tiên là khoanh vùng ảnh hưởng và rollback an toàn."
+]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0-100) of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(q / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def distribution(values):
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 4),
+        'p95': round(percentile(values, 95), 4),
+        'p99': round(percentile(values, 99), 4),
+        'mean': round(statistics.mean(values), 4),
+        'max': round(max(values), 4)
+    }
+
+
+def scrape_metrics(base_url):
+    """Selected samples from /api/metrics: SQL statements by type and worker RSS."""
+    text = requests.get(f"{base_url}/api/metrics", timeout=10).text
+    queries = {}
+    rss = None
+    for line in text.splitlines():
+        if line.startswith('truemirror_db_queries_total{'):
+            labels, value = line.rsplit(' ', 1)
+            statement = labels.split('statement="', 1)[1].split('"', 1)[0]
+            queries[statement] = float(value)
+        elif line.startswith('truemirror_process_resident_memory_bytes '):
+            rss = float(line.rsplit(' ', 1)[1])
+    return {'db_queries': queries, 'rss_bytes': rss}
+
+
+class Candidate:
+    """One simulated candidate with its own HTTP session and Socket.IO connection."""
+
+    def __init__(self, index, base_url, run_id, args):
+        self.index = index
+        self.base_url = base_url
+        self.args = args
+        self.email = f"load-{run_id}-{index}@bench.truemirror.local"
+        self.http = requests.Session()
+        self.sio = socketio.Client(reconnection=False)
+        self.token = None
+        self.session_id = None
+        self.result = {'candidate': index, 'turns': [], 'errors': []}
+
+        self._events = {name: threading.Event() for name in ('joined', 'complete', 'evaluated', 'ended')}
+        self._first_chunk_at = None
+        self._error = None
+
+        self.sio.on('joined_session', lambda data: self._events['joined'].set())
+        self.sio.on('ai_chunk', self._on_chunk)
+        self.sio.on('evaluation_chunk', self._on_chunk)
+        self.sio.on('ai_complete', lambda data: self._events['complete'].set())
+        self.sio.on('session_evaluated', lambda data: self._events['evaluated'].set())
+        self.sio.on('session_ended', lambda data: self._events['ended'].set())
+        self.sio.on('ai_error', self._on_error)
+        self.sio.on('evaluation_error', self._on_error)
+        self.sio.on('error', self._on_error)
+
+    def _on_chunk(self, data):
+        if self._first_chunk_at is None:
+            self._first_chunk_at = time.monotonic()
+
+    def _on_error(self, data):
+        self._error = (data or {}).get('message', 'error')
+        for event in self._events.values():
+            event.set()
+
+    def _wait(self, name, what):
+        if not self._events[name].wait(self.args.timeout):
+            raise TimeoutError(f"timed out waiting for {what}")
+        self._events[name].clear()
+        if self._error:
+            error, self._error = self._error, None
+            raise RuntimeError(f"{what}: {error}")
+
+    def _timed(self, name, func):
+        started = time.monotonic()
+        func()
+        self.result[name] = round(time.monotonic() - started, 4)
+
+    def _register_and_login(self):
+        credentials = {'email': self.email, 'password': 'bench-password', 'full_name': f'Load Candidate {self.index}'}
+        response = self.http.post(f"{self.base_url}/api/auth/register", json=credentials, timeout=self.args.timeout)
+        if response.status_code not in (201, 409):
+            raise RuntimeError(f"register failed: {response.status_code} {response.text[:200]}")
+
+        response = self.http.post(f"{self.base_url}/api/auth/login", json=credentials, timeout=self.args.timeout)
+        response.raise_for_status()
+        self.token = response.json()['access_token']
+        self.http.headers['Authorization'] = f"Bearer {self.token}"
+
+    def _setup(self):
+        response = self.http.post(f"{self.base_url}/api/interview/setup", json={
+            'position': 'Junior',
+            'industry': 'IT',
+            'style': 'Thân thiện',
+            'language': 'vi'
+        }, timeout=self.args.timeout)
+        response.raise_for_status()
+        self.session_id = response.json()['session']['id']
+
+    def _join(self):
+        self.sio.connect(self.base_url, transports=self.args.transports, wait_timeout=self.args.timeout)
+        self.sio.emit('join_session', {'session_id': self.session_id, 'token': self.token})
+        self._wait('joined', 'join_session')
+
+    def _turn(self, number):
+        self._first_chunk_at = None
+        started = time.monotonic()
+        self.sio.emit('send_message', {
+            'session_id': self.session_id,
+            'message': ANSWERS[number % len(ANSWERS)],
+            'token': self.token
+        })
+        self._wait('complete', f'turn {number + 1}')
+        finished = time.monotonic()
+        self.result['turns'].append({
+            'ttft': round(self._first_chunk_at - started, 4) if self._first_chunk_at else None,
+            'latency': round(finished - started, 4)
+        })
+
+    def _evaluate(self):
+        self._first_chunk_at = None
+        started = time.monotonic()
+        self.sio.emit('evaluate_session', {'session_id': self.session_id, 'token': self.token})
+        self._wait('evaluated', 'evaluate_session')
+        if self._first_chunk_at:
+            self.result['evaluate_ttft_seconds'] = round(self._first_chunk_at - started, 4)
+
+    def _end(self):
+        self.sio.emit('end_session', {'session_id': self.session_id, 'token': self.token})
+        self._wait('ended', 'end_session')
+
+    def run(self):
+        try:
+            self._timed('login_seconds', self._register_and_login)
+            self._timed('setup_seconds', self._setup)
+            self._timed('join_seconds', self._join)
+            for number in range(self.args.turns):
+                self._turn(number)
+            if not self.args.skip_evaluate:
+                self._timed('evaluate_seconds', self._evaluate)
+            self._timed('end_seconds', self._end)
+        except Exception as e:
+            self.result['errors'].append(str(e))
+        finally:
+            with contextlib.suppress(Exception):
+                self.sio.disconnect()
+        return self.result
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_in_process(args):
+    """Start the fake LLM and the backend (threading Socket.IO server) in this process."""
+    fake = FakeOpenAIServer(config=FakeConfig(
+        ttft_ms=args.llm_ttft_ms,
+        token_delay_ms=args.llm_token_delay_ms,
+        reply_tokens=args.llm_reply_tokens,
+        error_rate=args.llm_error_rate,
+        rate_limit_rate=args.llm_rate_limit_rate,
+        tokens_per_chunk=args.llm_tokens_per_chunk,
+        seed=args.seed
+    )).start()
+
+    os.environ['AZURE_OPENAI_KEY'] = 'fake'
+    os.environ['AZURE_OPENAI_BASE_URL'] = fake.base_url
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='truemirror-bench-'), 'bench.db')}")
+    os.environ.setdefault('JOB_RESUME_ON_STARTUP', 'false')
+
+    from app import app, socketio as server
+
+    port = free_port()
+    threading.Thread(
+        target=server.run,
+        kwargs={'app': app, 'host': '127.0.0.1', 'port': port, 'allow_unsafe_werkzeug': True, 'log_output': False},
+        name='bench-backend',
+        daemon=True
+    ).start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with contextlib.suppress(requests.ConnectionError):
+            if requests.get(f"{base_url}/api/health", timeout=2).ok:
+                return base_url, fake
+        time.sleep(0.1)
+    raise RuntimeError("backend did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent Socket.IO interview load benchmark')
+    parser.add_argument('--candidates', type=int, default=10, help='Concurrent simulated candidates')
+    parser.add_argument('--turns', type=int, default=3, help='send_message turns per candidate')
+    parser.add_argument('--ramp-seconds', type=float, default=1.0, help='Spread candidate start times over this window')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Per-step timeout in seconds')
+    parser.add_argument('--skip-evaluate', action='store_true', help='Do not run evaluate_session')
+    parser.add_argument('--transports', nargs='+', default=['polling'], choices=('polling', 'websocket'))
+    parser.add_argument('--target', help='Base URL of a running backend (default: start one in-process)')
+    parser.add_argument('--llm-ttft-ms', type=float, default=300.0)
+    parser.add_argument('--llm-token-delay-ms', type=float, default=10.0)
+    parser.add_argument('--llm-reply-tokens', type=int, default=80)
+    parser.add_argument('--llm-tokens-per-chunk', type=int, default=1)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--llm-rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help='Keep backend logs (in-process mode)')
+    parser.add_argument('--json', dest='json_path', help='Write summary and per-candidate results to this file')
+    args = parser.parse_args()
+
+    console = sys.stdout
+    fake = None
+    quiet = contextlib.ExitStack()
+    if not args.target and not args.verbose:
+        # Backend handlers log every event with print(); keep the report readable
+        devnull = open(os.devnull, 'w')
+        quiet.enter_context(contextlib.redirect_stdout(devnull))
+        quiet.enter_context(contextlib.redirect_stderr(devnull))
+
+    with quiet:
+        if args.target:
+            base_url = args.target.rstrip('/')
+        else:
+            base_url, fake = start_in_process(args)
+        print(f"[INFO] {args.candidates} candidates × {args.turns} turns against {base_url}"
+              + (" (in-process backend + fake LLM)" if fake else ''), file=console)
+
+        metrics_before = scrape_metrics(base_url)
+        peak_rss = [metrics_before['rss_bytes'] or 0]
+        sampling = threading.Event()
+
+        def sample_rss():
+            while not sampling.wait(1.0):
+                with contextlib.suppress(Exception):
+                    peak_rss.append(scrape_metrics(base_url)['rss_bytes'] or 0)
+
+        threading.Thread(target=sample_rss, daemon=True).start()
+
+        run_id = uuid.uuid4().hex[:8]
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.candidates) as pool:
+            futures = []
+            for index in range(args.candidates):
+                candidate = Candidate(index, base_url, run_id, args)
+                futures.append(pool.submit(candidate.run))
+                if args.candidates > 1:
+                    time.sleep(args.ramp_seconds / args.candidates)
+            results = [future.result() for future in futures]
+        elapsed = time.monotonic() - started
+
+        sampling.set()
+        metrics_after = scrape_metrics(base_url)
+        llm_stats = fake.stats_snapshot() if fake else None
+        if fake:
+            fake.stop()
+
+    turns = [turn for result in results for turn in result['turns']]
+    db_delta = {
+        statement: int(count - metrics_before['db_queries'].get(statement, 0))
+        for statement, count in metrics_after['db_queries'].items()
+    }
+    total_queries = sum(db_delta.values())
+    summary = {
+        'candidates': args.candidates,
+        'turns_per_candidate': args.turns,
+        'completed_candidates': sum(1 for result in results if not result['errors']),
+        'failed_candidates': sum(1 for result in results if result['errors']),
+        'elapsed_seconds': round(elapsed, 3),
+        'messages_per_second': round(len(turns) / elapsed, 3) if elapsed else None,
+        'ttft_seconds': distribution([turn['ttft'] for turn in turns if turn['ttft'] is not None]),
+        'turn_latency_seconds': distribution([turn['latency'] for turn in turns]),
+        'login_seconds': distribution([r['login_seconds'] for r in results if 'login_seconds' in r]),
+        'setup_seconds': distribution([r['setup_seconds'] for r in results if 'setup_seconds' in r]),
+        'evaluate_ttft_seconds': distribution([r['evaluate_ttft_seconds'] for r in results if 'evaluate_ttft_seconds' in r]),
+        'evaluate_seconds': distribution([r['evaluate_seconds'] for r in results if 'evaluate_seconds' in r]),
+        'db_queries': db_delta,
+        'db_queries_total': total_queries,
+        'db_queries_per_turn': round(total_queries / len(turns), 2) if turns else None,
+        'rss_bytes_before': metrics_before['rss_bytes'],
+        'rss_bytes_after': metrics_after['rss_bytes'],
+        'rss_bytes_peak': max(peak_rss + [metrics_after['rss_bytes'] or 0]),
+        'rss_includes_load_generator': fake is not None,
+        'fake_llm': llm_stats
+    }
+
+    def row(label, dist):
+        if not dist.get('count'):
+            return f"{label:<22}{'-':>9}"
+        return f"{label:<22}{dist['p50']:>9}{dist['p95']:>9}{dist['p99']:>9}{dist['max']:>9}{dist['count']:>7}"
+
+    print("\n" + "=" * 72)
+    print(f"{'':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'n':>7}")
+    print(row('time to first chunk', summary['ttft_seconds']))
+    print(row('turn latency', summary['turn_latency_seconds']))
+    print(row('login', summary['login_seconds']))
+    print(row('setup', summary['setup_seconds']))
+    print(row('evaluation first chunk', summary['evaluate_ttft_seconds']))
+    print(row('evaluate', summary['evaluate_seconds']))
+    print("-" * 72)
+    print(f"messages/sec: {summary['messages_per_second']}   elapsed: {summary['elapsed_seconds']}s   "
+          f"failed candidates: {summary['failed_candidates']}/{args.candidates}")
+    print(f"SQL statements: {total_queries} ({summary['db_queries_per_turn']}/turn) {db_delta}")
+    if summary['rss_bytes_after']:
+        print(f"RSS: {summary['rss_bytes_before'] / 2**20:.1f} → {summary['rss_bytes_after'] / 2**20:.1f} MiB "
+              f"(peak {summary['rss_bytes_peak'] / 2**20:.1f} MiB"
+              + (", includes load generator)" if fake else ")"))
+    print("=" * 72)
+
+    for result in results:
+        if result['errors']:
+            print(f"[WARN] candidate {result['candidate']}: {result['errors'][0]}")
+
+    if args.json_path:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json_path)), exist_ok=True)
+        with open(args.json_path, 'w', encoding='utf-8') as handle:
+            json.dump({'args': vars(args), 'summary': summary, 'candidates': results}, handle,
+                      ensure_ascii=False, indent=2)
+        print(f"[INFO] Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark: two-step vs fused personalized setup pipeline.
+
+Runs the candidate-profile + question-generation step both ways against the
+configured Azure OpenAI deployment and compares end-to-end latency, token
+usage and LLM round trips. Memoization is bypassed (gpt_service is called
+directly); text extraction runs once up front and is not part of the timing.
+
+Usage (from backend/):
+    python benchmarks/personalized_pipeline.py cv.pdf jd.docx --runs 5
+    python benchmarks/personalized_pipeline.py --runs 3 --language en --json results.json
+
+Without files, a built-in sample CV + JD is used.
+"""
+
+import argparse
+import json
+import mimetypes
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import FileStorage
+from services.azure_gpt_service import gpt_service
+from services.file_processor import file_processor
+from services.metrics import llm_requests, llm_tokens
+from services.personalized_setup import extract_file_texts
+
+SAMPLE_TEXTS = [
+    """Nguyễn Văn An - Backend Developer
+5 năm kinh nghiệm phát triển hệ thống bằng Python (Django, Flask) và PostgreSQL.
+- 2021-nay: Senior Backend Engineer tại FinPay: thiết kế API thanh toán 2.000 req/s, Redis, Kafka, AWS.
+- 2019-2021: Backend Developer tại ShopNow: xây dựng dịch vụ đơn hàng, tối ưu truy vấn SQL giảm 60% latency.
+Kỹ năng: Python, Flask, Django, PostgreSQL, Redis, Kafka, Docker, Kubernetes, AWS, CI/CD.
+Học vấn: Kỹ sư CNTT, ĐH Bách Khoa Hà Nội.""",
+    """Job Description - Senior Python Engineer (Fintech)
+Responsibilities: design and operate high-throughput payment APIs, mentor junior engineers,
+own service reliability (SLOs, on-call), collaborate with product on roadmap.
+Requirements: 4+ years Python, relational databases, message queues, cloud infrastructure,
+experience with distributed systems and observability; fintech experience is a plus."""
+]
+
+MODES = ('two_step', 'fused')
+
+
+def load_file_texts(paths):
+    """Extract text from files exactly as the upload pipeline does."""
+    if not paths:
+        return SAMPLE_TEXTS
+
+    processed = []
+    for path in paths:
+        with open(path, 'rb') as handle:
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            upload = FileStorage(stream=handle, filename=os.path.basename(path), content_type=content_type)
+            processed.append(file_processor.process_file(upload))
+    return extract_file_texts(processed)
+
+
+def token_totals():
+    return {kind: llm_tokens.total(kind=kind) for kind in ('prompt', 'completion', 'cached')}
+
+
+def run_once(mode, file_texts, style, language):
+    """One end-to-end profile + questions run; returns a measurement dict."""
+    tokens_before = token_totals()
+    calls_before = llm_requests.total()
+    started = time.monotonic()
+    error = None
+    questions = []
+
+    try:
+        if mode == 'fused':
+            _, questions = gpt_service.analyze_and_generate_questions(file_texts, style, language)
+        else:
+            extracted_info = gpt_service.analyze_files_and_extract_info(file_texts, language)
+            questions = gpt_service.generate_personalized_questions(extracted_info, style, language)
+    except Exception as e:
+        error = str(e)
+
+    elapsed = time.monotonic() - started
+    tokens_after = token_totals()
+    return {
+        'mode': mode,
+        'seconds': round(elapsed, 3),
+        'llm_calls': int(llm_requests.total() - calls_before),
+        'prompt_tokens': int(tokens_after['prompt'] - tokens_before['prompt']),
+        'completion_tokens': int(tokens_after['completion'] - tokens_before['completion']),
+        'cached_tokens': int(tokens_after['cached'] - tokens_before['cached']),
+        'questions': len(questions),
+        'error': error
+    }
+
+
+def summarize(runs):
+    ok = [run for run in runs if not run['error']]
+    if not ok:
+        return {'runs': len(runs), 'failures': len(runs)}
+
+    seconds = [run['seconds'] for run in ok]
+    return {
+        'runs': len(runs),
+        'failures': len(runs) - len(ok),
+        'p50_seconds': round(statistics.median(seconds), 3),
+        'mean_seconds': round(statistics.mean(seconds), 3),
+        'min_seconds': round(min(seconds), 3),
+        'max_seconds': round(max(seconds), 3),
+        'mean_llm_calls': round(statistics.mean(run['llm_calls'] for run in ok), 2),
+        'mean_prompt_tokens': round(statistics.mean(run['prompt_tokens'] for run in ok)),
+        'mean_completion_tokens': round(statistics.mean(run['completion_tokens'] for run in ok)),
+        'mean_questions': round(statistics.mean(run['questions'] for run in ok), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two-step and fused personalized setup pipelines')
+    parser.add_argument('files', nargs='*', help='CV/JD files (PDF, DOCX, TXT, images); default: built-in sample')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per mode (modes are interleaved)')
+    parser.add_argument('--style', default='Nghiêm túc')
+    parser.add_argument('--language', default='vi', choices=('vi', 'en'))
+    parser.add_argument('--json', dest='json_path', help='Write raw runs and summary to this file')
+    args = parser.parse_args()
+
+    file_texts = load_file_texts(args.files)
+    print(f"[INFO] Benchmarking with {len(file_texts)} document(s), {args.runs} run(s) per mode, model={gpt_service.model}")
+
+    runs = {mode: [] for mode in MODES}
+    for index in range(args.runs):
+        # Alternate which mode goes first so drift in provider latency affects both equally
+        order = MODES if index % 2 == 0 else tuple(reversed(MODES))
+        for mode in order:
+            result = run_once(mode, file_texts, args.style, args.language)
+            runs[mode].append(result)
+            print(f"[INFO] run {index + 1} {mode}: {result['seconds']}s, {result['llm_calls']} call(s), "
+                  f"{result['prompt_tokens']}+{result['completion_tokens']} tokens"
+                  + (f", error: {result['error']}" if result['error'] else ''))
+
+    summary = {mode: summarize(runs[mode]) for mode in MODES}
+
+    print("\n" + "=" * 72)
+    print(f"{'mode':<10}{'p50 s':>8}{'mean s':>8}{'calls':>7}{'prompt tok':>12}{'compl tok':>11}{'qs':>5}{'fail':>6}")
+    for mode in MODES:
+        row = summary[mode]
+        if 'p50_seconds' not in row:
+            print(f"{mode:<10}{'all runs failed':>40}")
+            continue
+        print(f"{mode:<10}{row['p50_seconds']:>8}{row['mean_seconds']:>8}{row['mean_llm_calls']:>7}"
+              f"{row['mean_prompt_tokens']:>12}{row['mean_completion_tokens']:>11}{row['mean_questions']:>5}"
+              f"{row['failures']:>6}")
+    print("=" * 72)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as handle:
+            json.dump({'summary': summary, 'runs': runs}, handle, ensure_ascii=False, indent=2)
+        print(f"[INFO] Results written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
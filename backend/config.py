@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -30,4 +31,89 @@ class Config:
     # Azure OpenAI config
     AZURE_OPENAI_KEY = os.getenv('AZURE_OPENAI_KEY', '')
     AZURE_OPENAI_ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT', '')
-    AZURE_OPENAI_DEPLOYMENT = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-5-mini')
\ No newline at end of file
+    AZURE_OPENAI_DEPLOYMENT = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-5-mini')
+
+    # In-memory session caches (per worker)
+    CONVERSATION_CACHE_MAX_BYTES = int(os.getenv('CONVERSATION_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    SESSION_STATE_CACHE_MAX_BYTES = int(os.getenv('SESSION_STATE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+    SESSION_CACHE_TTL_SECONDS = int(os.getenv('SESSION_CACHE_TTL_SECONDS', 2 * 60 * 60))  # idle interviews
+
+    # Shared live state (Redis URL for multi-worker deployments, memory:// for a single worker)
+    REDIS_URL = os.getenv('REDIS_URL', '')
+    STATE_STORE_URL = os.getenv('STATE_STORE_URL', REDIS_URL or 'memory://')
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', REDIS_URL) or None
+
+    # How often each worker checks whether the question bank was reseeded elsewhere
+    QUESTION_BANK_CHECK_SECONDS = float(os.getenv('QUESTION_BANK_CHECK_SECONDS', 5))
+
+    # Stream interview turns on a shared asyncio loop (AsyncOpenAI) instead of one thread per turn
+    LLM_ASYNC_STREAMING = os.getenv('LLM_ASYNC_STREAMING', 'false').lower() == 'true'
+
+    # ai_chunk frame coalescing (flush every N ms or at N bytes, whichever comes first)
+    STREAM_FLUSH_INTERVAL_MS = int(os.getenv('STREAM_FLUSH_INTERVAL_MS', 40))
+    STREAM_FLUSH_MAX_BYTES = int(os.getenv('STREAM_FLUSH_MAX_BYTES', 256))
+    STREAM_FLUSH_WORKERS = int(os.getenv('STREAM_FLUSH_WORKERS', 4))  # deadline flushes (all streams)
+
+    # Interview context window: last K turns verbatim, older turns folded into a rolling summary
+    CONTEXT_KEEP_TURNS = int(os.getenv('CONTEXT_KEEP_TURNS', 6))
+    CONTEXT_SUMMARY_MIN_TURNS = int(os.getenv('CONTEXT_SUMMARY_MIN_TURNS', 2))  # fold in batches
+    CONTEXT_TOKEN_BUDGETS = {
+        'standard': int(os.getenv('CONTEXT_TOKEN_BUDGET_STANDARD', 8000)),
+        'personalized': int(os.getenv('CONTEXT_TOKEN_BUDGET_PERSONALIZED', 10000)),
+    }
+    CONTEXT_SUMMARY_MAX_COMPLETION_TOKENS = int(os.getenv('CONTEXT_SUMMARY_MAX_COMPLETION_TOKENS', 2000))
+    CONTEXT_SUMMARY_WORKERS = int(os.getenv('CONTEXT_SUMMARY_WORKERS', 2))
+    INTERVIEW_TURN_MAX_COMPLETION_TOKENS = int(os.getenv('INTERVIEW_TURN_MAX_COMPLETION_TOKENS', 4000))
+
+    # Content-addressed cache for vision text extraction (disk-backed, LRU by last access)
+    VISION_CACHE_ENABLED = os.getenv('VISION_CACHE_ENABLED', 'true').lower() == 'true'
+    VISION_CACHE_DIR = os.getenv('VISION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'truemirror', 'vision_cache'))
+    VISION_CACHE_MAX_BYTES = int(os.getenv('VISION_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+    # Memoized personalized-setup LLM calls (analysis + question generation) on normalized inputs
+    LLM_MEMO_ENABLED = os.getenv('LLM_MEMO_ENABLED', 'true').lower() == 'true'
+    LLM_MEMO_TTL_SECONDS = int(os.getenv('LLM_MEMO_TTL_SECONDS', 24 * 60 * 60))
+    LLM_MEMO_MAX_BYTES = int(os.getenv('LLM_MEMO_MAX_BYTES', 16 * 1024 * 1024))
+
+    # Parallel vision extraction (one call per file page), shared cap across requests
+    VISION_MAX_CONCURRENCY = int(os.getenv('VISION_MAX_CONCURRENCY', 6))
+
+    # Vision image preparation: crop blank margins, fit a pixel budget, grayscale, encode to a byte target
+    VISION_IMAGE_MAX_PIXELS = int(os.getenv('VISION_IMAGE_MAX_PIXELS', 1_000_000))
+    VISION_IMAGE_MAX_SIDE = int(os.getenv('VISION_IMAGE_MAX_SIDE', 2048))
+    VISION_IMAGE_GRAYSCALE = os.getenv('VISION_IMAGE_GRAYSCALE', 'true').lower() == 'true'
+    VISION_IMAGE_FORMAT = os.getenv('VISION_IMAGE_FORMAT', 'jpeg').lower()  # jpeg or webp
+    VISION_IMAGE_TARGET_BYTES = int(os.getenv('VISION_IMAGE_TARGET_BYTES', 200 * 1024))
+    VISION_IMAGE_MAX_QUALITY = int(os.getenv('VISION_IMAGE_MAX_QUALITY', 85))
+    VISION_IMAGE_MIN_QUALITY = int(os.getenv('VISION_IMAGE_MIN_QUALITY', 50))
+
+    # Background job queue (personalized setup, evaluations, assessments): DB-persisted, resumed on startup
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_BATCH_WORKERS = int(os.getenv('JOB_BATCH_WORKERS', 1))  # separate pool for batch-like kinds (overall assessment)
+    JOB_EXECUTOR = os.getenv('JOB_EXECUTOR', 'local').lower()  # local: run jobs in the web process; external: only enqueue (run worker.py)
+    JOB_POLL_INTERVAL_SECONDS = float(os.getenv('JOB_POLL_INTERVAL_SECONDS', 1.0))  # external worker polling interval
+    JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', 5))
+    JOB_RETRY_MAX_SECONDS = float(os.getenv('JOB_RETRY_MAX_SECONDS', 60))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 10 * 60))  # running jobs idle longer than this are requeued
+    JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', 30))  # lease renewal while a handler runs (< JOB_LEASE_SECONDS)
+    JOB_RESUME_ON_STARTUP = os.getenv('JOB_RESUME_ON_STARTUP', 'true').lower() == 'true'
+
+    # Stream personalized questions and open the session as soon as section 1 is complete
+    PERSONALIZED_QUESTIONS_STREAMING = os.getenv('PERSONALIZED_QUESTIONS_STREAMING', 'true').lower() == 'true'
+
+    # JSON-schema constrained responses for file analysis and question generation (one repair retry on invalid output)
+    STRUCTURED_OUTPUTS_ENABLED = os.getenv('STRUCTURED_OUTPUTS_ENABLED', 'true').lower() == 'true'
+
+    # Personalized setup pipeline: two_step (analysis, then questions), fused (one structured call), or ab (split by job)
+    PERSONALIZED_PIPELINE_MODE = os.getenv('PERSONALIZED_PIPELINE_MODE', 'two_step').lower()
+    PERSONALIZED_PIPELINE_FUSED_PERCENT = int(os.getenv('PERSONALIZED_PIPELINE_FUSED_PERCENT', 50))  # share of jobs on fused in ab mode
+
+    # Azure OpenAI resilience: jittered backoff (honors Retry-After), per-deployment circuit breaker, retry budget
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 3))
+    LLM_BACKOFF_BASE_SECONDS = float(os.getenv('LLM_BACKOFF_BASE_SECONDS', 0.5))
+    LLM_BACKOFF_MAX_SECONDS = float(os.getenv('LLM_BACKOFF_MAX_SECONDS', 8))
+    LLM_RETRY_AFTER_MAX_SECONDS = float(os.getenv('LLM_RETRY_AFTER_MAX_SECONDS', 30))  # longer Retry-After fails fast
+    LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', 5))
+    LLM_CIRCUIT_RECOVERY_SECONDS = float(os.getenv('LLM_CIRCUIT_RECOVERY_SECONDS', 30))
+    LLM_RETRY_BUDGET_RATIO = float(os.getenv('LLM_RETRY_BUDGET_RATIO', 0.2))  # retries ≤ 20% of recent requests
+    LLM_RETRY_BUDGET_MIN = int(os.getenv('LLM_RETRY_BUDGET_MIN', 3))  # per 10s window, so low traffic can still retry
@@ -0,0 +1,340 @@
+"""
+Fake OpenAI-compatible server for TrueMirror
+Stand-in for the Azure OpenAI endpoint so the interview flow can be run,
+load-tested and benchmarked offline. Speaks /chat/completions (streaming SSE
+and non-streaming) with simulated latency and injected failures:
+
+- TTFT and inter-token delay (streaming), or the same total time (non-streaming)
+- Random 500s (--error-rate) and 429s with Retry-After (--rate-limit-rate)
+- json_schema response_format: a valid instance of the schema is generated
+  (personalized questions come out as 4 sections of 3 questions)
+- Vision requests (image_url parts): canned extracted CV text
+- Anything else: a canned interviewer reply of --reply-tokens tokens
+
+Run (from backend/):
+    python devtools/fake_openai.py --port 8765 --ttft-ms 400 --token-delay-ms 20
+    AZURE_OPENAI_KEY=fake AZURE_OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python app.py
+
+Per-request overrides: X-Fake-TTFT-Ms, X-Fake-Token-Delay-Ms, X-Fake-Error-Rate,
+X-Fake-Rate-Limit-Rate headers. GET /stats returns request and injection counts.
+Can also be started in-process with FakeOpenAIServer(...).start().
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+INTERVIEW_REPLY = (
+    "Cảm ơn bạn đã chia sẻ. Câu trả lời của bạn cho thấy kinh nghiệm thực tế khá rõ ràng, "
+    "đặc biệt là phần mô tả cách bạn phối hợp với nhóm để xử lý sự cố. Tuy nhiên, bạn có thể "
+    "nêu thêm số liệu cụ thể về kết quả đạt được. Câu hỏi tiếp theo: hãy kể về một dự án mà bạn "
+    "phải đưa ra quyết định kỹ thuật quan trọng trong điều kiện thiếu thông tin. Bạn đã cân nhắc "
+    "những phương án nào và vì sao bạn chọn phương án cuối cùng?"
+)
+
+VISION_TEXT = (
+    "NGUYỄN VĂN AN\nBackend Developer | an.nguyen@example.com | 0901 234 567\n\n"
+    "KINH NGHIỆM\n2021 - nay: Senior Backend Engineer, FinPay\n"
+    "- Thiết kế API thanh toán xử lý 2.000 req/s (Python, Flask, PostgreSQL, Redis)\n"
+    "2019 - 2021: Backend Developer, ShopNow\n- Tối ưu truy vấn SQL, giảm 60% độ trễ\n\n"
+    "KỸ NĂNG\nPython, Flask, Django, PostgreSQL, Redis, Kafka, Docker, AWS"
+)
+
+SECTIONS = [
+    "Section 1: Background & Experience",
+    "Section 2: Technical/Domain Skills",
+    "Section 3: Behavioral & Soft Skills",
+    "Section 4: Future Goals & Cultural Fit"
+]
+
+
+@dataclass
+class FakeConfig:
+    ttft_ms: float = 300.0           # delay before the first streamed token
+    token_delay_ms: float = 15.0     # delay between streamed tokens
+    error_rate: float = 0.0          # share of requests answered with 500
+    rate_limit_rate: float = 0.0     # share of requests answered with 429
+    retry_after: float = 1.0         # Retry-After seconds sent with 429s
+    reply_tokens: int = 120          # length of canned chat replies
+    tokens_per_chunk: int = 1        # tokens per streamed chunk
+    seed: int = None
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(json.dumps(value, ensure_ascii=False)) // 4)
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split text into word-sized 'tokens' that concatenate back to the original."""
+    tokens = []
+    for index, word in enumerate(text.split(' ')):
+        tokens.append(word if index == 0 else ' ' + word)
+    return tokens
+
+
+def sample_from_schema(schema: Dict, name: str = '', index: int = 0) -> Any:
+    """Build a value that satisfies a (strict, OpenAI-subset) JSON schema."""
+    schema_type = schema.get('type')
+    if 'enum' in schema:
+        return schema['enum'][index % len(schema['enum'])]
+
+    if schema_type == 'object':
+        return {
+            key: sample_from_schema(sub, key, index)
+            for key, sub in schema.get('properties', {}).items()
+        }
+
+    if schema_type == 'array':
+        count = 12 if name == 'questions' else 3
+        return [sample_from_schema(schema.get('items', {}), name, i) for i in range(count)]
+
+    if schema_type == 'integer':
+        return 3
+    if schema_type == 'number':
+        return 3.0
+    if schema_type == 'boolean':
+        return True
+
+    if name == 'section':
+        return SECTIONS[min(index // 3, len(SECTIONS) - 1)]
+    if name == 'question_text':
+        return f"Câu hỏi mẫu số {index + 1}: hãy mô tả một tình huống cụ thể liên quan đến kinh nghiệm của bạn."
+    if name == 'industry':
+        return 'IT'
+    if name == 'position':
+        return 'Backend Developer'
+    if name == 'experience_level':
+        return 'Senior'
+    return f"{name.replace('_', ' ')} {index + 1}".strip()
+
+
+def build_reply(body: Dict, config: FakeConfig) -> str:
+    """Content for a chat completion request."""
+    response_format = body.get('response_format') or {}
+    if response_format.get('type') == 'json_schema':
+        schema = response_format.get('json_schema', {}).get('schema', {})
+        return json.dumps(sample_from_schema(schema), ensure_ascii=False)
+    if response_format.get('type') == 'json_object':
+        return json.dumps({'result': 'ok'})
+
+    for message in body.get('messages', []):
+        content = message.get('content')
+        if isinstance(content, list) and any(part.get('type') == 'image_url' for part in content):
+            return VISION_TEXT
+
+    words = split_tokens(INTERVIEW_REPLY)
+    repeated = (words * (config.reply_tokens // len(words) + 1))[:config.reply_tokens]
+    return ''.join(repeated)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeOpenAI/1.0'
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _request_config(self) -> FakeConfig:
+        overrides = {}
+        for header, field in (('X-Fake-TTFT-Ms', 'ttft_ms'), ('X-Fake-Token-Delay-Ms', 'token_delay_ms'),
+                              ('X-Fake-Error-Rate', 'error_rate'), ('X-Fake-Rate-Limit-Rate', 'rate_limit_rate')):
+            if self.headers.get(header) is not None:
+                overrides[field] = float(self.headers[header])
+        return replace(self.server.config, **overrides)
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('/health', '/v1/health'):
+            self._send_json(200, {'status': 'ok'})
+        elif self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.server.stats_snapshot())
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        if not self.path.split('?')[0].rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f'Unsupported path {self.path}'}})
+            return
+
+        try:
+            body = json.loads(raw or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON body', 'type': 'invalid_request_error'}})
+            return
+
+        config = self._request_config()
+        self.server.count('requests')
+
+        roll = self.server.random()
+        if roll < config.rate_limit_rate:
+            self.server.count('rate_limited')
+            self._send_json(429, {'error': {'message': 'Rate limit exceeded (injected)', 'type': 'rate_limit_error'}},
+                            {'Retry-After': str(config.retry_after)})
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self.server.count('errors')
+            self._send_json(500, {'error': {'message': 'Internal server error (injected)', 'type': 'server_error'}})
+            return
+
+        content = build_reply(body, config)
+        usage = {
+            'prompt_tokens': estimate_tokens(body.get('messages', [])),
+            'completion_tokens': len(split_tokens(content)),
+        }
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+
+        if body.get('stream'):
+            self._stream(body, content, usage, config)
+        else:
+            time.sleep((config.ttft_ms + config.token_delay_ms * usage['completion_tokens']) / 1000.0)
+            self._send_json(200, {
+                'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'fake'),
+                'choices': [{
+                    'index': 0,
+                    'finish_reason': 'stop',
+                    'message': {'role': 'assistant', 'content': content}
+                }],
+                'usage': usage
+            })
+        self.server.count('completed')
+
+    def _stream(self, body: Dict, content: str, usage: Dict, config: FakeConfig):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get('model', 'fake')
+
+        def event(choices, extra=None):
+            payload = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created,
+                       'model': model, 'choices': choices}
+            payload.update(extra or {})
+            chunk = f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b"\r\n")
+            self.wfile.flush()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        try:
+            time.sleep(config.ttft_ms / 1000.0)
+            event([{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}])
+
+            tokens = split_tokens(content)
+            step = max(1, config.tokens_per_chunk)
+            for start in range(0, len(tokens), step):
+                if start:
+                    time.sleep(config.token_delay_ms * step / 1000.0)
+                event([{'index': 0, 'delta': {'content': ''.join(tokens[start:start + step])}, 'finish_reason': None}])
+
+            event([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+            if (body.get('stream_options') or {}).get('include_usage'):
+                event([], {'usage': usage})
+
+            done = b"data: [DONE]\n\n"
+            self.wfile.write(f"{len(done):x}\r\n".encode('ascii') + done + b"\r\n0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count('client_disconnects')
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded fake server; use start()/stop() to run it in-process."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, config: FakeConfig = None):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.config = config or FakeConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'completed': 0, 'errors': 0, 'rate_limited': 0, 'client_disconnects': 0}
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def random(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats_snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> 'FakeOpenAIServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-openai', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake OpenAI-compatible chat completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ttft-ms', type=float, default=FakeConfig.ttft_ms)
+    parser.add_argument('--token-delay-ms', type=float, default=FakeConfig.token_delay_ms)
+    parser.add_argument('--error-rate', type=float, default=FakeConfig.error_rate)
+    parser.add_argument('--rate-limit-rate', type=float, default=FakeConfig.rate_limit_rate)
+    parser.add_argument('--retry-after', type=float, default=FakeConfig.retry_after)
+    parser.add_argument('--reply-tokens', type=int, default=FakeConfig.reply_tokens)
+    parser.add_argument('--tokens-per-chunk', type=int, default=FakeConfig.tokens_per_chunk)
+    parser.add_argument('--seed', type=int, default=None, help='Seed failure injection for reproducible runs')
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        ttft_ms=args.ttft_ms,
+        token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        reply_tokens=args.reply_tokens,
+        tokens_per_chunk=args.tokens_per_chunk,
+        seed=args.seed
+    )
+    server = FakeOpenAIServer(args.host, args.port, config)
+    print(f"[INFO] Fake OpenAI server on {server.base_url} (ttft={config.ttft_ms}ms, "
+          f"token_delay={config.token_delay_ms}ms, errors={config.error_rate}, 429s={config.rate_limit_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Fake OpenAI server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Database migration script to add the background_jobs table.
+
+Run this script to:
+- create the background_jobs table used by the job queue (personalized setup, ...)
+
+Usage:
+    python backend/migrations/add_background_jobs.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db
+from app import create_app
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add background jobs table."""
+    app = create_app()
+
+    with app.app_context():
+        print("[Migration] Starting database migration for background jobs...")
+
+        try:
+            engine = db.engine
+            dialect_name = engine.dialect.name
+
+            print(f"[Migration] Database dialect: {dialect_name}")
+
+            with engine.connect() as conn:
+                try:
+                    timestamp_type = 'TIMESTAMP WITH TIME ZONE' if dialect_name == 'postgresql' else 'TIMESTAMP'
+                    create_table_sql = f"""
+                    CREATE TABLE IF NOT EXISTS background_jobs (
+                        id VARCHAR(32) PRIMARY KEY,
+                        user_id INTEGER NOT NULL,
+                        kind VARCHAR(50) NOT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'queued',
+                        stage VARCHAR(50),
+                        progress INTEGER NOT NULL DEFAULT 0,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        payload_json TEXT,
+                        result_json TEXT,
+                        error TEXT,
+                        created_at {timestamp_type},
+                        updated_at {timestamp_type},
+                        started_at {timestamp_type},
+                        finished_at {timestamp_type},
+                        FOREIGN KEY (user_id) REFERENCES users (id)
+                    )
+                    """
+
+                    conn.execute(text(create_table_sql))
+                    conn.commit()
+                    print("[Migration] ✓ Created 'background_jobs' table")
+
+                    # Indexes for per-user lookups and resuming queued jobs on startup
+                    for column in ('user_id', 'status'):
+                        try:
+                            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_background_jobs_{column} ON background_jobs ({column})"))
+                            conn.commit()
+                            print(f"[Migration] ✓ Created index on '{column}'")
+                        except Exception as e:
+                            if 'already exists' in str(e).lower():
+                                print(f"[Migration] ⊘ Index on '{column}' already exists, skipping")
+                            else:
+                                print(f"[Migration] ⚠ Could not create index on '{column}': {str(e)}")
+
+                except Exception as e:
+                    if 'already exists' in str(e).lower():
+                        print("[Migration] ⊘ Table 'background_jobs' already exists, skipping")
+                    else:
+                        raise
+
+            print("[Migration] ✅ Migration completed successfully!")
+            print("\n[Next Steps]")
+            print("1. Restart your backend server")
+            print("2. Personalized setup now returns 202 with a job id; progress is sent as 'setup_progress' events")
+
+        except Exception as e:
+            print(f"[Migration] ❌ Migration failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
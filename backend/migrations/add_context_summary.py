@@ -0,0 +1,70 @@
+"""
+Database migration script to add rolling context summary columns.
+
+Run this script to update the interview_sessions table with new columns:
+- context_summary: rolling summary of turns that left the verbatim context window
+- context_summary_upto: number of dialogue messages folded into the summary
+
+Usage:
+    python backend/migrations/add_context_summary.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db
+from app import create_app
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add context summary columns."""
+    app = create_app()
+
+    with app.app_context():
+        print("[Migration] Starting database migration for context summary...")
+
+        try:
+            engine = db.engine
+            dialect_name = engine.dialect.name
+
+            print(f"[Migration] Database dialect: {dialect_name}")
+
+            with engine.connect() as conn:
+                # Add context_summary column
+                try:
+                    conn.execute(text("ALTER TABLE interview_sessions ADD COLUMN context_summary TEXT"))
+                    conn.commit()
+                    print("[Migration] ✓ Added 'context_summary' column")
+                except Exception as e:
+                    if 'duplicate column name' in str(e).lower() or 'already exists' in str(e).lower():
+                        print("[Migration] ⊘ 'context_summary' column already exists, skipping")
+                    else:
+                        raise
+
+                # Add context_summary_upto column
+                try:
+                    conn.execute(text("ALTER TABLE interview_sessions ADD COLUMN context_summary_upto INTEGER DEFAULT 0"))
+                    conn.commit()
+                    print("[Migration] ✓ Added 'context_summary_upto' column")
+                except Exception as e:
+                    if 'duplicate column name' in str(e).lower() or 'already exists' in str(e).lower():
+                        print("[Migration] ⊘ 'context_summary_upto' column already exists, skipping")
+                    else:
+                        raise
+
+            print("[Migration] ✅ Migration completed successfully!")
+            print("\n[Next Steps]")
+            print("1. Restart your backend server")
+            print("2. Summaries are built in the background once interviews exceed the verbatim window")
+
+        except Exception as e:
+            print(f"[Migration] ❌ Migration failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,124 @@
+"""
+Database migration script to add the append-only conversation_messages table.
+
+Run this script to:
+- create the conversation_messages table (one row per message, ordered by seq)
+- backfill it from existing conversations.messages_json blobs
+
+Sessions that already have rows are skipped, so the script is safe to re-run.
+
+Usage:
+    python backend/migrations/add_conversation_messages.py
+"""
+
+import sys
+import os
+import json
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db, Conversation, ConversationMessage
+from app import create_app
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add and backfill conversation messages table."""
+    app = create_app()
+
+    with app.app_context():
+        print("[Migration] Starting database migration for conversation messages...")
+
+        try:
+            engine = db.engine
+            dialect_name = engine.dialect.name
+
+            print(f"[Migration] Database dialect: {dialect_name}")
+
+            # Create conversation_messages table
+            with engine.connect() as conn:
+                try:
+                    if dialect_name == 'postgresql':
+                        create_table_sql = """
+                        CREATE TABLE IF NOT EXISTS conversation_messages (
+                            id SERIAL PRIMARY KEY,
+                            session_id INTEGER NOT NULL,
+                            seq INTEGER NOT NULL,
+                            role VARCHAR(20) NOT NULL,
+                            content TEXT NOT NULL,
+                            timestamp TIMESTAMP WITH TIME ZONE,
+                            FOREIGN KEY (session_id) REFERENCES interview_sessions (id),
+                            CONSTRAINT uq_conversation_messages_session_seq UNIQUE (session_id, seq)
+                        )
+                        """
+                    else:
+                        create_table_sql = """
+                        CREATE TABLE IF NOT EXISTS conversation_messages (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            session_id INTEGER NOT NULL,
+                            seq INTEGER NOT NULL,
+                            role VARCHAR(20) NOT NULL,
+                            content TEXT NOT NULL,
+                            timestamp TIMESTAMP,
+                            FOREIGN KEY (session_id) REFERENCES interview_sessions (id),
+                            CONSTRAINT uq_conversation_messages_session_seq UNIQUE (session_id, seq)
+                        )
+                        """
+
+                    conn.execute(text(create_table_sql))
+                    conn.commit()
+                    print("[Migration] ✓ Created 'conversation_messages' table")
+
+                    # Create index on session_id for suffix reads
+                    try:
+                        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_conversation_messages_session_id ON conversation_messages (session_id)"))
+                        conn.commit()
+                        print("[Migration] ✓ Created index on 'session_id'")
+                    except Exception as e:
+                        if 'already exists' in str(e).lower():
+                            print("[Migration] ⊘ Index already exists, skipping")
+                        else:
+                            print(f"[Migration] ⚠ Could not create index: {str(e)}")
+
+                except Exception as e:
+                    if 'already exists' in str(e).lower():
+                        print("[Migration] ⊘ Table 'conversation_messages' already exists, skipping")
+                    else:
+                        raise
+
+            # Backfill from legacy JSON blobs
+            from services.conversation_store import append_messages
+
+            migrated_sessions = db.session.query(ConversationMessage.session_id).distinct()
+            conversations = Conversation.query.filter(
+                Conversation.session_id.notin_(migrated_sessions)
+            ).all()
+
+            total_messages = 0
+            for conversation in conversations:
+                try:
+                    messages = json.loads(conversation.messages_json)
+                except (TypeError, ValueError):
+                    print(f"[Migration] ⚠ Invalid messages_json for session {conversation.session_id}, skipping")
+                    continue
+
+                append_messages(conversation.session_id, messages, 0, commit=False)
+                total_messages += len(messages)
+
+            db.session.commit()
+            print(f"[Migration] ✓ Backfilled {total_messages} messages from {len(conversations)} conversations")
+
+            print("[Migration] ✅ Migration completed successfully!")
+            print("\n[Next Steps]")
+            print("1. Restart your backend server")
+            print("2. New messages are appended to 'conversation_messages'; 'conversations' is read-only legacy data")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"[Migration] ❌ Migration failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
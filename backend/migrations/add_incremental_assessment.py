@@ -0,0 +1,71 @@
+"""
+Database migration script to add incremental overall assessment columns.
+
+Run this script to update tables with new columns:
+- interview_sessions.evaluated_at: when the session's evaluation was saved
+- user_assessments.watermark_at: latest evaluated_at folded into the assessment
+- user_assessments.sessions_covered: number of evaluations the assessment summarizes
+- user_assessments.covered_session_ids: JSON list of the sessions it summarizes (each counted once)
+
+Existing assessments have no watermark, so their next update is a full rebuild.
+
+Usage:
+    python backend/migrations/add_incremental_assessment.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db
+from app import create_app
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add incremental assessment columns."""
+    app = create_app()
+
+    with app.app_context():
+        print("[Migration] Starting database migration for incremental assessment...")
+
+        try:
+            engine = db.engine
+            dialect_name = engine.dialect.name
+
+            print(f"[Migration] Database dialect: {dialect_name}")
+
+            timestamp_type = 'TIMESTAMP WITH TIME ZONE' if dialect_name == 'postgresql' else 'TIMESTAMP'
+            columns = (
+                ('interview_sessions', 'evaluated_at', timestamp_type),
+                ('user_assessments', 'watermark_at', timestamp_type),
+                ('user_assessments', 'sessions_covered', 'INTEGER NOT NULL DEFAULT 0'),
+                ('user_assessments', 'covered_session_ids', 'TEXT'),
+            )
+
+            with engine.connect() as conn:
+                for table, column, column_type in columns:
+                    try:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                        conn.commit()
+                        print(f"[Migration] ✓ Added '{table}.{column}' column")
+                    except Exception as e:
+                        if 'duplicate column name' in str(e).lower() or 'already exists' in str(e).lower():
+                            print(f"[Migration] ⊘ '{table}.{column}' column already exists, skipping")
+                        else:
+                            raise
+
+            print("[Migration] ✅ Migration completed successfully!")
+            print("\n[Next Steps]")
+            print("1. Restart your backend server")
+            print("2. Overall assessments now fold in only new evaluations (rebuild with {\"rebuild\": true})")
+
+        except Exception as e:
+            print(f"[Migration] ❌ Migration failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
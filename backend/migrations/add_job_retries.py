@@ -0,0 +1,76 @@
+"""
+Database migration script to add retry and dedup columns to background jobs.
+
+Run this script to update the background_jobs table with new columns:
+- target: what the job works on (e.g. session id); active jobs are unique per (user, kind, target)
+- run_after: earliest time of the next attempt after a failed one (retry backoff)
+
+Usage:
+    python backend/migrations/add_job_retries.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db
+from models.background_job import ACTIVE_JOB_PREDICATE
+from app import create_app
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add job retry and dedup columns."""
+    app = create_app()
+
+    with app.app_context():
+        print("[Migration] Starting database migration for job retries...")
+
+        try:
+            engine = db.engine
+            dialect_name = engine.dialect.name
+
+            print(f"[Migration] Database dialect: {dialect_name}")
+
+            timestamp_type = 'TIMESTAMP WITH TIME ZONE' if dialect_name == 'postgresql' else 'TIMESTAMP'
+
+            with engine.connect() as conn:
+                for column, column_type in (('target', 'VARCHAR(64)'), ('run_after', timestamp_type)):
+                    try:
+                        conn.execute(text(f"ALTER TABLE background_jobs ADD COLUMN {column} {column_type}"))
+                        conn.commit()
+                        print(f"[Migration] ✓ Added '{column}' column")
+                    except Exception as e:
+                        if 'duplicate column name' in str(e).lower() or 'already exists' in str(e).lower():
+                            print(f"[Migration] ⊘ '{column}' column already exists, skipping")
+                        else:
+                            raise
+
+                # Dedup: at most one active job of a kind for a user and target (partial
+                # unique index, also serves the lookup; replaces the earlier plain index)
+                try:
+                    conn.execute(text(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS ux_background_jobs_active "
+                        f"ON background_jobs (user_id, kind, target) WHERE {ACTIVE_JOB_PREDICATE}"
+                    ))
+                    conn.execute(text("DROP INDEX IF EXISTS ix_background_jobs_dedup"))
+                    conn.commit()
+                    print("[Migration] ✓ Created unique index on active (user_id, kind, target)")
+                except Exception as e:
+                    conn.rollback()
+                    print(f"[Migration] ⚠ Could not create dedup index (duplicate active jobs?): {str(e)}")
+
+            print("[Migration] ✅ Migration completed successfully!")
+            print("\n[Next Steps]")
+            print("1. Restart your backend server")
+            print("2. Evaluations and overall assessments now run as background jobs with retries")
+
+        except Exception as e:
+            print(f"[Migration] ❌ Migration failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
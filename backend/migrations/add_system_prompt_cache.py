@@ -0,0 +1,70 @@
+"""
+Database migration script to add system prompt cache columns.
+
+Run this script to update the interview_sessions table with new columns:
+- system_prompt: compiled interview system prompt (persona + question bank context)
+- system_prompt_key: fingerprint of the inputs the prompt was compiled from
+
+Usage:
+    python backend/migrations/add_system_prompt_cache.py
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import models
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import db
+from app import create_app
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add system prompt cache columns."""
+    app = create_app()
+
+    with app.app_context():
+        print("[Migration] Starting database migration for system prompt cache...")
+
+        try:
+            engine = db.engine
+            dialect_name = engine.dialect.name
+
+            print(f"[Migration] Database dialect: {dialect_name}")
+
+            with engine.connect() as conn:
+                # Add system_prompt column
+                try:
+                    conn.execute(text("ALTER TABLE interview_sessions ADD COLUMN system_prompt TEXT"))
+                    conn.commit()
+                    print("[Migration] ✓ Added 'system_prompt' column")
+                except Exception as e:
+                    if 'duplicate column name' in str(e).lower() or 'already exists' in str(e).lower():
+                        print("[Migration] ⊘ 'system_prompt' column already exists, skipping")
+                    else:
+                        raise
+
+                # Add system_prompt_key column
+                try:
+                    conn.execute(text("ALTER TABLE interview_sessions ADD COLUMN system_prompt_key VARCHAR(64)"))
+                    conn.commit()
+                    print("[Migration] ✓ Added 'system_prompt_key' column")
+                except Exception as e:
+                    if 'duplicate column name' in str(e).lower() or 'already exists' in str(e).lower():
+                        print("[Migration] ⊘ 'system_prompt_key' column already exists, skipping")
+                    else:
+                        raise
+
+            print("[Migration] ✅ Migration completed successfully!")
+            print("\n[Next Steps]")
+            print("1. Restart your backend server")
+            print("2. Prompts are compiled lazily on the next message of each session")
+
+        except Exception as e:
+            print(f"[Migration] ❌ Migration failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == '__main__':
+    run_migration()
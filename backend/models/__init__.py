@@ -1,7 +1,9 @@
 from .user import db, bcrypt, User
 from .interview_session import InterviewSession
 from .conversation import Conversation
+from .conversation_message import ConversationMessage
 from .user_assessment import UserAssessment
+from .background_job import BackgroundJob
 from .question import (
     Industry, JobLevel, Position,
     QuestionType, PressureLevel, QuestionSection,
@@ -12,7 +14,7 @@ from .post import Post
 from .post_comment import PostComment
 
 __all__ = [
-    'db', 'bcrypt', 'User', 'InterviewSession', 'Conversation', 'UserAssessment',
+    'db', 'bcrypt', 'User', 'InterviewSession', 'Conversation', 'ConversationMessage', 'UserAssessment', 'BackgroundJob',
     'Industry', 'JobLevel', 'Position',
     'QuestionType', 'PressureLevel', 'QuestionSection',
     'InterviewQuestion', 'QuestionGuideline', 'SampleAnswer', 'PopupQuestion',
@@ -0,0 +1,73 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from .user import db
+
+# Rows covered by the active-job unique index (must match job_queue.ACTIVE_STATUSES)
+ACTIVE_JOB_PREDICATE = "status IN ('queued', 'running') AND target IS NOT NULL"
+
+class BackgroundJob(db.Model):
+    """Job chạy nền (ví dụ: tạo phiên phỏng vấn cá nhân hóa), lưu DB để không mất khi restart"""
+    __tablename__ = 'background_jobs'
+    __table_args__ = (
+        # At most one active job per (user, kind, target): enqueue dedup holds across workers
+        db.Index('ux_background_jobs_active', 'user_id', 'kind', 'target', unique=True,
+                 sqlite_where=db.text(ACTIVE_JOB_PREDICATE),
+                 postgresql_where=db.text(ACTIVE_JOB_PREDICATE)),
+    )
+
+    # Primary fields
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    kind = db.Column(db.String(50), nullable=False)  # personalized_setup, session_evaluation, overall_assessment
+    target = db.Column(db.String(64), nullable=True)  # what the job works on (e.g. session id); active jobs are unique per (user, kind, target)
+
+    # Lifecycle
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed
+    stage = db.Column(db.String(50), nullable=True)  # last reported stage, e.g. processed, extracted, analyzed
+    progress = db.Column(db.Integer, nullable=False, default=0)  # 0-100
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    # Data
+    payload_json = db.Column(db.Text, nullable=True)  # JSON input (cleared once the job succeeds or fails for good)
+    result_json = db.Column(db.Text, nullable=True)   # JSON output
+    error = db.Column(db.Text, nullable=True)
+
+    # Timestamps (updated_at doubles as the lease heartbeat for running jobs)
+    created_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc)
+    )
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    run_after = db.Column(db.DateTime(timezone=True), nullable=True)  # earliest time of the next attempt (retry backoff)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.kind} {self.status}>'
+
+    @property
+    def payload(self):
+        return json.loads(self.payload_json) if self.payload_json else {}
+
+    @property
+    def result(self):
+        return json.loads(self.result_json) if self.result_json else None
+
+    def to_dict(self):
+        """Convert job to dictionary (payload is internal and never exposed)"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'target': self.target,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'attempts': self.attempts,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+from .user import db
+
+class ConversationMessage(db.Model):
+    """Một tin nhắn trong hội thoại phỏng vấn (append-only, thứ tự theo seq)"""
+    __tablename__ = 'conversation_messages'
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'seq', name='uq_conversation_messages_session_seq'),
+    )
+
+    # Primary fields
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('interview_sessions.id'), nullable=False, index=True)
+    seq = db.Column(db.Integer, nullable=False)  # 1-based position in the conversation
+
+    # Message data
+    role = db.Column(db.String(20), nullable=False)  # system, user, assistant
+    content = db.Column(db.Text, nullable=False)
+    timestamp = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f'<ConversationMessage {self.session_id}#{self.seq} {self.role}>'
+
+    def to_dict(self):
+        """Convert to the message dict shape used by the chat history"""
+        timestamp = self.timestamp
+        if timestamp and timestamp.tzinfo is None:
+            # SQLite drops the offset; all message timestamps are stored in UTC
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+        return {
+            'seq': self.seq,
+            'role': self.role,
+            'content': self.content,
+            'timestamp': timestamp.isoformat() if timestamp else None
+        }
@@ -19,9 +19,18 @@ class InterviewSession(db.Model):
     uploaded_files_info = db.Column(db.Text, nullable=True)  # JSON: extracted info from uploaded files
     custom_questions = db.Column(db.Text, nullable=True)     # JSON: AI-generated personalized questions
 
+    # Compiled system prompt cache (rebuilt only when session config or question bank changes)
+    system_prompt = db.Column(db.Text, nullable=True)
+    system_prompt_key = db.Column(db.String(64), nullable=True)  # SHA-256 fingerprint of prompt inputs
+
+    # Rolling summary of older turns (context window management)
+    context_summary = db.Column(db.Text, nullable=True)
+    context_summary_upto = db.Column(db.Integer, default=0)  # Number of dialogue messages folded into the summary
+
     # Session metadata
     status = db.Column(db.String(20), default='pending')  # pending, in_progress, completed
     evaluation = db.Column(db.Text, nullable=True)  # Evaluation result from "Tổng kết phỏng vấn"
+    evaluated_at = db.Column(db.DateTime(timezone=True), nullable=True)  # When the evaluation was saved (overall assessment watermark)
     created_at = db.Column(
     db.DateTime(timezone=True),
     nullable=False,
@@ -49,6 +58,7 @@ class InterviewSession(db.Model):
             'custom_questions': self.custom_questions,
             'status': self.status,
             'evaluation': self.evaluation,
+            'evaluated_at': self.evaluated_at.isoformat() if self.evaluated_at else None,
             'created_at': self.created_at.isoformat(),
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
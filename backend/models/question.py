@@ -48,7 +48,8 @@ class Position(db.Model):
 )
 
     # Relationships
-    sections = db.relationship('QuestionSection', backref='position', lazy=True, cascade='all, delete-orphan')
+    sections = db.relationship('QuestionSection', backref='position', lazy=True, cascade='all, delete-orphan',
+                               order_by='QuestionSection.section_number')
 
 class QuestionType(db.Model):
     """Loại câu hỏi (Behavioral, Conceptual, Situational, Technical, Stress, Ethical, Ambiguous)"""
@@ -97,7 +98,8 @@ class QuestionSection(db.Model):
 )
 
     # Relationships
-    questions = db.relationship('InterviewQuestion', backref='section', lazy=True)
+    questions = db.relationship('InterviewQuestion', backref='section', lazy=True,
+                                order_by='InterviewQuestion.question_number')
 
 class InterviewQuestion(db.Model):
     """Câu hỏi phỏng vấn chính"""
@@ -126,9 +128,11 @@ class InterviewQuestion(db.Model):
 )
 
     # Relationships
-    guidelines = db.relationship('QuestionGuideline', backref='question', lazy=True, cascade='all, delete-orphan')
+    guidelines = db.relationship('QuestionGuideline', backref='question', lazy=True, cascade='all, delete-orphan',
+                                 order_by='QuestionGuideline.id')
     sample_answers = db.relationship('SampleAnswer', backref='question', lazy=True, cascade='all, delete-orphan')
-    popup_questions = db.relationship('PopupQuestion', backref='question', lazy=True, cascade='all, delete-orphan')
+    popup_questions = db.relationship('PopupQuestion', backref='question', lazy=True, cascade='all, delete-orphan',
+                                      order_by='PopupQuestion.order_number')
 
 class QuestionGuideline(db.Model):
     """Hướng dẫn đánh giá câu trả lời (phải có/nên tránh)"""
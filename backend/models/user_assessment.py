@@ -1,9 +1,11 @@
 """
 User Assessment Model
 Stores AI-generated overall assessments for users
-Only one assessment per user (most recent)
+Only one assessment per user: a rolling assessment that folds in new session
+evaluations incrementally (watermark_at marks the evaluations it covers)
 """
 
+import json
 from datetime import datetime, timezone
 from models.user import db
 
@@ -13,6 +15,9 @@ class UserAssessment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, unique=True, index=True)
     assessment_content = db.Column(db.Text, nullable=False)
+    watermark_at = db.Column(db.DateTime(timezone=True), nullable=True)  # Latest InterviewSession.evaluated_at folded in
+    sessions_covered = db.Column(db.Integer, nullable=False, default=0)  # Number of evaluations summarized
+    covered_session_ids = db.Column(db.Text, nullable=True)  # JSON list of summarized session ids (each counted once)
     created_at = db.Column(
         db.DateTime(timezone=True),
         nullable=False,
@@ -28,12 +33,18 @@ class UserAssessment(db.Model):
     # Relationship
     user = db.relationship('User', backref='assessment', foreign_keys=[user_id])
 
+    @property
+    def covered_ids(self):
+        return set(json.loads(self.covered_session_ids)) if self.covered_session_ids else set()
+
     def to_dict(self):
         """Convert assessment to dictionary"""
         return {
             'id': self.id,
             'user_id': self.user_id,
             'assessment_content': self.assessment_content,
+            'watermark_at': self.watermark_at.isoformat() if self.watermark_at else None,
+            'sessions_covered': self.sessions_covered,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
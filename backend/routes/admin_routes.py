@@ -26,10 +26,16 @@ def seed_questions_route():
         # Run seeding
         seed_main()
 
+        # Swap in a fresh question bank index here and, via the published
+        # generation, in every other worker (new version invalidates cached prompts)
+        from services.question_bank import question_bank
+        index = question_bank.reload()
+
         print("[SUCCESS] Questions seeded successfully")
         return jsonify({
             'success': True,
-            'message': 'Database seeded successfully with interview questions'
+            'message': 'Database seeded successfully with interview questions',
+            'question_bank_version': index.version
         }), 200
 
     except Exception as e:
@@ -174,6 +180,231 @@ def migrate_posts():
         }), 500
 
 
+@admin_bp.route('/migrate-system-prompt-cache', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def migrate_system_prompt_cache():
+    """
+    Run migration for the compiled system prompt cache
+    Adds: system_prompt, system_prompt_key columns
+    Usage: POST to /api/admin/migrate-system-prompt-cache
+    """
+    try:
+        print("[START] Running system prompt cache migration via API endpoint")
+
+        # Import migration function
+        from add_system_prompt_cache import run_migration
+
+        # Run migration
+        run_migration()
+
+        print("[SUCCESS] System prompt cache migration completed")
+        return jsonify({
+            'success': True,
+            'message': 'System prompt cache migration completed successfully'
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/migrate-conversation-messages', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def migrate_conversation_messages():
+    """
+    Run migration for conversation messages
+    Creates: conversation_messages table, backfilled from conversations.messages_json
+    Usage: POST to /api/admin/migrate-conversation-messages
+    """
+    try:
+        print("[START] Running conversation messages migration via API endpoint")
+
+        # Import migration function
+        from add_conversation_messages import run_migration
+
+        # Run migration
+        run_migration()
+
+        print("[SUCCESS] Conversation messages migration completed")
+        return jsonify({
+            'success': True,
+            'message': 'Conversation messages migration completed successfully'
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/migrate-context-summary', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def migrate_context_summary():
+    """
+    Run migration for context summary
+    Adds: context_summary, context_summary_upto columns
+    Usage: POST to /api/admin/migrate-context-summary
+    """
+    try:
+        print("[START] Running context summary migration via API endpoint")
+
+        # Import migration function
+        from add_context_summary import run_migration
+
+        # Run migration
+        run_migration()
+
+        print("[SUCCESS] Context summary migration completed")
+        return jsonify({
+            'success': True,
+            'message': 'Context summary migration completed successfully'
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/clear-llm-memo', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def clear_llm_memo():
+    """
+    Invalidate all memoized personalized-setup results (file analysis + questions)
+    Use after changing the analysis/question prompts
+    Usage: POST to /api/admin/clear-llm-memo
+    """
+    try:
+        from services.llm_memo import llm_memo
+        generation = llm_memo.clear()
+
+        return jsonify({
+            'success': True,
+            'message': 'LLM memo cleared',
+            'generation': generation
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Clear LLM memo failed: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/migrate-background-jobs', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def migrate_background_jobs():
+    """
+    Run migration for background jobs
+    Adds: background_jobs table (persisted job queue)
+    Usage: POST to /api/admin/migrate-background-jobs
+    """
+    try:
+        print("[START] Running background jobs migration via API endpoint")
+
+        # Import migration function
+        from add_background_jobs import run_migration
+
+        # Run migration
+        run_migration()
+
+        print("[SUCCESS] Background jobs migration completed")
+        return jsonify({
+            'success': True,
+            'message': 'Background jobs migration completed successfully'
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/migrate-job-retries', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def migrate_job_retries():
+    """
+    Run migration for job retries
+    Adds target and run_after columns to background_jobs (dedup and retry backoff)
+    and a unique index on active jobs per (user_id, kind, target)
+    Usage: POST to /api/admin/migrate-job-retries
+    """
+    try:
+        print("[START] Running job retries migration via API endpoint")
+
+        # Import migration function
+        from migrations.add_job_retries import run_migration
+
+        # Run migration
+        run_migration()
+
+        print("[SUCCESS] Job retries migration completed")
+        return jsonify({
+            'success': True,
+            'message': 'Job retries migration completed successfully'
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@admin_bp.route('/migrate-incremental-assessment', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def migrate_incremental_assessment():
+    """
+    Run migration for incremental assessment
+    Adds evaluated_at to interview_sessions and watermark_at / sessions_covered / covered_session_ids to user_assessments
+    Usage: POST to /api/admin/migrate-incremental-assessment
+    """
+    try:
+        print("[START] Running incremental assessment migration via API endpoint")
+
+        # Import migration function
+        from migrations.add_incremental_assessment import run_migration
+
+        # Run migration
+        run_migration()
+
+        print("[SUCCESS] Incremental assessment migration completed")
+        return jsonify({
+            'success': True,
+            'message': 'Incremental assessment migration completed successfully'
+        }), 200
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @admin_bp.route('/migrate-all', methods=['POST', 'OPTIONS'])
 @cross_origin()
 def migrate_all():
@@ -183,6 +414,12 @@ def migrate_all():
     2. News comments
     3. User assessments
     4. Posts
+    5. System prompt cache
+    6. Conversation messages
+    7. Context summary
+    8. Background jobs
+    9. Job retries
+    10. Incremental assessment
     Usage: POST to /api/admin/migrate-all
     """
     try:
@@ -221,6 +458,54 @@ def migrate_all():
         except Exception as e:
             results.append(f'✗ Posts migration failed: {str(e)}')
 
+        # Migration 5: System prompt cache
+        try:
+            from add_system_prompt_cache import run_migration as migrate_prompt_cache
+            migrate_prompt_cache()
+            results.append('✓ System prompt cache migration completed')
+        except Exception as e:
+            results.append(f'✗ System prompt cache migration failed: {str(e)}')
+
+        # Migration 6: Conversation messages
+        try:
+            from add_conversation_messages import run_migration as migrate_messages
+            migrate_messages()
+            results.append('✓ Conversation messages migration completed')
+        except Exception as e:
+            results.append(f'✗ Conversation messages migration failed: {str(e)}')
+
+        # Migration 7: Context summary
+        try:
+            from add_context_summary import run_migration as migrate_context
+            migrate_context()
+            results.append('✓ Context summary migration completed')
+        except Exception as e:
+            results.append(f'✗ Context summary migration failed: {str(e)}')
+
+        # Migration 8: Background jobs
+        try:
+            from add_background_jobs import run_migration as migrate_jobs
+            migrate_jobs()
+            results.append('✓ Background jobs migration completed')
+        except Exception as e:
+            results.append(f'✗ Background jobs migration failed: {str(e)}')
+
+        # Migration 9: Job retries
+        try:
+            from migrations.add_job_retries import run_migration as run_job_retries_migration
+            run_job_retries_migration()
+            results.append('✓ Job retries migration completed')
+        except Exception as e:
+            results.append(f'✗ Job retries migration failed: {str(e)}')
+
+        # Migration 10: Incremental assessment
+        try:
+            from migrations.add_incremental_assessment import run_migration as run_incremental_assessment_migration
+            run_incremental_assessment_migration()
+            results.append('✓ Incremental assessment migration completed')
+        except Exception as e:
+            results.append(f'✗ Incremental assessment migration failed: {str(e)}')
+
         print("[SUCCESS] All migrations completed")
         return jsonify({
             'success': True,
@@ -1,48 +1,20 @@
 from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, InterviewSession, Conversation
+from models import db, InterviewSession
 from services.azure_gpt_service import AzureGPTService
+from services.conversation_store import save_messages
+from services.session_cache import conversation_cache, get_conversation_history, clear_session
 from datetime import datetime, timezone
 import json
 
 chat_bp = Blueprint('chat', __name__, url_prefix='/api/chat')
 gpt_service = AzureGPTService()
 
-# In-memory cache for conversation history
-conversation_cache = {}
-
-def get_conversation_history(session_id):
-    """Get conversation history from cache or database"""
-    if session_id in conversation_cache:
-        return conversation_cache[session_id]
-
-    # Load from database
-    conversation = Conversation.query.filter_by(session_id=session_id).first()
-    if conversation:
-        messages = json.loads(conversation.messages_json)
-        conversation_cache[session_id] = messages
-        return messages
-
-    return []
-
 def update_conversation_history(session_id, messages):
-    """Update conversation history in cache and database"""
-    conversation_cache[session_id] = messages
-
-    # Update database
-    conversation = Conversation.query.filter_by(session_id=session_id).first()
-
-    if conversation:
-        conversation.messages_json = json.dumps(messages, ensure_ascii=False)
-        conversation.updated_at = datetime.now(timezone.utc)
-    else:
-        conversation = Conversation(
-            session_id=session_id,
-            messages_json=json.dumps(messages, ensure_ascii=False)
-        )
-        db.session.add(conversation)
-
-    db.session.commit()
+    """Update conversation history in database and cache"""
+    # Append new messages to database (assigns their seq), then cache the history
+    save_messages(session_id, messages)
+    conversation_cache.set(session_id, messages)
 
 
 @chat_bp.route('/message/stream', methods=['POST'])
@@ -186,8 +158,7 @@ def end_session(session_id):
         db.session.commit()
 
         # Clear from cache
-        if session_id in conversation_cache:
-            del conversation_cache[session_id]
+        clear_session(session_id)
 
         print(f"[SUCCESS] Session {session_id} ended")
 
@@ -2,7 +2,6 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import cross_origin
 from models import db, InterviewSession, User
-from datetime import datetime, timezone
 
 interview_bp = Blueprint('interview', __name__, url_prefix='/api/interview')
 
@@ -149,8 +148,7 @@ def get_interview_history():
     print("[START] Get interview history request")
     
     try:
-        from models import Conversation
-        import json
+        from services.conversation_store import load_messages_for_sessions
         
         # Convert JWT identity back to int
         user_id = int(get_jwt_identity())
@@ -159,19 +157,14 @@ def get_interview_history():
         sessions = InterviewSession.query.filter_by(user_id=user_id)\
             .order_by(InterviewSession.created_at.desc()).all()
         
+        # Load every session's conversation in one query
+        conversations = load_messages_for_sessions([session.id for session in sessions])
+
         # Build response with session info and conversations
         history = []
         for session in sessions:
             session_data = session.to_dict()
-            
-            # Get conversation for this session
-            conversation = Conversation.query.filter_by(session_id=session.id).first()
-            if conversation:
-                messages = json.loads(conversation.messages_json)
-                session_data['conversation'] = messages
-            else:
-                session_data['conversation'] = []
-            
+            session_data['conversation'] = conversations.get(session.id, [])
             history.append(session_data)
         
         print(f"[SUCCESS] Found {len(history)} sessions for user {user_id}")
@@ -225,62 +218,31 @@ def get_user_assessment():
 @jwt_required()
 def generate_overall_assessment():
     """
-    Generate overall assessment from all user's interview evaluations
-    Saves to database, replacing old assessment if exists
+    Update the user's overall assessment with evaluations saved since it was last generated.
+    Body {"rebuild": true} (or ?rebuild=true) regenerates it from every evaluation instead.
+    Runs as a background job: returns 202 with the job; poll GET /api/interview/jobs/<job_id>
+    (or 'watch_job' over Socket.IO, 'assessment_progress'). The saved assessment is the job result.
+    A request while a generation of the same mode is already queued or running returns that job.
     """
     print("[START] Generate overall assessment request")
 
     try:
-        from services.azure_gpt_service import gpt_service
-        from models.user_assessment import UserAssessment
+        from services.job_queue import job_queue
 
         # Convert JWT identity back to int
         user_id = int(get_jwt_identity())
 
-        # Get all completed sessions with evaluations
-        sessions = InterviewSession.query.filter_by(user_id=user_id)\
-            .filter(InterviewSession.evaluation.isnot(None))\
-            .order_by(InterviewSession.created_at.desc()).all()
-
-        if not sessions:
-            return jsonify({
-                'assessment': 'Bạn chưa có đánh giá phỏng vấn nào. Hãy hoàn thành ít nhất một buổi phỏng vấn và nhấn "Tổng kết phỏng vấn" để có đánh giá.'
-            }), 200
-
-        # Collect all evaluations
-        evaluations = [session.evaluation for session in sessions if session.evaluation]
-
-        # Generate overall assessment using GPT with temperature=0
-        assessment_content = gpt_service.generate_overall_assessment(evaluations)
-
-        # Save or update assessment in database
-        existing_assessment = UserAssessment.query.filter_by(user_id=user_id).first()
-
-        if existing_assessment:
-            # Update existing assessment
-            existing_assessment.assessment_content = assessment_content
-            existing_assessment.updated_at = datetime.now(timezone.utc)
-            print(f"[INFO] Updated existing assessment for user {user_id}")
-        else:
-            # Create new assessment
-            new_assessment = UserAssessment(
-                user_id=user_id,
-                assessment_content=assessment_content
-            )
-            db.session.add(new_assessment)
-            print(f"[INFO] Created new assessment for user {user_id}")
-
-        db.session.commit()
+        data = request.get_json(silent=True) or {}
+        rebuild = bool(data.get('rebuild')) or request.args.get('rebuild', 'false').lower() == 'true'
 
-        print(f"[SUCCESS] Generated and saved assessment for user {user_id} from {len(evaluations)} evaluations")
-
-        # Return the saved assessment
-        saved_assessment = UserAssessment.query.filter_by(user_id=user_id).first()
+        # Dedup per mode, so a rebuild is not absorbed by an incremental update already in flight
+        target = 'overall:rebuild' if rebuild else 'overall:update'
+        job = job_queue.enqueue('overall_assessment', user_id, {'rebuild': rebuild}, target=target)
 
         return jsonify({
-            'assessment': saved_assessment.to_dict(),
-            'total_sessions': len(sessions)
-        }), 200
+            'message': 'Đang tạo đánh giá tổng hợp',
+            'job': job.to_dict()
+        }), 202
 
     except Exception as e:
         db.session.rollback()
@@ -298,8 +260,7 @@ def get_session_detail(session_id):
     print(f"[START] Get session detail request: {session_id}")
     
     try:
-        from models import Conversation
-        import json
+        from services.conversation_store import load_messages
         
         # Convert JWT identity back to int
         user_id = int(get_jwt_identity())
@@ -314,12 +275,7 @@ def get_session_detail(session_id):
         session_data = session.to_dict()
         
         # Get conversation
-        conversation = Conversation.query.filter_by(session_id=session_id).first()
-        if conversation:
-            messages = json.loads(conversation.messages_json)
-            session_data['conversation'] = messages
-        else:
-            session_data['conversation'] = []
+        session_data['conversation'] = load_messages(session_id)
         
         print(f"[SUCCESS] Session detail retrieved: {session_id}")
         
@@ -338,14 +294,15 @@ def get_session_detail(session_id):
 def create_personalized_session():
     """
     Create personalized interview session with file upload.
-    Files are analyzed by AI to extract info and generate custom questions.
+    Files are validated and processed here; AI extraction, analysis and question
+    generation run as a background job. Returns 202 with the job: follow progress
+    via the 'watch_job' socket event ('setup_progress') or GET /api/interview/jobs/<job_id>.
     """
     print("[START] Create personalized interview session request")
 
     try:
-        import json
         from services.file_processor import file_processor
-        from services.azure_gpt_service import gpt_service
+        from services.job_queue import job_queue
 
         # Get current user
         user_id = int(get_jwt_identity())
@@ -358,6 +315,8 @@ def create_personalized_session():
         # Get form data
         style = request.form.get('style', '').strip()
         language = request.form.get('language', '').strip()
+        # Opt out of memoized questions (regenerate even for identical uploads)
+        fresh_questions = request.form.get('fresh_questions', 'false').strip().lower() == 'true'
 
         # Validate required fields
         if not style or not language:
@@ -393,80 +352,50 @@ def create_personalized_session():
             print(f"[ERROR] File processing failed: {str(e)}")
             return jsonify({'error': f'Lỗi xử lý file: {str(e)}'}), 400
 
-        # Step 2: Extract text from all files (using Vision API for images/PDFs)
-        file_texts = []
-        for file_data in extracted_files:
-            try:
-                if file_data['text']:
-                    # Already extracted (TXT/DOCX)
-                    file_texts.append(file_data['text'])
-                elif file_data['base64_content']:
-                    # Use Azure Vision API to extract text from image/PDF
-                    extracted_text = gpt_service.extract_text_from_vision(
-                        file_data['base64_content'],
-                        file_data['filename']
-                    )
-                    file_texts.append(extracted_text)
-            except Exception as e:
-                print(f"[ERROR] Failed to extract text from {file_data['filename']}: {str(e)}")
-                return jsonify({'error': f'Lỗi đọc file {file_data["filename"]}: {str(e)}'}), 400
-
-        print(f"[SUCCESS] Extracted text from all {len(file_texts)} files")
-
-        # Step 3: Analyze files with AI to extract info
-        try:
-            print("[INFO] Analyzing files with AI...")
-            extracted_info = gpt_service.analyze_files_and_extract_info(file_texts, language)
-            print(f"[SUCCESS] AI analysis complete: position={extracted_info.get('position')}, industry={extracted_info.get('industry')}")
-        except Exception as e:
-            print(f"[ERROR] AI analysis failed: {str(e)}")
-            return jsonify({'error': f'Lỗi phân tích AI: {str(e)}'}), 500
-
-        # Step 4: Generate personalized questions with AI
+        # Steps 2-5 (vision, analysis, questions, session) run as a background job
         try:
-            print("[INFO] Generating personalized questions with AI...")
-            custom_questions = gpt_service.generate_personalized_questions(
-                extracted_info,
-                style,
-                language
-            )
-            print(f"[SUCCESS] Generated {len(custom_questions)} personalized questions")
-        except Exception as e:
-            print(f"[ERROR] Question generation failed: {str(e)}")
-            return jsonify({'error': f'Lỗi tạo câu hỏi: {str(e)}'}), 500
-
-        # Step 5: Create interview session
-        try:
-            new_session = InterviewSession(
-                user_id=user_id,
-                mode='personalized',
-                position=extracted_info.get('position', 'N/A'),
-                industry=extracted_info.get('industry', 'N/A'),
-                style=style,
-                language=language,
-                uploaded_files_info=json.dumps(extracted_info, ensure_ascii=False),
-                custom_questions=json.dumps(custom_questions, ensure_ascii=False),
-                status='pending'
-            )
-
-            db.session.add(new_session)
-            db.session.commit()
-
-            print(f"[SUCCESS] Personalized interview session created: {new_session.id} for user {user.email}")
-
-            return jsonify({
-                'message': 'Tạo phiên phỏng vấn cá nhân hóa thành công',
-                'session': new_session.to_dict()
-            }), 201
-
+            job = job_queue.enqueue('personalized_setup', user_id, {
+                'files': extracted_files,
+                'style': style,
+                'language': language,
+                'fresh_questions': fresh_questions
+            })
         except Exception as e:
             db.session.rollback()
-            print(f"[ERROR] Create session failed: {str(e)}")
+            print(f"[ERROR] Enqueue personalized setup failed: {str(e)}")
             return jsonify({'error': 'Đã xảy ra lỗi khi tạo phiên phỏng vấn'}), 500
 
+        return jsonify({
+            'message': 'Đang tạo phiên phỏng vấn cá nhân hóa',
+            'job': job.to_dict()
+        }), 202
+
     except Exception as e:
         db.session.rollback()
         print(f"[ERROR] Create personalized session failed: {str(e)}")
         import traceback
         traceback.print_exc()
-        return jsonify({'error': f'Đã xảy ra lỗi: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Đã xảy ra lỗi: {str(e)}'}), 500
+
+
+@interview_bp.route('/jobs/<job_id>', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@jwt_required()
+def get_job_status(job_id):
+    """
+    Polling fallback for background jobs (personalized setup, evaluation, overall assessment)
+    """
+    try:
+        from services.job_queue import get_user_job
+
+        user_id = int(get_jwt_identity())
+        job = get_user_job(job_id, user_id)
+
+        if not job:
+            return jsonify({'error': 'Không tìm thấy tác vụ'}), 404
+
+        return jsonify({'job': job.to_dict()}), 200
+
+    except Exception as e:
+        print(f"[ERROR] Get job status failed: {str(e)}")
+        return jsonify({'error': 'Đã xảy ra lỗi'}), 500
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify
 
 main_bp = Blueprint("main_bp", __name__)
 
@@ -18,3 +18,33 @@ def get_info():
         "version": "1.0.0",
         "description": "AI-powered interview practice platform"
     }), 200
+
+@main_bp.route("/api/metrics/stream", methods=["GET"])
+def get_stream_metrics():
+    """ai_chunk frame coalescing config and counters."""
+    from services.stream_emitter import stream_metrics, get_stream_config
+    return jsonify({
+        "config": get_stream_config(),
+        "metrics": stream_metrics.snapshot()
+    }), 200
+
+@main_bp.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Prometheus text exposition: LLM call metrics, stream framing and cache stats."""
+    from services.metrics import registry, format_stats
+    from services.stream_emitter import stream_metrics
+    from services.resilience import circuit_stats
+    from services.session_cache import conversation_cache, question_state_cache, system_prompt_cache
+    from services.vision_cache import vision_cache
+    from services.llm_memo import llm_memo
+
+    lines = [registry.render().rstrip('\n')]
+    lines.extend(format_stats('truemirror_stream', stream_metrics.snapshot()))
+    for cache in (conversation_cache, question_state_cache, system_prompt_cache, llm_memo.cache):
+        stats = cache.stats()
+        lines.extend(format_stats('truemirror_session_cache', stats, {'cache': stats['name']}))
+    lines.extend(format_stats('truemirror_vision_cache', vision_cache.stats()))
+    for deployment, stats in circuit_stats().items():
+        lines.extend(format_stats('truemirror_llm', stats, {'deployment': deployment}))
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -3,22 +3,30 @@ WebSocket routes for real-time interview chat with AI.
 Replaces SSE with WebSocket for better support of future voice features.
 """
 
-from flask import request
+from flask import request, current_app
 from flask_socketio import emit, join_room, leave_room
 from flask_jwt_extended import decode_token
-from models import db, InterviewSession, Conversation, InterviewQuestion, QuestionSection, Position, Industry, JobLevel
+from models import db, InterviewSession
+from config import Config
 from services.azure_gpt_service import AzureGPTService
+from services.question_bank import question_bank
+from services.conversation_store import save_messages
+from services.state_store import state_store
+from services.job_queue import job_queue, get_user_job, job_room, user_room
+from services.async_streams import stream_runner
+from services.stream_emitter import ChunkCoalescer, AsyncChunkCoalescer
+from services.context_window import build_context_messages, maybe_schedule_summary
+from services.session_cache import (
+    conversation_cache, system_prompt_cache, get_conversation_history,
+    get_question_state, clear_session
+)
 import json
+import hashlib
 from datetime import datetime, timezone
 
 # Initialize service
 gpt_service = AzureGPTService()
 
-# In-memory cache for active conversations
-conversation_cache = {}
-
-# Track current question index for each session
-session_question_state = {}
 
 def init_socketio_events(socketio):
     """Initialize SocketIO event handlers."""
@@ -33,6 +41,7 @@ def init_socketio_events(socketio):
     def handle_disconnect():
         """Handle client disconnection."""
         print(f"[WebSocket] Client disconnected: {request.sid}")
+        untrack_room_member(request.sid)
 
     @socketio.on('join_session')
     def handle_join_session(data):
@@ -66,19 +75,14 @@ def init_socketio_events(socketio):
             # Join room
             room = f"session_{session_id}"
             join_room(room)
+            join_room(user_room(user_id))  # job completion notifications
+            track_room_member(room, request.sid)
 
             # Load conversation history
             conversation_history = get_conversation_history(session_id)
 
             # Initialize question state if not exists
-            if session_id not in session_question_state:
-                session_question_state[session_id] = {
-                    'current_question_index': 0,
-                    'current_section': 1,
-                    'questions_asked': [],
-                    'awaiting_answer': False,
-                    'popup_mode': False
-                }
+            get_question_state(session_id)
 
             emit('joined_session', {
                 'session_id': session_id,
@@ -134,7 +138,7 @@ def init_socketio_events(socketio):
                 'timestamp': timestamp
             }
             conversation_history.append(user_message)
-            conversation_cache[session_id] = conversation_history
+            conversation_cache.set(session_id, conversation_history)
 
             # Emit user message to room
             room = f"session_{session_id}"
@@ -146,37 +150,30 @@ def init_socketio_events(socketio):
             # Stream AI response
             emit('ai_typing', {'typing': True}, room=room)
 
-            full_response = ""
-            import time
-            for chunk in gpt_service.get_chat_response_stream(api_messages):
-                if chunk:
-                    full_response += chunk
-                    emit('ai_chunk', {'chunk': chunk}, room=room)
-                    # Add small delay for smoother streaming effect
-                    time.sleep(0.02)  # 20ms delay between chunks
-
-            # Add AI response to history
-            ai_timestamp = datetime.now(timezone.utc).isoformat()
-            ai_message = {
-                'role': 'assistant',
-                'content': full_response,
-                'timestamp': ai_timestamp
-            }
-            conversation_history.append(ai_message)
-            conversation_cache[session_id] = conversation_history
-
-            # Save to database
-            save_conversation(session_id, conversation_history)
+            if Config.LLM_ASYNC_STREAMING:
+                # Hand the generation to the shared event loop and free this thread
+                app = current_app._get_current_object()
+                stream_runner.submit(stream_ai_response_async(
+                    app, socketio, session_id, api_messages, conversation_history, room
+                ))
+                return
 
-            # Emit completion
-            emit('ai_typing', {'typing': False}, room=room)
-            emit('ai_complete', {
-                'message': ai_message,
-                'timestamp': ai_timestamp
-            }, room=room)
+            # Coalesce deltas into paced frames (no per-token packets or sleeps)
+            full_response = ""
+            try:
+                # socketio.emit, not emit: deadline flushes run on the frame flusher, outside the request context
+                with ChunkCoalescer(lambda text: socketio.emit('ai_chunk', {'chunk': text}, to=room)) as frames:
+                    for chunk in gpt_service.get_chat_response_stream(
+                        api_messages, max_completion_tokens=Config.INTERVIEW_TURN_MAX_COMPLETION_TOKENS
+                    ):
+                        if chunk:
+                            full_response += chunk
+                            frames.push(chunk)
+            except Exception as e:
+                fail_ai_turn(socketio, session_id, conversation_history, e, room)
+                return
 
-            # Check if should ask next question automatically
-            handle_question_flow(session_id, full_response, room)
+            complete_ai_turn(socketio, session_id, conversation_history, full_response, room)
 
         except Exception as e:
             print(f"[ERROR] Send message failed: {str(e)}")
@@ -210,10 +207,7 @@ def init_socketio_events(socketio):
                 db.session.commit()
 
                 # Clear cache
-                if session_id in conversation_cache:
-                    del conversation_cache[session_id]
-                if session_id in session_question_state:
-                    del session_question_state[session_id]
+                clear_session(session_id)
 
                 room = f"session_{session_id}"
                 emit('session_ended', {
@@ -222,6 +216,7 @@ def init_socketio_events(socketio):
                 }, room=room)
 
                 leave_room(room)
+                untrack_room_member(request.sid)
                 print(f"[WebSocket] Session {session_id} ended")
 
         except Exception as e:
@@ -253,109 +248,241 @@ def init_socketio_events(socketio):
                 emit('error', {'message': 'Unauthorized'})
                 return
 
-            # Generate evaluation summary
-            conversation_history = get_conversation_history(session_id)
-            evaluation = generate_final_evaluation(session_id, conversation_history)
-
-            # Save evaluation to session
-            session.evaluation = evaluation
-            db.session.commit()
-
-            # Add evaluation message to conversation history
-            from datetime import datetime, timezone
-            evaluation_content = f"## 📊 ĐÁNH GIÁ TỔNG KẾT\n\n{evaluation}\n\n---\n\n✅ **Cảm ơn bạn đã tham gia buổi phỏng vấn!**"
-            evaluation_message = {
-                'role': 'assistant',
-                'content': evaluation_content,
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            }
-            conversation_history.append(evaluation_message)
-            
-            # Save updated conversation to database
-            save_conversation(session_id, conversation_history)
-            conversation_cache[session_id] = conversation_history
+            # The evaluation runs as a background job: chunks stream to the session room
+            # ('evaluation_chunk'), then 'session_evaluated' (or 'evaluation_error')
+            job = job_queue.enqueue('session_evaluation', user_id, {'session_id': session_id},
+                                    target=str(session_id))
+            join_room(job_room(job.id))
 
-            room = f"session_{session_id}"
-            emit('session_evaluated', {
+            emit('evaluation_queued', {
                 'session_id': session_id,
-                'evaluation': evaluation
-            }, room=room)
-
-            print(f"[WebSocket] Session {session_id} evaluated and saved to conversation")
+                'job': job.to_dict()
+            })
 
         except Exception as e:
+            db.session.rollback()
             print(f"[ERROR] Evaluate session failed: {str(e)}")
             emit('error', {'message': f'Failed to evaluate session: {str(e)}'})
 
-def get_conversation_history(session_id):
-    """Get conversation history from cache or database."""
-    if session_id in conversation_cache:
-        return conversation_cache[session_id]
+    @socketio.on('watch_job')
+    def handle_watch_job(data):
+        """Subscribe to progress events of a background job (e.g. personalized setup)."""
+        try:
+            job_id = data.get('job_id')
+            token = data.get('token')
 
-    conversation = Conversation.query.filter_by(session_id=session_id).first()
-    if conversation:
-        messages = json.loads(conversation.messages_json)
-        conversation_cache[session_id] = messages
-        return messages
+            if not job_id or not token:
+                emit('error', {'message': 'Missing job_id or token'})
+                return
 
-    return []
+            # Verify token
+            try:
+                decoded = decode_token(token)
+                user_id = int(decoded['sub'])
+            except Exception as e:
+                emit('error', {'message': f'Invalid token: {str(e)}'})
+                return
 
-def save_conversation(session_id, messages):
-    """Save conversation to database."""
-    conversation = Conversation.query.filter_by(session_id=session_id).first()
-
-    if conversation:
-        conversation.messages_json = json.dumps(messages, ensure_ascii=False)
-        conversation.updated_at = datetime.now(timezone.utc)
-    else:
-        conversation = Conversation(
-            session_id=session_id,
-            messages_json=json.dumps(messages, ensure_ascii=False)
+            job = get_user_job(job_id, user_id)
+            if not job:
+                emit('error', {'message': 'Job not found'})
+                return
+
+            join_room(job_room(job_id))
+            join_room(user_room(user_id))
+
+            # Send the current state so a late subscriber does not miss finished stages
+            emit(job_queue.event_for(job.kind), job.to_dict())
+
+        except Exception as e:
+            print(f"[ERROR] Watch job failed: {str(e)}")
+            emit('error', {'message': f'Failed to watch job: {str(e)}'})
+
+def complete_ai_turn(socketio, session_id, conversation_history, full_response, room):
+    """Persist the AI reply and notify the room (shared by sync and async stream paths)."""
+    # Add AI response to history
+    ai_timestamp = datetime.now(timezone.utc).isoformat()
+    ai_message = {
+        'role': 'assistant',
+        'content': full_response,
+        'timestamp': ai_timestamp
+    }
+    conversation_history.append(ai_message)
+
+    # Save to database, then cache the history with the assigned seqs
+    save_conversation(session_id, conversation_history)
+    conversation_cache.set(session_id, conversation_history)
+
+    # Emit completion
+    socketio.emit('ai_typing', {'typing': False}, to=room)
+    socketio.emit('ai_complete', {
+        'message': ai_message,
+        'timestamp': ai_timestamp
+    }, to=room)
+
+    # Fold turns that left the verbatim window into the rolling summary (background)
+    session = InterviewSession.query.get(session_id)
+    if session:
+        maybe_schedule_summary(current_app._get_current_object(), session, conversation_history)
+
+    # Check if should ask next question automatically
+    handle_question_flow(session_id, full_response, room)
+
+def fail_ai_turn(socketio, session_id, conversation_history, error, room):
+    """
+    The AI reply could not be generated: nothing is saved to the transcript, the
+    unanswered user message is dropped and the client restores it to the input
+    box, so the candidate can simply resend.
+    """
+    print(f"[ERROR] AI turn failed for session {session_id}: {str(error)}")
+    if conversation_history and conversation_history[-1].get('role') == 'user':
+        conversation_history.pop()
+        conversation_cache.set(session_id, conversation_history)
+
+    socketio.emit('ai_typing', {'typing': False}, to=room)
+    socketio.emit('ai_error', {
+        'message': 'AI interviewer tạm thời không phản hồi. Vui lòng gửi lại câu trả lời sau ít giây.',
+        'retry_in': getattr(error, 'retry_in', None)
+    }, to=room)
+
+def run_in_app_context(app, func, *args):
+    """Call func inside a Flask app context (for work scheduled off the request thread)."""
+    with app.app_context():
+        try:
+            return func(*args)
+        finally:
+            db.session.remove()
+
+async def stream_ai_response_async(app, socketio, session_id, api_messages, conversation_history, room):
+    """
+    Stream one interview turn on the shared event loop. Emits, cache/state
+    store access and persistence all run off-loop, so the loop never blocks.
+    """
+    try:
+        full_response = ""
+        try:
+            async with AsyncChunkCoalescer(
+                lambda text: socketio.emit('ai_chunk', {'chunk': text}, to=room),
+                stream_runner.run_blocking
+            ) as frames:
+                async for chunk in gpt_service.aget_chat_response_stream(
+                    api_messages, max_completion_tokens=Config.INTERVIEW_TURN_MAX_COMPLETION_TOKENS
+                ):
+                    if chunk:
+                        full_response += chunk
+                        frames.push(chunk)
+        except Exception as e:
+            await stream_runner.run_blocking(
+                run_in_app_context, app, fail_ai_turn,
+                socketio, session_id, conversation_history, e, room
+            )
+            return
+
+        await stream_runner.run_blocking(
+            run_in_app_context, app, complete_ai_turn,
+            socketio, session_id, conversation_history, full_response, room
         )
-        db.session.add(conversation)
 
-    db.session.commit()
+    except Exception as e:
+        print(f"[ERROR] Async stream failed for session {session_id}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        message = f'Failed to send message: {str(e)}'
+        await stream_runner.run_blocking(lambda: socketio.emit('error', {'message': message}, to=room))
+
+def track_room_member(room, sid):
+    """Record room membership in the state store (visible to every worker)."""
+    ttl = Config.SESSION_CACHE_TTL_SECONDS
+    state_store.add_member(f"room:{room}", sid, ttl=ttl)
+    state_store.set(f"sid:{sid}", room, ttl=ttl)
+
+def untrack_room_member(sid):
+    """Remove a client from the room it joined."""
+    room = state_store.get(f"sid:{sid}")
+    if room:
+        state_store.remove_member(f"room:{room}", sid)
+        state_store.delete(f"sid:{sid}")
+
+def get_room_members(room):
+    """Socket IDs currently in a room, across all workers."""
+    return state_store.members(f"room:{room}")
+
+def save_conversation(session_id, messages):
+    """Save conversation to database (appends only the new messages)."""
+    save_messages(session_id, messages)
 
 def build_api_messages(session, conversation_history):
-    """Build messages array for AI API, including system prompt."""
-    api_messages = []
-
-    # Check if we need to add system prompt (first message)
-    has_system_prompt = any(msg.get('role') == 'system' for msg in conversation_history)
-
-    if not has_system_prompt:
-        # Build system prompt based on session config
-        # Pass uploaded_files_info for personalized mode
-        uploaded_files_info = getattr(session, 'uploaded_files_info', None)
-
-        system_prompt = gpt_service.build_interview_system_prompt(
-            position=session.position,
-            industry=session.industry,
-            style=session.style,
-            language=session.language,
-            uploaded_files_info=uploaded_files_info
-        )
+    """Build messages array for AI API: system prompt, rolling summary and recent turns."""
+    system_prompt = get_system_prompt(session)
 
-        # Add questions context (from database or custom questions)
-        questions_context = get_questions_for_session(session)
-        if questions_context:
-            system_prompt += f"\n\n{questions_context}"
-
-        api_messages.append({
-            'role': 'system',
-            'content': system_prompt
-        })
-
-    # Add conversation history (skip system messages)
-    for msg in conversation_history:
-        if msg.get('role') != 'system':
-            api_messages.append({
-                'role': msg['role'],
-                'content': msg['content']
-            })
+    api_messages = [{
+        'role': 'system',
+        'content': system_prompt
+    }]
+
+    # Older turns are folded into the session summary; only the recent window is sent verbatim
+    api_messages.extend(build_context_messages(session, conversation_history, system_prompt))
 
     return api_messages
 
+def build_system_prompt_key(session):
+    """Hash every input the compiled system prompt depends on."""
+    inputs = {
+        'mode': session.mode,
+        'position': session.position,
+        'industry': session.industry,
+        'style': session.style,
+        'language': session.language,
+        'uploaded_files_info': session.uploaded_files_info,
+        'custom_questions': session.custom_questions,
+    }
+
+    # Standard sessions also depend on the question bank contents
+    if not (session.mode == 'personalized' and session.custom_questions):
+        inputs['question_bank'] = question_bank.version
+
+    payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_system_prompt(session):
+    """
+    Get the compiled system prompt for a session.
+    Served from memory, then from the copy persisted on InterviewSession,
+    and only rebuilt when the session config or question bank changed.
+    """
+    prompt_key = build_system_prompt_key(session)
+
+    cached = system_prompt_cache.get(session.id)
+    if cached and cached[0] == prompt_key:
+        return cached[1]
+
+    if session.system_prompt and session.system_prompt_key == prompt_key:
+        system_prompt_cache.set(session.id, (prompt_key, session.system_prompt))
+        return session.system_prompt
+
+    print(f"[INFO] Compiling system prompt for session {session.id}")
+
+    # Pass uploaded_files_info for personalized mode
+    system_prompt = gpt_service.build_interview_system_prompt(
+        position=session.position,
+        industry=session.industry,
+        style=session.style,
+        language=session.language,
+        uploaded_files_info=session.uploaded_files_info
+    )
+
+    # Add questions context (from database or custom questions)
+    questions_context = get_questions_for_session(session)
+    if questions_context:
+        system_prompt += f"\n\n{questions_context}"
+
+    session.system_prompt = system_prompt
+    session.system_prompt_key = prompt_key
+    db.session.commit()
+
+    system_prompt_cache.set(session.id, (prompt_key, system_prompt))
+    return system_prompt
+
 def get_questions_for_session(session):
     """Get interview questions - from database (standard mode) or custom questions (personalized mode)."""
     try:
@@ -401,82 +528,16 @@ def get_questions_for_session(session):
             print(f"[SUCCESS] Loaded {len(custom_questions)} personalized questions")
             return context
 
-        # STANDARD MODE: Use database questions (existing logic)
-        print(f"[INFO] Loading standard questions from database for session {session.id}")
-
-        # Map job level and industry
-        job_level_map = {
-            'Intern': 'intern',
-            'Junior': 'junior',
-            'Senior': 'senior',
-            'Manager': 'manager'
-        }
-
-        industry_map = {
-            'IT': 'it',
-            'Marketing': 'marketing',
-            'Sales': 'sales',
-            'Finance': 'finance',
-            'HR': 'hr'
-        }
-
-        # Find position with matching job level and industry
-        position = Position.query.join(Position.industry).join(Position.job_level).filter(
-            db.func.lower(Industry.name) == industry_map.get(session.industry, session.industry.lower()),
-            db.func.lower(JobLevel.name) == job_level_map.get(session.position, session.position.lower())
-        ).first()
-
-        if not position:
-            return None
+        # STANDARD MODE: Use the seeded question bank
+        print(f"[INFO] Loading standard questions from question bank for session {session.id}")
 
-        # Get all sections and questions for this position
-        sections = QuestionSection.query.filter_by(position_id=position.id).order_by(QuestionSection.section_number).all()
+        # In-memory question bank index lookup (no DB round trip)
+        position = question_bank.get_position(session.industry, session.position, session.language)
 
-        if not sections:
+        if not position:
             return None
 
-        # Build structured questions context
-        context = "=== INTERVIEW QUESTIONS STRUCTURE ===\n\n"
-        context += f"Position: {position.name}\n"
-        context += f"Total Duration: {position.total_duration_minutes} minutes\n"
-        context += f"Language: {'Tiếng Việt' if position.language == 'vi' else 'English'}\n\n"
-
-        for section in sections:
-            context += f"SECTION {section.section_number}: {section.section_name}\n"
-            context += f"Duration: {section.duration_minutes} minutes\n\n"
-
-            questions = InterviewQuestion.query.filter_by(section_id=section.id).order_by(InterviewQuestion.question_number).all()
-
-            for q in questions:
-                context += f"Question {q.question_number}: {q.question_text}\n"
-                context += f"Type: {q.question_type_text}\n"
-                context += f"Pressure: {q.pressure_level_text}\n"
-                context += f"Purpose: {q.purpose}\n"
-                context += f"Expected Duration: {q.expected_duration_minutes} min\n"
-
-                # Add popup questions
-                if q.popup_questions:
-                    context += "POP-UP follow-ups:\n"
-                    for popup in q.popup_questions:
-                        context += f"  - {popup.popup_text}\n"
-
-                # Add guidelines
-                must_have = [g.content for g in q.guidelines if g.guideline_type == 'must_have']
-                should_avoid = [g.content for g in q.guidelines if g.guideline_type == 'should_avoid']
-
-                if must_have:
-                    context += "Must have in answer:\n"
-                    for item in must_have:
-                        context += f"  ✓ {item}\n"
-
-                if should_avoid:
-                    context += "Should avoid:\n"
-                    for item in should_avoid:
-                        context += f"  ✗ {item}\n"
-
-                context += "\n"
-
-        return context
+        return position.context
 
     except Exception as e:
         print(f"[ERROR] Failed to get questions: {str(e)}")
@@ -489,46 +550,3 @@ def handle_question_flow(session_id, ai_response, room):
     # This will be enhanced later to track which questions have been asked
     # and automatically move to next question when appropriate
     pass
-
-def generate_final_evaluation(session_id, conversation_history):
-    """Generate comprehensive evaluation at end of interview."""
-    try:
-        # Build evaluation prompt
-        eval_prompt = """
-Dựa trên cuộc phỏng vấn vừa rồi, hãy tạo đánh giá tổng kết chi tiết theo định dạng markdown **chặt chẽ**.   
-Yêu cầu kết quả gồm đúng 4 phần sau với nội dung rõ ràng:
-### 1. ĐIỂM MẠNH (Strengths)
-Liệt kê 3–5 điểm mạnh nổi bật của ứng viên. Mỗi điểm bắt đầu bằng "- ".
-### 2. ĐIỂM CẦN PHÁT TRIỂN (Areas for Improvement)
-Liệt kê 2–4 điểm cần cải thiện. Mỗi điểm bắt đầu bằng "- ".
-### 3. ĐÁNH GIÁ TỔNG QUAN (Overall Assessment)
-Viết 1–2 đoạn ngắn gọn, dễ đọc về tổng quan hiệu suất và gợi ý cho lần phỏng vấn tiếp theo. Không dùng list trong phần này.
-### 4. ĐIỂM SỐ (Score)
-Cho điểm theo thang X/10, ghi rõ ở đầu dòng dạng "**Score: X/10**".
-
-**Luôn giữ đúng markdown format với các tiêu đề và dấu đầu dòng như trên.** Viết ngắn gọn, cụ thể, tránh lặp lại.
-"""
-
-        messages = []
-        for msg in conversation_history:
-            if msg.get('role') != 'system':
-                messages.append({
-                    'role': msg['role'],
-                    'content': msg['content']
-                })
-
-        messages.append({
-            'role': 'user',
-            'content': eval_prompt
-        })
-
-        # Get evaluation from AI (non-streaming)
-        evaluation = ""
-        for chunk in gpt_service.get_chat_response_stream(messages):
-            evaluation += chunk
-
-        return evaluation
-
-    except Exception as e:
-        print(f"[ERROR] Evaluation generation failed: {str(e)}")
-        return "Không thể tạo đánh giá tự động. Vui lòng liên hệ admin."
\ No newline at end of file
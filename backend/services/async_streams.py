@@ -0,0 +1,47 @@
+"""
+Async Stream Runner for TrueMirror
+Runs asyncio-native LLM streams on one shared event loop in a background thread,
+so a worker can multiplex hundreds of concurrent interview turns without pinning
+an OS thread per in-flight generation.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine
+
+
+class AsyncStreamRunner:
+    """Owns a dedicated event loop thread and schedules coroutines onto it."""
+
+    def __init__(self, name: str = 'llm-stream-loop'):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name=self.name,
+                    daemon=True
+                )
+                self._thread.start()
+                print(f"[INFO] Started async stream loop: {self.name}")
+            return self._loop
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the shared loop; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    async def run_blocking(self, func: Callable, *args) -> Any:
+        """Run blocking work (DB writes) off the loop from inside a coroutine."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+
+# Singleton instance
+stream_runner = AsyncStreamRunner()
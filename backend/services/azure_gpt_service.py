@@ -1,7 +1,25 @@
 import os
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from config import Config
+from services.json_stream import JsonArrayStreamParser
+from services.metrics import track_llm_call
+from services.resilience import get_caller
+from services.structured_output import (
+    StructuredOutput,
+    StructuredOutputError,
+    extracted_info_output,
+    fused_setup_output,
+    parse_failures,
+    parse_repairs,
+    personalized_questions_output,
+    question_output
+)
+from services.vision_cache import vision_cache
 
 class AzureGPTService:
+    # Bump when the vision extraction prompt changes (invalidates cached extractions)
+    VISION_PROMPT_VERSION = 'v1'
+
     def __init__(self):
         # Azure OpenAI Configuration - using standard OpenAI client with base_url
         api_key = os.getenv('AZURE_OPENAI_KEY')
@@ -10,39 +28,100 @@ class AzureGPTService:
         if not api_key or not base_url:
             raise ValueError("AZURE_OPENAI_KEY and AZURE_OPENAI_BASE_URL must be set")
 
+        # Retries are handled by services.resilience (backoff, circuit breaker, retry budget)
         self.client = OpenAI(
             api_key=api_key,
-            base_url=base_url
+            base_url=base_url,
+            max_retries=0
         )
+        self._api_key = api_key
+        self._base_url = base_url
+        self._async_client = None
         self.model = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-5-mini')
+        self.resilience = get_caller(self.model)
         print(f"[INFO] Azure OpenAI initialized: model={self.model}, base_url={base_url}")
 
-    def get_chat_response_stream(self, conversation_history):
+    def _create(self, **kwargs):
+        """chat.completions.create on the configured deployment, with retries and circuit breaking."""
+        return self.resilience.call(self.client.chat.completions.create, model=self.model, **kwargs)
+
+    async def _acreate(self, **kwargs):
+        """Async _create on the AsyncOpenAI client."""
+        return await self.resilience.acall(self.async_client.chat.completions.create, model=self.model, **kwargs)
+
+    def get_chat_response_stream(self, conversation_history, max_completion_tokens=4000, call_type='chat_stream'):
         """
         Get streaming chat response from Azure OpenAI
         conversation_history: list of {role, content} dicts
+        max_completion_tokens: completion cap (includes reasoning tokens)
+        call_type: metrics label (e.g. 'evaluation_stream' for the final evaluation)
         Yields: content chunks from AI response
+        Raises: the provider error once retries are exhausted, or CircuitOpenError
         """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=conversation_history,
-                # temperature removed as gpt-5-mini only supports default (1)
-                max_completion_tokens=4000,
-                stream=True
+            with track_llm_call(call_type) as call:
+                response = self._create(
+                    messages=conversation_history,
+                    # temperature removed as gpt-5-mini only supports default (1)
+                    max_completion_tokens=max_completion_tokens,
+                    stream=True,
+                    stream_options={'include_usage': True}
+                )
+
+                for chunk in response:
+                    if chunk.usage:
+                        call.record_usage(chunk.usage)
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if hasattr(delta, 'content') and delta.content:
+                            call.first_token()
+                            yield delta.content
+
+        except Exception as e:
+            # Raised (not yielded) so an error message never lands in the transcript
+            print(f"[ERROR] Azure OpenAI stream failed: {str(e)}")
+            raise
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI client, created lazily on the event loop that first uses it"""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=self._base_url,
+                max_retries=0
             )
+        return self._async_client
 
-            for chunk in response:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if hasattr(delta, 'content') and delta.content:
-                        # Debug: print chunk content
-                        print(f"[DEBUG] Chunk: {repr(delta.content)}")
-                        yield delta.content
+    async def aget_chat_response_stream(self, conversation_history, max_completion_tokens=4000):
+        """
+        Async variant of get_chat_response_stream built on AsyncOpenAI.
+        conversation_history: list of {role, content} dicts
+        max_completion_tokens: completion cap (includes reasoning tokens)
+        Yields: content chunks from AI response
+        """
+        try:
+            with track_llm_call('chat_stream_async') as call:
+                response = await self._acreate(
+                    messages=conversation_history,
+                    max_completion_tokens=max_completion_tokens,
+                    stream=True,
+                    stream_options={'include_usage': True}
+                )
+
+                async for chunk in response:
+                    if chunk.usage:
+                        call.record_usage(chunk.usage)
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if hasattr(delta, 'content') and delta.content:
+                            call.first_token()
+                            yield delta.content
 
         except Exception as e:
-            print(f"[ERROR] Azure OpenAI stream failed: {str(e)}")
-            yield f"Xin lỗi, đã có lỗi xảy ra: {str(e)}"
+            # Raised (not yielded) so an error message never lands in the transcript
+            print(f"[ERROR] Azure OpenAI async stream failed: {str(e)}")
+            raise
 
     def build_interview_system_prompt(self, position, industry, style, language, uploaded_files_info=None):
         """Build system prompt based on interview configuration"""
@@ -131,6 +210,55 @@ Quy tắc:
 
         return system_prompt
 
+    def summarize_conversation(self, previous_summary, new_messages, language='vi', max_completion_tokens=2000):
+        """
+        Fold older interview turns into a rolling summary.
+
+        Args:
+            previous_summary: Existing summary text (or None for the first fold)
+            new_messages: List of {role, content} dicts to fold in, oldest first
+            language: Interview language ('vi' or 'en')
+            max_completion_tokens: Completion cap for the summary call
+
+        Returns:
+            Updated summary text
+        """
+        transcript = "\n\n".join([
+            f"{'Interviewer' if msg['role'] == 'assistant' else 'Candidate'}: {msg['content']}"
+            for msg in new_messages
+        ])
+
+        lang_instruction = 'Viết bằng tiếng Việt.' if language == 'vi' else 'Write in English.'
+
+        summary_prompt = f"""
+You maintain a running summary of a job interview so the interviewer can continue it without the full transcript.
+
+EXISTING SUMMARY:
+{previous_summary or '(none yet)'}
+
+NEW TRANSCRIPT TO FOLD IN:
+{transcript}
+
+Update the summary. Keep it compact (at most ~300 words) and factual:
+- Which sections/questions have already been asked (so they are not repeated)
+- Key points of each candidate answer, strengths and gaps observed
+- Any follow-ups promised or topics the candidate asked about
+
+{lang_instruction} Return only the updated summary.
+"""
+
+        with track_llm_call('context_summary') as call:
+            response = self._create(
+                messages=[{
+                    'role': 'user',
+                    'content': summary_prompt
+                }],
+                max_completion_tokens=max_completion_tokens
+            )
+            call.record_usage(response.usage)
+
+        return response.choices[0].message.content.strip()
+
     def generate_evaluation(self, conversation_history):
         """Generate final evaluation based on interview conversation"""
         try:
@@ -155,33 +283,21 @@ Hãy viết đánh giá bằng markdown format, ngắn gọn nhưng cụ thể.
                 'content': evaluation_prompt
             }]
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                # temperature removed for gpt-5-mini default (1)
-                max_completion_tokens=5500
-            )
+            with track_llm_call('evaluation') as call:
+                response = self._create(
+                    messages=messages,
+                    # temperature removed for gpt-5-mini default (1)
+                    max_completion_tokens=5500
+                )
+                call.record_usage(response.usage)
 
             return response.choices[0].message.content
 
         except Exception as e:
             print(f"[ERROR] Generate evaluation failed: {str(e)}")
-            return f"Xin lỗi, không thể tạo đánh giá: {str(e)}"
-
-    def generate_overall_assessment(self, evaluations_list):
-        """Generate overall assessment from multiple interview evaluations"""
-        try:
-            # Build prompt for overall assessment
-            evaluations_text = "\n\n---\n\n".join([
-                f"**Phiên phỏng vấn {i+1}:**\n{eval_text}" 
-                for i, eval_text in enumerate(evaluations_list) if eval_text
-            ])
-
-            assessment_prompt = f"""
-Dựa trên các đánh giá phỏng vấn sau đây của cùng một cá nhân, hãy tổng hợp đánh giá tổng quan:
-
-{evaluations_text}
+            raise
 
+    ASSESSMENT_FORMAT_INSTRUCTIONS = """
 Hãy tạo đánh giá tổng hợp theo định dạng markdown với các phần sau:
 
 ## 📊 ĐIỂM MẠNH (Strengths)
@@ -200,8 +316,16 @@ Liệt kê 2-4 điểm yếu hoặc điểm cần cải thiện của cá nhân
 - Các chữ in đậm và biểu tượng cảm xúc phải được giữ nguyên
 """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+    @staticmethod
+    def _format_evaluations(evaluations_list, start=1):
+        return "\n\n---\n\n".join([
+            f"**Phiên phỏng vấn {i + start}:**\n{eval_text}"
+            for i, eval_text in enumerate(evaluations_list) if eval_text
+        ])
+
+    def _complete_assessment(self, call_type, assessment_prompt):
+        with track_llm_call(call_type) as call:
+            response = self._create(
                 messages=[{
                     'role': 'user',
                     'content': assessment_prompt
@@ -209,14 +333,60 @@ Liệt kê 2-4 điểm yếu hoặc điểm cần cải thiện của cá nhân
                 # temperature removed for gpt-5-mini default (1)
                 max_completion_tokens=5000
             )
+            call.record_usage(response.usage)
 
-            return response.choices[0].message.content
+        return response.choices[0].message.content
+
+    def generate_overall_assessment(self, evaluations_list):
+        """Generate overall assessment from multiple interview evaluations (full rebuild)"""
+        try:
+            # Build prompt for overall assessment
+            assessment_prompt = f"""
+Dựa trên các đánh giá phỏng vấn sau đây của cùng một cá nhân, hãy tổng hợp đánh giá tổng quan:
+
+{self._format_evaluations(evaluations_list)}
+{self.ASSESSMENT_FORMAT_INSTRUCTIONS}"""
+
+            return self._complete_assessment('overall_assessment', assessment_prompt)
 
         except Exception as e:
             print(f"[ERROR] Generate overall assessment failed: {str(e)}")
-            return f"Xin lỗi, không thể tạo đánh giá tổng hợp: {str(e)}"
+            raise
 
-    def extract_text_from_vision(self, base64_contents: list, filename: str) -> str:
+    def update_overall_assessment(self, previous_assessment, new_evaluations, sessions_covered):
+        """
+        Fold new interview evaluations into an existing overall assessment.
+        Only the new evaluations are sent, so cost does not grow with the user's history.
+
+        Args:
+            previous_assessment: Current assessment markdown
+            new_evaluations: Evaluations of sessions not yet covered (oldest first)
+            sessions_covered: Number of sessions the previous assessment summarizes
+        """
+        try:
+            assessment_prompt = f"""
+Dưới đây là đánh giá tổng hợp hiện tại của một cá nhân, được tổng hợp từ {sessions_covered} buổi phỏng vấn trước:
+
+{previous_assessment}
+
+Sau đó cá nhân này đã hoàn thành thêm {len(new_evaluations)} buổi phỏng vấn với các đánh giá sau:
+
+{self._format_evaluations(new_evaluations, start=sessions_covered + 1)}
+
+Hãy cập nhật đánh giá tổng hợp để phản ánh toàn bộ {sessions_covered + len(new_evaluations)} buổi phỏng vấn:
+- Giữ lại các nhận định vẫn đúng, cân nhắc số buổi phỏng vấn mà đánh giá cũ đại diện
+- Ghi nhận tiến bộ hoặc điểm yếu mới xuất hiện trong các buổi gần đây
+- Bỏ các điểm yếu đã được cải thiện rõ rệt
+{self.ASSESSMENT_FORMAT_INSTRUCTIONS}"""
+
+            return self._complete_assessment('overall_assessment_update', assessment_prompt)
+
+        except Exception as e:
+            print(f"[ERROR] Update overall assessment failed: {str(e)}")
+            raise
+
+    def extract_text_from_vision(self, base64_contents: list, filename: str, content_hash: str = None,
+                                 cache_part: str = '') -> str:
         """
         Extract text from image/PDF using Azure GPT-4 Vision API.
         Similar to AIChatAssistant's image analysis approach.
@@ -226,10 +396,22 @@ Liệt kê 2-4 điểm yếu hoặc điểm cần cải thiện của cá nhân
                            this will be a list of images (one per page).
                            Format: [{'type': 'image_url', 'image_url': {'url': 'data:image/...;base64,...'}}, ...]
             filename: Original filename for context
+            content_hash: SHA-256 of the original file bytes; when given, the
+                          result is served from / stored in the vision cache
+            cache_part: Which part of the file base64_contents covers (e.g. a page
+                        number) when a file is extracted in several calls
 
         Returns:
             Extracted text from all images/pages
         """
+        cache_key = None
+        if content_hash:
+            cache_key = vision_cache.make_key(content_hash, self.VISION_PROMPT_VERSION, self.model, cache_part)
+            cached_text = vision_cache.get(cache_key)
+            if cached_text is not None:
+                print(f"[INFO] Vision cache hit for {filename} ({len(cached_text)} characters)")
+                return cached_text
+
         try:
             print(f"[INFO] Extracting text from {filename} using Azure Vision API ({len(base64_contents)} page(s))...")
 
@@ -244,30 +426,85 @@ Liệt kê 2-4 điểm yếu hoặc điểm cần cải thiện của cá nhân
             # Add all images to the content array
             content.extend(base64_contents)
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that extracts ALL text content from images and PDF documents. Extract the text exactly as it appears, maintaining structure and formatting. If it's a CV/resume or job description, extract all information including contact details, skills, experience, education, requirements, etc."
-                    },
-                    {
-                        "role": "user",
-                        "content": content
-                    }
-                ],
-                # temperature removed for gpt-5-mini default (1)
-                max_completion_tokens=4000  # Increased for multi-page PDFs
-            )
+            with track_llm_call('vision_extract') as call:
+                response = self._create(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a helpful assistant that extracts ALL text content from images and PDF documents. Extract the text exactly as it appears, maintaining structure and formatting. If it's a CV/resume or job description, extract all information including contact details, skills, experience, education, requirements, etc."
+                        },
+                        {
+                            "role": "user",
+                            "content": content
+                        }
+                    ],
+                    # temperature removed for gpt-5-mini default (1)
+                    max_completion_tokens=4000  # Increased for multi-page PDFs
+                )
+                call.record_usage(response.usage)
 
             extracted_text = response.choices[0].message.content.strip()
             print(f"[SUCCESS] Extracted {len(extracted_text)} characters from {filename}")
+
+            if cache_key:
+                vision_cache.set(cache_key, extracted_text)
+
             return extracted_text
 
         except Exception as e:
             print(f"[ERROR] Vision API extraction failed for {filename}: {str(e)}")
             raise Exception(f"Không thể đọc nội dung từ {filename}: {str(e)}")
 
+    def _response_format_kwargs(self, output: StructuredOutput) -> dict:
+        return {'response_format': output.response_format} if Config.STRUCTURED_OUTPUTS_ENABLED else {}
+
+    def _create_structured(self, call_type: str, prompt: str, output: StructuredOutput,
+                           max_completion_tokens: int = 5000):
+        """
+        Non-streaming call constrained to the output's JSON schema, parsed and validated.
+        An invalid response gets one repair retry that shows the model what was wrong.
+
+        Raises:
+            StructuredOutputError if the repaired response is still invalid
+        """
+        messages = [{'role': 'user', 'content': prompt}]
+
+        for attempt in ('initial', 'repair'):
+            with track_llm_call(call_type if attempt == 'initial' else f'{call_type}_repair') as call:
+                response = self._create(
+                    messages=messages,
+                    # temperature removed for gpt-5-mini default (1)
+                    max_completion_tokens=max_completion_tokens,
+                    **self._response_format_kwargs(output)
+                )
+                call.record_usage(response.usage)
+
+            result_text = response.choices[0].message.content or ''
+            try:
+                value = output.parse(result_text, call_type)
+            except StructuredOutputError as e:
+                if attempt == 'repair':
+                    parse_repairs.inc(call_type=call_type, outcome='failed')
+                    raise
+                print(f"[WARN] {call_type} response invalid ({str(e)}), retrying with repair prompt")
+                messages = messages + [
+                    {'role': 'assistant', 'content': result_text},
+                    {'role': 'user', 'content': output.repair_prompt(e)}
+                ]
+                continue
+
+            if attempt == 'repair':
+                parse_repairs.inc(call_type=call_type, outcome='repaired')
+            return value
+
+    @staticmethod
+    def combine_file_texts(file_texts: list) -> str:
+        """Join extracted file texts into one numbered document block for prompts."""
+        return "\n\n---\n\n".join([
+            f"**Document {i+1}:**\n{text}"
+            for i, text in enumerate(file_texts) if text
+        ])
+
     def analyze_files_and_extract_info(self, file_texts: list, language: str = 'vi') -> dict:
         """
         Analyze uploaded files and extract structured information using AI.
@@ -287,13 +524,13 @@ Liệt kê 2-4 điểm yếu hoặc điểm cần cải thiện của cá nhân
                 'candidate_background': str,
                 'key_focus_areas': list[str]
             }
+
+        Raises:
+            Exception if the call fails or the response is unusable after the repair retry
         """
         try:
             # Combine all file texts
-            combined_text = "\n\n---\n\n".join([
-                f"**Document {i+1}:**\n{text}"
-                for i, text in enumerate(file_texts) if text
-            ])
+            combined_text = self.combine_file_texts(file_texts)
 
             # Build analysis prompt
             analysis_prompt = f"""
@@ -324,104 +561,24 @@ Guidelines:
 Respond ONLY with valid JSON, no markdown formatting, no explanation.
 """
 
-            # Call GPT with temperature=0 for consistency
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{
-                    'role': 'user',
-                    'content': analysis_prompt
-                }],
-                # temperature removed for gpt-5-mini default (1)
-                max_completion_tokens=5000
-            )
-
-            result_text = response.choices[0].message.content.strip()
-
-            # Robust JSON extraction using regex
-            import re
-            import json
-            
-            # Try to find JSON object within the text
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            
-            if json_match:
-                json_str = json_match.group(0)
-                try:
-                    extracted_info = json.loads(json_str)
-                except json.JSONDecodeError:
-                    # If regex match fails to parse (e.g. invalid JSON syntax), try cleaning code blocks
-                    pass
-            
-            # Fallback: legacy cleaning if regex didn't work or return valid JSON
-            if 'extracted_info' not in locals():
-                clean_text = result_text
-                if '```' in clean_text:
-                    parts = clean_text.split('```')
-                    for part in parts:
-                        if '{' in part and '}' in part:
-                            clean_text = part
-                            if clean_text.strip().startswith('json'):
-                                clean_text = clean_text.strip()[4:]
-                            break
-                
-                clean_text = clean_text.strip()
-                extracted_info = json.loads(clean_text)
+            # Unusable after the repair retry raises: the job retries or fails, never generic data
+            extracted_info = self._create_structured('analyze_files', analysis_prompt, extracted_info_output)
 
             print(f"[SUCCESS] Extracted info: position={extracted_info.get('position')}, industry={extracted_info.get('industry')}")
 
             return extracted_info
 
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"[ERROR] Failed to parse AI response as JSON: {str(e)}")
-            print(f"[DEBUG] AI response raw: {result_text}")
-            # Try one last fallback: return a basic default structure if parsing fails completely
-            # This prevents the "AI không thể phân tích" error from blocking the user flow
-            default_info = {
-                "position": "Unknown Position",
-                "industry": "General",
-                "candidate_skills": [],
-                "experience_level": "Junior",
-                "job_requirements": "N/A",
-                "candidate_background": "N/A",
-                "key_focus_areas": ["General Fit", "Communication"]
-            }
-            print("[WARN] Using default fallback info due to parsing error.")
-            return default_info
         except Exception as e:
             print(f"[ERROR] File analysis failed: {str(e)}")
             raise Exception(f"Lỗi khi phân tích tài liệu: {str(e)}")
 
-    def generate_personalized_questions(self, extracted_info: dict, style: str, language: str) -> list:
-        """
-        Generate personalized interview questions based on extracted candidate/job info.
+    def build_personalized_questions_prompt(self, extracted_info: dict, style: str, language: str) -> str:
+        """Prompt shared by generate_personalized_questions and its streaming variant."""
+        import json
 
-        Args:
-            extracted_info: Dictionary with candidate and job information
-            style: Interview style
-            language: Interview language ('vi' or 'en')
+        lang_instruction = 'in Vietnamese (tiếng Việt)' if language == 'vi' else 'in English'
 
-        Returns:
-            List of question dictionaries with structure:
-            [
-                {
-                    'section': str,
-                    'question_text': str,
-                    'question_type': str,
-                    'purpose': str,
-                    'expected_duration_minutes': int,
-                    'guidelines': {'must_have': [...], 'should_avoid': [...]},
-                    'popup_questions': [...]
-                },
-                ...
-            ]
-        """
-        try:
-            import json
-
-            lang_instruction = 'in Vietnamese (tiếng Việt)' if language == 'vi' else 'in English'
-
-            # Build question generation prompt
-            question_prompt = f"""
+        return f"""
 You are an expert interview question designer. Based on the candidate and job information below, create 10-15 structured interview questions {lang_instruction}.
 
 Candidate & Job Info:
@@ -451,57 +608,39 @@ IMPORTANT:
 - Content must be {lang_instruction}.
 """
 
-            # Call GPT
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{
-                    'role': 'user',
-                    'content': question_prompt
-                }],
-                # temperature removed for gpt-5-mini default (1)
-                max_completion_tokens=5000
-            )
+    def generate_personalized_questions(self, extracted_info: dict, style: str, language: str) -> list:
+        """
+        Generate personalized interview questions based on extracted candidate/job info.
 
-            result_text = response.choices[0].message.content.strip()
-            
-            # Extract JSON using regex (looking for object with "questions" key or just list)
-            import re
-            questions = []
-            
-            # Try to find JSON object structure first
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                try:
-                    data = json.loads(json_match.group(0))
-                    if 'questions' in data and isinstance(data['questions'], list):
-                        questions = data['questions']
-                except:
-                    pass
-            
-            # If that failed, try finding a list structure directly
-            if not questions:
-                list_match = re.search(r'\[.*\]', result_text, re.DOTALL)
-                if list_match:
-                    try:
-                        questions = json.loads(list_match.group(0))
-                    except:
-                        pass
-
-            # Fallback cleaning if regex failed
-            if not questions:
-                if result_text.startswith('```'):
-                    result_text = result_text.split('```')[1]
-                    if result_text.startswith('json'):
-                        result_text = result_text[4:]
-                    result_text = result_text.strip()
-                try:
-                    parsed = json.loads(result_text)
-                    if isinstance(parsed, dict) and 'questions' in parsed:
-                        questions = parsed['questions']
-                    elif isinstance(parsed, list):
-                        questions = parsed
-                except:
-                    pass
+        Args:
+            extracted_info: Dictionary with candidate and job information
+            style: Interview style
+            language: Interview language ('vi' or 'en')
+
+        Returns:
+            List of question dictionaries with structure:
+            [
+                {
+                    'section': str,
+                    'question_text': str,
+                    'question_type': str,
+                    'purpose': str,
+                    'expected_duration_minutes': int,
+                    'guidelines': {'must_have': [...], 'should_avoid': [...]},
+                    'popup_questions': [...]
+                },
+                ...
+            ]
+
+        Raises:
+            Exception if the call fails or fewer than 3 valid questions come back after the repair retry
+        """
+        try:
+            question_prompt = self.build_personalized_questions_prompt(extracted_info, style, language)
+
+            questions = self._create_structured(
+                'personalized_questions', question_prompt, personalized_questions_output
+            )['questions']
 
             # Validate
             if not isinstance(questions, list) or len(questions) < 3:
@@ -511,51 +650,110 @@ IMPORTANT:
             return questions
 
         except Exception as e:
+            # No canned question set: the job retries or fails instead
             print(f"[ERROR] Question generation failed: {str(e)}")
-            print(f"[DEBUG] AI response raw: {result_text}")
-            
-            # ROBUST FALLBACK: Return default questions instead of crashing
-            print("[WARN] Using fallback questions due to generation error.")
-            
-            fallback_qs = [
-                {
-                    "section": "Section 1: Background & Experience",
-                    "question_text": "Hãy giới thiệu ngắn gọn về bản thân và những kinh nghiệm làm việc nổi bật nhất của bạn liên quan đến vị trí này." if language == 'vi' else "Please briefly introduce yourself and highlight your most relevant work experience for this position.",
-                    "question_type": "Behavioral",
-                    "purpose": "Ice breaker and background check",
-                    "expected_duration_minutes": 3,
-                    "guidelines": {"must_have": ["Overview of experience"], "should_avoid": ["Too detailed personal life"]},
-                    "popup_questions": []
-                },
-                {
-                    "section": "Section 2: Technical Skills",
-                    "question_text": "Trong dự án gần đây nhất, bạn đã gặp phải thử thách kỹ thuật (hoặc chuyên môn) nào khó khăn nhất và bạn đã giải quyết nó như thế nào?" if language == 'vi' else "In your most recent project, what was the most challenging technical (or professional) problem you faced, and how did you resolve it?",
-                    "question_type": "Technical",
-                    "purpose": "Problem solving skills",
-                    "expected_duration_minutes": 5,
-                    "guidelines": {"must_have": ["STAR method", "Specific solution"], "should_avoid": ["Vague description"]},
-                    "popup_questions": ["What would you do differently?"]
-                },
-                 {
-                    "section": "Section 3: Soft Skills",
-                    "question_text": "Hãy kể về một lần bạn phải thuyết phục người khác chấp nhận ý kiến của mình. Kết quả ra sao?" if language == 'vi' else "Tell me about a time you had to persuade someone to accept your idea. What was the outcome?",
-                    "question_type": "Behavioral",
-                    "purpose": "Communication and influence",
-                    "expected_duration_minutes": 4,
-                    "guidelines": {"must_have": ["Context", "Action"], "should_avoid": []},
-                    "popup_questions": []
-                },
-                {
-                    "section": "Section 4: Goals",
-                    "question_text": "Bạn định hướng phát triển bản thân như thế nào trong 2-3 năm tới?" if language == 'vi' else "How do you see yourself developing in the next 2-3 years?",
-                    "question_type": "Situational",
-                    "purpose": "Career alignment",
-                    "expected_duration_minutes": 3,
-                    "guidelines": {"must_have": ["Clear goals"], "should_avoid": []},
-                    "popup_questions": []
-                }
-            ]
-            return fallback_qs
+            raise Exception(f"Lỗi khi tạo câu hỏi: {str(e)}")
+
+    def generate_personalized_questions_stream(self, extracted_info: dict, style: str, language: str):
+        """
+        Streaming variant of generate_personalized_questions.
+
+        Yields each question dict as soon as its JSON object is complete in the
+        token stream. Errors propagate (no fallback) so the caller can decide
+        what to do with the questions received so far; a stream that ends
+        before the array's closing bracket raises as well.
+        """
+        question_prompt = self.build_personalized_questions_prompt(extracted_info, style, language)
+        parser = JsonArrayStreamParser()
+
+        with track_llm_call('personalized_questions_stream') as call:
+            response = self._create(
+                messages=[{
+                    'role': 'user',
+                    'content': question_prompt
+                }],
+                max_completion_tokens=5000,
+                stream=True,
+                stream_options={'include_usage': True},
+                **self._response_format_kwargs(personalized_questions_output)
+            )
+
+            for chunk in response:
+                if chunk.usage:
+                    call.record_usage(chunk.usage)
+                if chunk.choices and len(chunk.choices) > 0:
+                    delta = chunk.choices[0].delta
+                    if hasattr(delta, 'content') and delta.content:
+                        call.first_token()
+                        for question in parser.feed(delta.content):
+                            if question_output.errors(question):
+                                parse_failures.inc(call_type='personalized_questions_stream', reason='schema')
+                                continue
+                            yield question
+
+        if parser.errors:
+            parse_failures.inc(parser.errors, call_type='personalized_questions_stream', reason='json')
+            print(f"[WARN] Skipped {parser.errors} malformed question(s) in stream")
+        if not parser.complete:
+            raise Exception(f"Question stream ended early after {parser.items} question(s)")
+
+    def analyze_and_generate_questions(self, file_texts: list, style: str, language: str) -> tuple:
+        """
+        Fused personalized setup: extract the candidate/job profile and design the
+        question set in a single structured response (one round trip instead of
+        analyze_files_and_extract_info followed by generate_personalized_questions).
+
+        Args:
+            file_texts: List of extracted text strings from uploaded files
+            style: Interview style
+            language: Interview language ('vi' or 'en')
+
+        Returns:
+            (extracted_info, questions) with the same shapes as the two-step calls
+
+        Raises:
+            Exception if the response is unusable after the repair retry (no
+            fallback data, so the caller can fall back to the two-step path)
+        """
+        lang_instruction = 'in Vietnamese (tiếng Việt)' if language == 'vi' else 'in English'
+
+        prompt = f"""
+You are an expert recruiter and interview question designer. Analyze the documents below, then design a structured interview for this candidate.
+
+{self.combine_file_texts(file_texts)}
+
+Return a SINGLE JSON object with two keys:
+
+1. "profile": the candidate and job information extracted from the documents:
+- position: detected job title (infer from skills and experience if unclear)
+- industry: one of IT, Marketing, Sales, Finance, HR (closest match)
+- candidate_skills: 5-10 most relevant skills
+- experience_level: Intern, Junior, Senior, or Manager
+- job_requirements: summary of key job requirements if a JD is provided, otherwise N/A
+- candidate_background: brief summary of the candidate's experience and qualifications
+- key_focus_areas: 3-5 areas to focus on during the interview
+
+2. "questions": 10-15 interview questions {lang_instruction}, tailored to that profile and to the interview style "{style}":
+- 3-4 questions for Section 1: Background & Experience
+- 3-4 questions for Section 2: Technical/Domain Skills
+- 2-3 questions for Section 3: Behavioral & Soft Skills
+- 2-3 questions for Section 4: Future Goals & Cultural Fit
+Each question has: section, question_text, question_type ("Behavioral", "Technical" or "Situational"), purpose, expected_duration_minutes (int), guidelines {{ "must_have": [], "should_avoid": [] }}, popup_questions [ "Follow-up 1", "Follow-up 2" ].
+
+Question content must be {lang_instruction}. No markdown, no explanation.
+"""
+
+        result = self._create_structured(
+            'analyze_and_generate', prompt, fused_setup_output, max_completion_tokens=8000
+        )
+        extracted_info, questions = result['profile'], result['questions']
+
+        if len(questions) < 3:
+            raise Exception("Insufficient valid questions generated")
+
+        print(f"[SUCCESS] Fused setup: position={extracted_info.get('position')}, "
+              f"industry={extracted_info.get('industry')}, {len(questions)} questions")
+        return extracted_info, questions
 
 
 # Singleton instance
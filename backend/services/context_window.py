@@ -0,0 +1,183 @@
+"""
+Context Window Manager for TrueMirror
+Keeps the prompt for each interview turn bounded: the last K turns are sent
+verbatim and older turns are folded into a rolling summary persisted on
+InterviewSession. The summary is updated incrementally in the background
+after a turn completes, so it never delays the next reply.
+
+Unsummarized turns that do not fit the token budget are cut from that turn's
+prompt; the cut is counted, logged and recorded in the state store so the next
+background fold covers them even inside the verbatim window.
+"""
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from config import Config
+from models import db, InterviewSession
+from services.metrics import registry
+from services.state_store import state_store
+
+context_truncated_messages = registry.counter(
+    'truemirror_context_truncated_messages_total',
+    'Unsummarized messages cut from a prompt by the token budget', ('mode',))
+
+
+def truncation_key(session_id: int) -> str:
+    return f"context_truncated:{session_id}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) for budgeting."""
+    return math.ceil(len(text or '') / 4) + 4
+
+
+def get_token_budget(session) -> int:
+    """Prompt token budget for the session type."""
+    budgets = Config.CONTEXT_TOKEN_BUDGETS
+    return budgets.get(session.mode or 'standard', budgets['standard'])
+
+
+def get_dialogue(conversation_history: List[Dict]) -> List[Dict]:
+    """Conversation messages sent to the model (system messages excluded)."""
+    return [msg for msg in conversation_history if msg.get('role') != 'system']
+
+
+def build_context_messages(session, conversation_history: List[Dict], system_prompt: str) -> List[Dict]:
+    """
+    Build the non-system part of the prompt within the session's token budget.
+
+    Args:
+        session: InterviewSession (provides the rolling summary and mode)
+        conversation_history: Full message history
+        system_prompt: Compiled system prompt (counted against the budget)
+
+    Returns:
+        List of {role, content} dicts: optional summary message + recent turns
+    """
+    dialogue = get_dialogue(conversation_history)
+    summary = session.context_summary
+    summary_upto = min(session.context_summary_upto or 0, len(dialogue)) if summary else 0
+
+    messages = []
+    budget = get_token_budget(session) - estimate_tokens(system_prompt)
+
+    if summary:
+        summary_message = {
+            'role': 'system',
+            'content': f"TÓM TẮT PHẦN PHỎNG VẤN TRƯỚC ĐÓ (các lượt cũ đã được lược bớt):\n{summary}"
+        }
+        messages.append(summary_message)
+        budget -= estimate_tokens(summary_message['content'])
+
+    # Walk back from the newest message until the budget is spent (always keep the last one)
+    recent = []
+    for msg in reversed(dialogue[summary_upto:]):
+        cost = estimate_tokens(msg['content'])
+        if recent and cost > budget:
+            break
+        recent.append({'role': msg['role'], 'content': msg['content']})
+        budget -= cost
+
+    recent.reverse()
+    messages.extend(recent)
+
+    # Messages between the summary and the verbatim window were cut by the budget
+    kept_from = len(dialogue) - len(recent)
+    truncated = kept_from - summary_upto
+    if truncated > 0:
+        context_truncated_messages.inc(truncated, mode=session.mode or 'standard')
+        state_store.set(truncation_key(session.id), kept_from, ttl=Config.SESSION_CACHE_TTL_SECONDS)
+        print(f"[WARN] Session {session.id}: {truncated} unsummarized message(s) cut by the token budget, "
+              f"queued for the summary")
+
+    return messages
+
+
+def pending_fold(session, conversation_history: List[Dict]) -> List[Dict]:
+    """
+    Messages not in the summary yet that are older than the last K turns, or
+    that the token budget already cut from a prompt (folded without batching).
+    """
+    dialogue = get_dialogue(conversation_history)
+    keep_messages = Config.CONTEXT_KEEP_TURNS * 2
+    fold_until = len(dialogue) - keep_messages
+    summary_upto = session.context_summary_upto or 0
+
+    truncated_upto = min(state_store.get(truncation_key(session.id)) or 0, len(dialogue))
+    if truncated_upto > summary_upto:
+        return dialogue[summary_upto:max(fold_until, truncated_upto)]
+
+    if fold_until - summary_upto < Config.CONTEXT_SUMMARY_MIN_TURNS * 2:
+        return []
+
+    return dialogue[summary_upto:fold_until]
+
+
+class ContextSummarizer:
+    """Background pool that folds old turns into each session's rolling summary."""
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='context-summary')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, app, session_id: int):
+        """Queue a summary update for a session (no-op if one is already running)."""
+        with self._lock:
+            if session_id in self._in_flight:
+                return
+            self._in_flight.add(session_id)
+
+        self._executor.submit(self._run, app, session_id)
+
+    def _run(self, app, session_id: int):
+        try:
+            with app.app_context():
+                try:
+                    self.update_summary(session_id)
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            print(f"[ERROR] Context summary update failed for session {session_id}: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(session_id)
+
+    def update_summary(self, session_id: int):
+        """Fold pending turns into the persisted summary (runs inside an app context)."""
+        from services.azure_gpt_service import gpt_service
+        from services.session_cache import get_conversation_history
+
+        session = InterviewSession.query.get(session_id)
+        if not session:
+            return
+
+        history = get_conversation_history(session_id)
+        to_fold = pending_fold(session, history)
+        if not to_fold:
+            return
+
+        summary = gpt_service.summarize_conversation(
+            session.context_summary,
+            to_fold,
+            language=session.language,
+            max_completion_tokens=Config.CONTEXT_SUMMARY_MAX_COMPLETION_TOKENS
+        )
+
+        session.context_summary = summary
+        session.context_summary_upto = (session.context_summary_upto or 0) + len(to_fold)
+        db.session.commit()
+
+        print(f"[INFO] Context summary for session {session_id} now covers {session.context_summary_upto} messages")
+
+
+# Singleton instance
+context_summarizer = ContextSummarizer(max_workers=Config.CONTEXT_SUMMARY_WORKERS)
+
+
+def maybe_schedule_summary(app, session, conversation_history: List[Dict]):
+    """Schedule a background fold once enough turns fall outside the verbatim window."""
+    if pending_fold(session, conversation_history):
+        context_summarizer.schedule(app, session.id)
@@ -0,0 +1,146 @@
+"""
+Conversation Store for TrueMirror
+Persists interview messages as append-only rows in `conversation_messages`
+instead of rewriting the whole `Conversation.messages_json` blob every turn.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List
+from models import db, Conversation, ConversationMessage
+
+
+def _parse_timestamp(value):
+    """Parse an ISO timestamp from a message dict (None if missing/invalid)."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_legacy_messages(session_id: int) -> List[Dict]:
+    """Read messages from the legacy JSON blob (sessions not yet backfilled)."""
+    conversation = Conversation.query.filter_by(session_id=session_id).first()
+    if conversation and conversation.messages_json:
+        return json.loads(conversation.messages_json)
+    return []
+
+
+def get_last_seq(session_id: int) -> int:
+    """Return the sequence number of the last persisted message (0 if none)."""
+    last_seq = db.session.query(db.func.max(ConversationMessage.seq))\
+        .filter(ConversationMessage.session_id == session_id).scalar()
+    return last_seq or 0
+
+
+def load_messages(session_id: int, after_seq: int = 0) -> List[Dict]:
+    """
+    Load conversation messages for a session.
+
+    Args:
+        session_id: Interview session ID
+        after_seq: Only return messages with seq > after_seq (suffix read)
+
+    Returns:
+        List of {role, content, timestamp} dicts in conversation order
+    """
+    rows = ConversationMessage.query\
+        .filter(ConversationMessage.session_id == session_id, ConversationMessage.seq > after_seq)\
+        .order_by(ConversationMessage.seq).all()
+
+    if rows or after_seq:
+        return [row.to_dict() for row in rows]
+
+    return _load_legacy_messages(session_id)
+
+
+def load_messages_for_sessions(session_ids: List[int]) -> Dict[int, List[Dict]]:
+    """Load full conversations for many sessions with a single query."""
+    conversations = {session_id: [] for session_id in session_ids}
+    if not session_ids:
+        return conversations
+
+    rows = ConversationMessage.query\
+        .filter(ConversationMessage.session_id.in_(session_ids))\
+        .order_by(ConversationMessage.session_id, ConversationMessage.seq).all()
+
+    for row in rows:
+        conversations[row.session_id].append(row.to_dict())
+
+    # Sessions without rows may still only exist as a legacy blob
+    missing = [session_id for session_id, messages in conversations.items() if not messages]
+    if missing:
+        for conversation in Conversation.query.filter(Conversation.session_id.in_(missing)).all():
+            conversations[conversation.session_id] = json.loads(conversation.messages_json)
+
+    return conversations
+
+
+def append_messages(session_id: int, messages: List[Dict], start_seq: int, commit: bool = True) -> int:
+    """
+    Insert messages as new rows starting at start_seq + 1 and record the
+    assigned `seq` on each message dict.
+
+    Returns:
+        The new last sequence number
+    """
+    seq = start_seq
+    for message in messages:
+        seq += 1
+        db.session.add(ConversationMessage(
+            session_id=session_id,
+            seq=seq,
+            role=message['role'],
+            content=message.get('content') or '',
+            timestamp=_parse_timestamp(message.get('timestamp'))
+        ))
+        message['seq'] = seq  # marks the dict as stored for the next save_messages
+
+    if commit:
+        db.session.commit()
+
+    return seq
+
+
+def save_messages(session_id: int, messages: List[Dict], commit: bool = True) -> int:
+    """
+    Persist a conversation by appending only the messages not stored yet.
+    Write volume per turn is the new messages, not the whole history.
+
+    Stored messages carry their row `seq` (see ConversationMessage.to_dict),
+    so the new ones are those after the last stored message that have no
+    `seq` yet; the in-memory history may be trimmed or have dropped an
+    unsaved message without shifting what gets written. Histories with no
+    `seq` at all (legacy blob, or cached before seqs were recorded) fall
+    back to their position.
+
+    Returns:
+        Number of rows inserted
+    """
+    last_seq = get_last_seq(session_id)
+    stored_at = [index for index, message in enumerate(messages) if message.get('seq')]
+
+    if stored_at:
+        tail_start = stored_at[-1] + 1
+        skipped = sum(1 for message in messages[:tail_start] if not message.get('seq'))
+        if skipped:
+            print(f"[WARN] Session {session_id}: {skipped} unsaved message(s) before the last stored one, not appended")
+        if messages[stored_at[-1]]['seq'] != last_seq:
+            print(f"[WARN] Session {session_id}: history ends at seq {messages[stored_at[-1]]['seq']} "
+                  f"but the database has {last_seq}; appending after {last_seq}")
+        new_messages = [message for message in messages[tail_start:] if not message.get('seq')]
+    else:
+        if len(messages) < last_seq:
+            print(f"[WARN] Session {session_id}: history has {len(messages)} message(s) but {last_seq} are stored; "
+                  f"nothing appended")
+            return 0
+        new_messages = messages[last_seq:]
+
+    if new_messages:
+        append_messages(session_id, new_messages, last_seq, commit=commit)
+
+    return len(new_messages)
@@ -0,0 +1,221 @@
+"""
+Evaluation Jobs for TrueMirror
+Background job handlers for the LLM work that used to run inline on request
+threads:
+- session_evaluation: final interview evaluation, streamed to the interview
+  room as `evaluation_chunk` events and saved once at the end
+- overall_assessment: the user's rolling overall assessment. Only evaluations
+  of sessions the assessment does not cover yet are folded in, so cost does
+  not grow with the user's history; a full rebuild is available on demand (batch
+  pool, so it never delays interactive jobs)
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Dict, List
+from models import db, InterviewSession, UserAssessment
+from services.azure_gpt_service import gpt_service
+from services.conversation_store import save_messages
+from services.job_queue import job_queue, PermanentJobError
+from services.session_cache import conversation_cache, get_conversation_history
+from services.stream_emitter import ChunkCoalescer
+
+EVALUATION_PROMPT = """
+Dựa trên cuộc phỏng vấn vừa rồi, hãy tạo đánh giá tổng kết chi tiết theo định dạng markdown **chặt chẽ**.
+Yêu cầu kết quả gồm đúng 4 phần sau với nội dung rõ ràng:
+### 1. ĐIỂM MẠNH (Strengths)
+Liệt kê 3–5 điểm mạnh nổi bật của ứng viên. Mỗi điểm bắt đầu bằng "- ".
+### 2. ĐIỂM CẦN PHÁT TRIỂN (Areas for Improvement)
+Liệt kê 2–4 điểm cần cải thiện. Mỗi điểm bắt đầu bằng "- ".
+### 3. ĐÁNH GIÁ TỔNG QUAN (Overall Assessment)
+Viết 1–2 đoạn ngắn gọn, dễ đọc về tổng quan hiệu suất và gợi ý cho lần phỏng vấn tiếp theo. Không dùng list trong phần này.
+### 4. ĐIỂM SỐ (Score)
+Cho điểm theo thang X/10, ghi rõ ở đầu dòng dạng "**Score: X/10**".
+
+**Luôn giữ đúng markdown format với các tiêu đề và dấu đầu dòng như trên.** Viết ngắn gọn, cụ thể, tránh lặp lại.
+"""
+
+NO_EVALUATIONS_MESSAGE = 'Bạn chưa có đánh giá phỏng vấn nào. Hãy hoàn thành ít nhất một buổi phỏng vấn và nhấn "Tổng kết phỏng vấn" để có đánh giá.'
+
+
+def session_room(session_id: int) -> str:
+    """Socket.IO room of an interview session."""
+    return f"session_{session_id}"
+
+
+def format_evaluation_message(evaluation: str) -> str:
+    """Transcript message shown for a final evaluation."""
+    return f"## 📊 ĐÁNH GIÁ TỔNG KẾT\n\n{evaluation}\n\n---\n\n✅ **Cảm ơn bạn đã tham gia buổi phỏng vấn!**"
+
+
+def build_evaluation_messages(conversation_history: List[Dict]) -> List[Dict]:
+    """Interview transcript followed by the evaluation instructions."""
+    messages = [
+        {'role': msg['role'], 'content': msg['content']}
+        for msg in conversation_history
+        if msg.get('role') != 'system'
+    ]
+    messages.append({'role': 'user', 'content': EVALUATION_PROMPT})
+    return messages
+
+
+def generate_final_evaluation(conversation_history: List[Dict], on_chunk=None) -> str:
+    """
+    Generate comprehensive evaluation at end of interview.
+    on_chunk: called with each streamed piece of the evaluation as it arrives
+    Raises: the provider error, so a failed evaluation is never saved as the evaluation
+    """
+    evaluation = ""
+    for chunk in gpt_service.get_chat_response_stream(
+        build_evaluation_messages(conversation_history), call_type='evaluation_stream'
+    ):
+        evaluation += chunk
+        if on_chunk:
+            on_chunk(chunk)
+    return evaluation
+
+
+def run_session_evaluation(job, progress) -> Dict:
+    """
+    Job handler for kind 'session_evaluation'.
+    Payload: {session_id}. Streams the evaluation to the session room, then saves
+    the evaluation and its transcript message in one transaction.
+    """
+    session_id = job.payload['session_id']
+    session = InterviewSession.query.get(session_id)
+    if not session or session.user_id != job.user_id:
+        raise PermanentJobError('Session not found')
+
+    socketio = job_queue.socketio
+    room = session_room(session_id)
+
+    # A retry starts over: the client clears whatever a failed attempt streamed
+    socketio.emit('evaluation_started', {
+        'session_id': session_id,
+        'job_id': job.id,
+        'attempt': job.attempts
+    }, to=room)
+
+    conversation_history = get_conversation_history(session_id)
+    with ChunkCoalescer(lambda text: socketio.emit('evaluation_chunk', {
+        'session_id': session_id,
+        'chunk': text
+    }, to=room)) as frames:
+        evaluation = generate_final_evaluation(conversation_history, on_chunk=frames.push)
+
+    evaluation_message = {
+        'role': 'assistant',
+        'content': format_evaluation_message(evaluation),
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+    conversation_history.append(evaluation_message)
+    session.evaluation = evaluation
+    session.evaluated_at = datetime.now(timezone.utc)
+    save_messages(session_id, conversation_history, commit=False)
+    db.session.commit()
+    conversation_cache.set(session_id, conversation_history)
+
+    socketio.emit('session_evaluated', {
+        'session_id': session_id,
+        'evaluation': evaluation,
+        'message': evaluation_message
+    }, to=room)
+
+    print(f"[SUCCESS] Session {session_id} evaluated and saved to conversation")
+    return {'session_id': session_id}
+
+
+def on_session_evaluation_failed(job, error: str):
+    """Nothing was saved; the client drops the partial evaluation and can retry."""
+    session_id = int(job.target)  # the payload is cleared once the job is over
+    job_queue.socketio.emit('evaluation_error', {
+        'session_id': session_id,
+        'job_id': job.id,
+        'message': 'Không thể tạo đánh giá lúc này. Vui lòng thử lại sau ít giây.'
+    }, to=session_room(session_id))
+
+
+def run_overall_assessment(job, progress) -> Dict:
+    """
+    Job handler for kind 'overall_assessment'.
+    Payload: {rebuild}. Folds the evaluated sessions the assessment does not
+    cover yet (covered_session_ids) into the existing assessment; rebuilds
+    from every evaluated session when asked to, when there is no assessment
+    yet, or when a covered session was re-evaluated since the watermark (its
+    old evaluation is baked into the assessment and cannot be swapped out).
+    The watermark is only that re-evaluation hint: a session whose evaluation
+    commits late is still picked up, since it is not covered.
+    """
+    user_id = job.user_id
+    started_at = datetime.now(timezone.utc)
+    assessment = UserAssessment.query.filter_by(user_id=user_id).first()
+    evaluated = InterviewSession.query.filter_by(user_id=user_id)\
+        .filter(InterviewSession.evaluation.isnot(None))
+
+    incremental = bool(assessment and assessment.covered_session_ids and not job.payload.get('rebuild'))
+    revised = 0
+
+    if incremental:
+        covered_ids = assessment.covered_ids
+        conditions = [InterviewSession.id.notin_(covered_ids)]
+        if assessment.watermark_at:
+            conditions.append(InterviewSession.evaluated_at > assessment.watermark_at)
+        changed = evaluated.filter(db.or_(*conditions)).order_by(InterviewSession.created_at.asc()).all()
+        sessions = [session for session in changed if session.id not in covered_ids]
+        revised = len(changed) - len(sessions)
+        if revised:
+            print(f"[INFO] {revised} covered session(s) re-evaluated for user {user_id}, rebuilding assessment")
+            incremental = False
+
+    if not incremental:
+        covered_ids = set()
+        changed = sessions = evaluated.order_by(InterviewSession.created_at.asc()).all()
+
+        if not sessions:
+            return {'assessment': None, 'message': NO_EVALUATIONS_MESSAGE, 'total_sessions': 0}
+
+    if incremental and not sessions:
+        print(f"[INFO] Assessment for user {user_id} is up to date ({assessment.sessions_covered} sessions)")
+        return {'assessment': assessment.to_dict(), 'total_sessions': assessment.sessions_covered,
+                'new_sessions': 0, 'revised_sessions': 0, 'mode': 'unchanged'}
+
+    # Re-evaluation hint: newest evaluation read (sessions evaluated before
+    # evaluated_at existed count as of this run)
+    watermark_at = max((session.evaluated_at for session in changed if session.evaluated_at), default=started_at)
+    if incremental and assessment.watermark_at:
+        watermark_at = max(watermark_at, assessment.watermark_at)
+
+    covered_ids |= {session.id for session in sessions}
+    progress('generating', 20, total_sessions=len(covered_ids))
+    evaluations = [session.evaluation for session in sessions]
+    if incremental:
+        assessment_content = gpt_service.update_overall_assessment(
+            assessment.assessment_content, evaluations, assessment.sessions_covered)
+    else:
+        assessment_content = gpt_service.generate_overall_assessment(evaluations)
+
+    # Save or update assessment in database
+    if assessment:
+        assessment.assessment_content = assessment_content
+        assessment.updated_at = datetime.now(timezone.utc)
+    else:
+        assessment = UserAssessment(user_id=user_id, assessment_content=assessment_content)
+        db.session.add(assessment)
+    assessment.watermark_at = watermark_at
+    assessment.covered_session_ids = json.dumps(sorted(covered_ids))
+    assessment.sessions_covered = len(covered_ids)
+
+    db.session.commit()
+
+    mode = 'incremental' if incremental else 'rebuild'
+    print(f"[SUCCESS] Assessment for user {user_id} saved ({mode}: {len(sessions)} evaluation(s), "
+          f"{assessment.sessions_covered} sessions covered)")
+
+    return {'assessment': assessment.to_dict(), 'total_sessions': assessment.sessions_covered,
+            'new_sessions': len(sessions), 'revised_sessions': revised, 'mode': mode}
+
+
+job_queue.register('session_evaluation', run_session_evaluation, event='evaluation_progress',
+                   max_attempts=3, on_failure=on_session_evaluation_failed)
+job_queue.register('overall_assessment', run_overall_assessment, event='assessment_progress',
+                   pool='batch', max_attempts=3)
@@ -1,13 +1,18 @@
 """
 File Processing Service for TrueMirror
 Converts files to base64 for Azure GPT-4 Vision API processing
-No local OCR needed - all processing done via Azure API
+PDF pages with a usable text layer are read locally with PyMuPDF; only scanned
+pages (empty or garbage text layer) are rasterized for the Vision API
 """
 
 import base64
 import os
+import unicodedata
 from typing import Dict, List
 from werkzeug.datastructures import FileStorage
+from config import Config
+from services.vision_cache import hash_bytes
+from services.image_prep import prepare_image
 
 # Only need python-docx for DOCX text extraction
 try:
@@ -41,6 +46,14 @@ class FileProcessor:
     # Max file size in bytes (1MB = 1024 * 1024)
     MAX_FILE_SIZE = 1 * 1024 * 1024  # 1MB
 
+    # A PDF text layer is trusted if it has enough characters and most of them are readable
+    PDF_TEXT_MIN_CHARS = 20
+    PDF_TEXT_MIN_READABLE_RATIO = 0.85
+
+    # Approximate size of a 200 DPI JPEG q95 page render (as pages were sent before
+    # image prep) per pixel; only feeds the bytes-saved report, so no page is encoded twice
+    LEGACY_PAGE_JPEG_BYTES_PER_PIXEL = 0.3
+
     def __init__(self):
         """Initialize FileProcessor."""
         pass
@@ -119,52 +132,111 @@ class FileProcessor:
             except Exception as e:
                 raise Exception(f"Lỗi khi đọc file TXT: {str(e)}")
 
-    def convert_pdf_to_images(self, file_content: bytes) -> list:
+    def is_usable_text_layer(self, text: str) -> bool:
         """
-        Convert PDF pages to images for Vision API processing.
-        Uses PyMuPDF (fitz) - NO poppler dependency needed!
+        Check whether a PDF page's embedded text is real text rather than a scan
+        (no text layer) or garbage (broken font encoding, replacement glyphs).
+
+        Args:
+            text: Text extracted from the page's text layer
+
+        Returns:
+            True if the text can be used without OCR
+        """
+        # Compose decomposed text first (PDFs often store Vietnamese diacritics as
+        # base letter + combining mark) so each accented letter counts once
+        text = unicodedata.normalize('NFC', text or '')
+        chars = [c for c in text if not c.isspace()]
+        if len(chars) < self.PDF_TEXT_MIN_CHARS:
+            return False
+
+        # Letters (with any marks that did not compose), digits and ordinary
+        # punctuation/symbols count as readable; U+FFFD, private-use and
+        # control characters come from unmapped glyphs
+        readable = sum(
+            1 for c in chars
+            if c != '\ufffd' and unicodedata.category(c)[0] in ('L', 'M', 'N', 'P', 'S')
+        )
+        return readable / len(chars) >= self.PDF_TEXT_MIN_READABLE_RATIO
+
+    def render_pdf_page(self, page) -> Dict:
+        """
+        Render one PyMuPDF page to a base64 JPEG dict for the Vision API.
+
+        Args:
+            page: fitz.Page
+
+        Returns:
+            Base64 image dict
+        """
+        # Render page to image (matrix for 200 DPI: 200/72 = 2.78), then downscale to budget
+        mat = fitz.Matrix(2.78, 2.78)
+        pix = page.get_pixmap(matrix=mat)
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples) if pix.n == 3 else Image.open(io.BytesIO(pix.tobytes("png")))
+
+        # Estimated size of the page as previously sent, for the bytes-saved report
+        legacy_bytes = int(pix.width * pix.height * self.LEGACY_PAGE_JPEG_BYTES_PER_PIXEL)
+
+        image_dict, _ = prepare_image(image, legacy_bytes, label=f"PDF page {page.number + 1}")
+        return image_dict
+
+    def extract_pdf_pages(self, file_content: bytes) -> List[Dict]:
+        """
+        Read a PDF page by page: use the text layer where it is usable and
+        rasterize only the remaining (scanned/garbled) pages for the Vision API.
 
         Args:
             file_content: PDF file content as bytes
 
         Returns:
-            List of base64 image dicts (one per page)
+            List of page dicts in page order:
+            [{'page_number': int, 'source': 'text_layer' | 'vision',
+              'text': str or None, 'image': base64 image dict or None}, ...]
         """
         if not fitz or not Image:
             raise Exception("Cần cài PyMuPDF và Pillow để đọc PDF")
 
         try:
-            # Open PDF from bytes using PyMuPDF
             pdf_document = fitz.open(stream=file_content, filetype="pdf")
 
-            base64_images = []
-
-            # Iterate through each page
+            pages = []
             for page_num in range(pdf_document.page_count):
                 page = pdf_document[page_num]
+                text = page.get_text("text").strip()
+
+                if self.is_usable_text_layer(text):
+                    pages.append({'page_number': page_num + 1, 'source': 'text_layer', 'text': text, 'image': None})
+                else:
+                    pages.append({'page_number': page_num + 1, 'source': 'vision', 'text': None, 'image': self.render_pdf_page(page)})
+
+            pdf_document.close()
+
+            vision_pages = sum(1 for page in pages if page['source'] == 'vision')
+            print(f"[INFO] PDF has {len(pages)} page(s): {len(pages) - vision_pages} from text layer, {vision_pages} need Vision API")
+            return pages
+
+        except Exception as e:
+            raise Exception(f"Lỗi khi đọc PDF: {str(e)}")
 
-                # Render page to image (matrix for 200 DPI: 200/72 = 2.78)
-                mat = fitz.Matrix(2.78, 2.78)
-                pix = page.get_pixmap(matrix=mat)
+    def convert_pdf_to_images(self, file_content: bytes) -> list:
+        """
+        Convert PDF pages to images for Vision API processing.
+        Uses PyMuPDF (fitz) - NO poppler dependency needed!
 
-                # Convert pixmap to PIL Image
-                img_data = pix.tobytes("png")
-                image = Image.open(io.BytesIO(img_data))
+        Args:
+            file_content: PDF file content as bytes
 
-                # Convert to JPEG and encode to base64
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format='JPEG', quality=95)
-                img_bytes = img_byte_arr.getvalue()
+        Returns:
+            List of base64 image dicts (one per page)
+        """
+        if not fitz or not Image:
+            raise Exception("Cần cài PyMuPDF và Pillow để đọc PDF")
 
-                # Encode to base64
-                base64_data = base64.b64encode(img_bytes).decode('utf-8')
+        try:
+            # Open PDF from bytes using PyMuPDF
+            pdf_document = fitz.open(stream=file_content, filetype="pdf")
 
-                base64_images.append({
-                    'type': 'image_url',
-                    'image_url': {
-                        'url': f'data:image/jpeg;base64,{base64_data}'
-                    }
-                })
+            base64_images = [self.render_pdf_page(pdf_document[page_num]) for page_num in range(pdf_document.page_count)]
 
             pdf_document.close()
 
@@ -191,6 +263,15 @@ class FileProcessor:
             if 'pdf' in content_type:
                 return self.convert_pdf_to_images(file_content)
 
+            # Shrink to the vision pixel/byte budget when Pillow is available
+            if Image:
+                image = Image.open(io.BytesIO(file_content))
+                within_budget = image.size[0] * image.size[1] <= Config.VISION_IMAGE_MAX_PIXELS
+                image_dict, stats = prepare_image(image, len(file_content), label="uploaded image")
+                # Small, already well-compressed uploads are sent as-is
+                if not (within_budget and stats['prepared_bytes'] >= len(file_content)):
+                    return [image_dict]
+
             base64_data = base64.b64encode(file_content).decode('utf-8')
 
             # Determine image format for Azure (only images supported)
@@ -215,7 +296,8 @@ class FileProcessor:
         """
         Process a single file: validate and prepare for Azure Vision API.
 
-        For images/PDFs: Convert to base64 for Vision API
+        For images: Convert to base64 for Vision API
+        For PDFs: Text layer per page; scanned pages converted to base64 for Vision API
         For TXT/DOCX: Extract text directly
 
         Args:
@@ -227,8 +309,10 @@ class FileProcessor:
                 'filename': str,
                 'type': str,  # pdf, docx, txt, image
                 'size': int,  # in bytes
-                'text': str (if txt/docx) or None,
-                'base64_content': dict (if image/pdf) or None
+                'content_hash': str,  # SHA-256 of the file bytes (vision cache key)
+                'text': str (if txt/docx, or a PDF whose pages all have a text layer) or None,
+                'base64_content': list (image, or the PDF pages that need vision) or None,
+                'pages': list (PDF only, see extract_pdf_pages) or None
             }
 
         Raises:
@@ -257,8 +341,10 @@ class FileProcessor:
             'type': file_type,
             'size': file_size,
             'content_type': content_type,
+            'content_hash': hash_bytes(file_content),
             'text': None,
-            'base64_content': None
+            'base64_content': None,
+            'pages': None
         }
 
         try:
@@ -269,8 +355,18 @@ class FileProcessor:
             elif file_type == 'docx':
                 result['text'] = self.extract_text_from_docx(file_content)
 
-            # Handle images and PDFs via Azure Vision API (convert to base64)
-            elif file_type in ['pdf', 'image']:
+            # PDFs: local text layer, Azure Vision API only for scanned pages
+            elif file_type == 'pdf':
+                pages = self.extract_pdf_pages(file_content)
+                result['pages'] = pages
+
+                if all(page['text'] for page in pages):
+                    result['text'] = "\n\n".join(page['text'] for page in pages)
+                else:
+                    result['base64_content'] = [page['image'] for page in pages if page['image']]
+
+            # Handle images via Azure Vision API (convert to base64)
+            elif file_type == 'image':
                 result['base64_content'] = self.convert_to_base64_image(file_content, content_type)
 
             else:
@@ -0,0 +1,153 @@
+"""
+Image Preparation for TrueMirror
+Shrinks page images before they are sent to the Vision API: blank margins are
+cropped, the image is scaled to a pixel budget (what the provider would
+downsample to anyway), optionally converted to grayscale, and encoded as
+JPEG/WebP at the highest quality that fits the per-page byte target (or as
+lossless PNG when that is smaller, as for clean digital text).
+Bytes saved versus the unprepared image are logged and exported on /api/metrics.
+"""
+
+import base64
+import io
+import math
+from typing import Dict, Tuple
+from config import Config
+from services.metrics import registry
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+# Pixels lighter than this (0-255 gray) count as blank paper when cropping
+BLANK_THRESHOLD = 245
+CROP_PADDING = 16
+
+MIME_TYPES = {'jpeg': 'image/jpeg', 'webp': 'image/webp', 'png': 'image/png'}
+
+vision_image_bytes = registry.counter(
+    'truemirror_vision_image_bytes_total', 'Vision page image bytes before and after preparation', ('stage',))
+vision_image_pages = registry.counter(
+    'truemirror_vision_image_pages_total', 'Page images prepared for the Vision API')
+
+
+def flatten(image):
+    """Drop alpha/palette modes onto a white background (transparent PNGs would turn black)."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    if image.mode not in ('RGB', 'L'):
+        return image.convert('RGB')
+    return image
+
+
+def crop_margins(image, threshold: int = BLANK_THRESHOLD, padding: int = CROP_PADDING):
+    """Crop to the bounding box of non-blank content (blank pages are returned unchanged)."""
+    mask = image.convert('L').point(lambda p: 255 if p < threshold else 0)
+    bbox = mask.getbbox()
+    if not bbox:
+        return image
+
+    left, top, right, bottom = bbox
+    width, height = image.size
+    return image.crop((
+        max(0, left - padding),
+        max(0, top - padding),
+        min(width, right + padding),
+        min(height, bottom + padding)
+    ))
+
+
+def fit_pixel_budget(image, max_pixels: int, max_side: int):
+    """Downscale (never upscale) so width*height <= max_pixels and the long side <= max_side."""
+    width, height = image.size
+    scale = min(1.0, math.sqrt(max_pixels / float(width * height)), max_side / float(max(width, height)))
+    if scale >= 1.0:
+        return image
+    return image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+
+
+def encode_to_target(image, image_format: str, target_bytes: int, max_quality: int,
+                     min_quality: int) -> Tuple[bytes, str, int]:
+    """
+    Encode at the highest quality (in steps of 10) whose output fits target_bytes.
+    Grayscale pages are also tried as lossless PNG, which wins for clean digital text.
+
+    Returns:
+        (encoded bytes, format, quality)
+    """
+    pil_format = 'WEBP' if image_format == 'webp' else 'JPEG'
+    quality = max_quality
+    while True:
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, quality=quality, optimize=pil_format == 'JPEG')
+        data = buffer.getvalue()
+        if len(data) <= target_bytes or quality - 10 < min_quality:
+            break
+        quality -= 10
+
+    if image.mode == 'L':
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        if len(buffer.getvalue()) < len(data):
+            return buffer.getvalue(), 'png', 100
+
+    return data, image_format, quality
+
+
+def prepare_image(image, original_bytes: int, label: str = 'image') -> Tuple[Dict, Dict]:
+    """
+    Prepare a PIL image for the Vision API.
+
+    Args:
+        image: PIL.Image (page render or uploaded photo)
+        original_bytes: Size of the image as it would have been sent unprepared
+        label: Name used in logs
+
+    Returns:
+        (base64 image dict for the chat API, stats dict)
+    """
+    original_size = image.size
+    image_format = Config.VISION_IMAGE_FORMAT if Config.VISION_IMAGE_FORMAT in MIME_TYPES else 'jpeg'
+
+    image = flatten(ImageOps.exif_transpose(image))
+    image = crop_margins(image)
+    image = fit_pixel_budget(image, Config.VISION_IMAGE_MAX_PIXELS, Config.VISION_IMAGE_MAX_SIDE)
+    if Config.VISION_IMAGE_GRAYSCALE:
+        image = image.convert('L')
+
+    data, image_format, quality = encode_to_target(
+        image,
+        image_format,
+        Config.VISION_IMAGE_TARGET_BYTES,
+        Config.VISION_IMAGE_MAX_QUALITY,
+        Config.VISION_IMAGE_MIN_QUALITY
+    )
+
+    stats = {
+        'original_size': original_size,
+        'prepared_size': image.size,
+        'original_bytes': original_bytes,
+        'prepared_bytes': len(data),
+        'bytes_saved': max(0, original_bytes - len(data)),
+        'format': image_format,
+        'quality': quality
+    }
+
+    vision_image_pages.inc()
+    vision_image_bytes.inc(original_bytes, stage='original')
+    vision_image_bytes.inc(len(data), stage='prepared')
+    print(f"[INFO] Prepared {label}: {original_size[0]}x{original_size[1]} → {image.size[0]}x{image.size[1]}, "
+          f"{original_bytes} → {len(data)} bytes ({image_format} q{quality}, saved {stats['bytes_saved']})")
+
+    base64_data = base64.b64encode(data).decode('utf-8')
+    return {
+        'type': 'image_url',
+        'image_url': {
+            'url': f'data:{MIME_TYPES[image_format]};base64,{base64_data}'
+        }
+    }, stats
@@ -0,0 +1,446 @@
+"""
+Job Queue for TrueMirror
+Runs slow LLM work (personalized session setup, final evaluations, overall
+assessments) on background worker pools instead of on HTTP/Socket.IO handler
+threads. Jobs are persisted in the background_jobs table: the caller gets a job
+id back, workers report stage-level progress (saved on the job row and pushed
+over Socket.IO to the job's room), and queued or stalled jobs are picked up
+again after a restart.
+
+- Pools: each kind runs on a named pool, so batch-like kinds (overall
+  assessment) never queue in front of interactive ones (setup, evaluation)
+- Retries: failed attempts are requeued with exponential backoff up to the
+  kind's max_attempts; PermanentJobError fails the job immediately
+- Dedup: while a job for (user, kind, target) is queued or running, enqueuing
+  the same work returns that job instead of starting another one
+- Executors: 'local' runs jobs in the web process (dev, single host);
+  'external' only enqueues and `python worker.py` runs them
+
+Workers claim jobs with a conditional UPDATE (queued → running), so several
+processes can work the same backlog without running a job twice. The claim is
+(status 'running', attempts at claim time): a heartbeat thread renews the lease
+of every job the process is running, and progress, retry and finish only write
+while the claim still holds, so a job requeued as stalled is never finished by
+its old worker.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from models import db, BackgroundJob
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class PermanentJobError(Exception):
+    """A failure that retrying cannot fix (e.g. the target no longer exists)."""
+
+
+class JobLeaseLost(Exception):
+    """The job was requeued (lease expired) and belongs to another run now."""
+
+
+def job_room(job_id: str) -> str:
+    """Socket.IO room that receives a job's progress events."""
+    return f"job_{job_id}"
+
+
+def user_room(user_id: int) -> str:
+    """Socket.IO room that receives completion notifications for all of a user's jobs."""
+    return f"user_{user_id}"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes for timezone-aware columns
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class JobProgress:
+    """Progress reporter handed to job handlers."""
+
+    def __init__(self, queue: 'JobQueue', job: BackgroundJob, event: str):
+        self.queue = queue
+        self.job = job
+        self.event = event
+        self.attempt = job.attempts
+
+    def __call__(self, stage: str, progress: int, result: Any = None, **data):
+        """
+        Record a completed stage (also renews the job's lease) and notify watchers.
+        `result` publishes a partial result before the job finishes (replaced by
+        the handler's return value on success).
+        Raises: JobLeaseLost if the job has been requeued since this run claimed it
+        """
+        values = {'stage': stage, 'progress': progress, 'updated_at': datetime.now(timezone.utc)}
+        if result is not None:
+            values['result_json'] = json.dumps(result, ensure_ascii=False)
+        if not self.queue._update_claimed(self.job.id, self.attempt, values):
+            raise JobLeaseLost(f"Job {self.job.id} lost its lease (attempt {self.attempt})")
+
+        print(f"[INFO] Job {self.job.id} ({self.job.kind}): {stage} ({progress}%)")
+        self.queue.notify(self.job, self.event, **data)
+
+
+class JobKind:
+    """Registration of one job kind."""
+
+    def __init__(self, handler: Callable, event: str, pool: str, max_attempts: int,
+                 on_failure: Optional[Callable[[BackgroundJob, str], None]]):
+        self.handler = handler
+        self.event = event
+        self.pool = pool
+        self.max_attempts = max_attempts
+        self.on_failure = on_failure
+
+
+class JobQueue:
+    """DB-backed job queue with fixed-size worker pools per process."""
+
+    def __init__(self, pools: Dict[str, int]):
+        self.pools = dict(pools)  # pool name -> worker threads
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'job-{name}')
+            for name, size in pools.items()
+        }
+        self._kinds = {}  # kind -> JobKind
+        self._inflight = set()  # job ids submitted to this process's pools
+        self._running = {}  # job id -> claimed attempt, for jobs whose handler is running here
+        self._inflight_lock = threading.Lock()
+        self._heartbeat_thread = None
+        self.app = None
+        self.socketio = None
+
+    def init_app(self, app, socketio=None):
+        """Bind the Flask app (for worker app contexts) and Socket.IO server (for progress events)."""
+        self.app = app
+        self.socketio = socketio
+
+    def register(self, kind: str, handler: Callable[[BackgroundJob, JobProgress], Any], event: str = 'job_progress',
+                 pool: str = 'default', max_attempts: int = 1,
+                 on_failure: Optional[Callable[[BackgroundJob, str], None]] = None):
+        """
+        Register the handler for a job kind.
+
+        Args:
+            kind: Job kind stored on BackgroundJob.kind
+            handler: Callable(job, progress) returning a JSON-serializable result;
+                     raising fails the attempt with the exception message
+            event: Socket.IO event name used for this kind's progress updates
+            pool: Worker pool the kind runs on ('default' or 'batch')
+            max_attempts: Total attempts before the job is marked failed
+            on_failure: Called with (job, error) once the job has failed for good
+        """
+        if pool not in self._executors:
+            raise ValueError(f"Unknown job pool: {pool}")
+        self._kinds[kind] = JobKind(handler, event, pool, max_attempts, on_failure)
+
+    def find_active(self, kind: str, user_id: int, target: str) -> Optional[BackgroundJob]:
+        """Queued or running job of a kind for the user and target, if any."""
+        return BackgroundJob.query.filter(
+            BackgroundJob.user_id == user_id,
+            BackgroundJob.kind == kind,
+            BackgroundJob.target == target,
+            BackgroundJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(BackgroundJob.created_at.desc()).first()
+
+    def enqueue(self, kind: str, user_id: int, payload: Dict, target: Optional[str] = None) -> BackgroundJob:
+        """
+        Persist a new job and hand it to the worker pool (call inside an app context).
+        With a target, an active job for the same (user, kind, target) is returned instead.
+        """
+        if kind not in self._kinds:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        if target is not None:
+            existing = self.find_active(kind, user_id, target)
+            if existing:
+                print(f"[INFO] Job {existing.id} ({kind}) already active for user {user_id}, target {target}")
+                return existing
+
+        job = BackgroundJob(
+            kind=kind,
+            user_id=user_id,
+            target=target,
+            status='queued',
+            stage='queued',
+            payload_json=json.dumps(payload, ensure_ascii=False)
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request enqueued the same target in between (unique index on active jobs)
+            db.session.rollback()
+            existing = self.find_active(kind, user_id, target) if target is not None else None
+            if not existing:
+                raise
+            print(f"[INFO] Job {existing.id} ({kind}) already active for user {user_id}, target {target}")
+            return existing
+
+        self._dispatch(job.id, kind)
+        print(f"[INFO] Job {job.id} ({kind}) queued for user {user_id}")
+        return job
+
+    def event_for(self, kind: str) -> str:
+        """Socket.IO event name used for a job kind's progress updates."""
+        registration = self._kinds.get(kind)
+        return registration.event if registration else 'job_progress'
+
+    def notify(self, job: BackgroundJob, event: Optional[str] = None, **data):
+        """Push the job's current state to its Socket.IO room."""
+        if not self.socketio:
+            return
+        if event is None:
+            event = self.event_for(job.kind)
+
+        payload = job.to_dict()
+        payload.update(data)
+        self.socketio.emit(event, payload, to=job_room(job.id))
+
+        # Finished jobs are also announced to the user's room (any open tab of that user)
+        if job.status in ('succeeded', 'failed'):
+            self.socketio.emit('job_finished', payload, to=user_room(job.user_id))
+
+    def _dispatch(self, job_id: str, kind: str, delay: float = 0):
+        """Run the job in this process (local executor); the external worker polls instead."""
+        if Config.JOB_EXECUTOR != 'local':
+            return
+        if delay > 0:
+            timer = threading.Timer(delay, self._submit, (job_id, kind))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._submit(job_id, kind)
+
+    def _submit(self, job_id: str, kind: str):
+        with self._inflight_lock:
+            if job_id in self._inflight:
+                return
+            self._inflight.add(job_id)
+        self._executors[self._kinds[kind].pool].submit(self._run, job_id)
+
+    def _claim(self, job_id: str) -> bool:
+        now = datetime.now(timezone.utc)
+        claimed = BackgroundJob.query.filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == 'queued',
+            db.or_(BackgroundJob.run_after.is_(None), BackgroundJob.run_after <= now)
+        ).update({
+            'status': 'running',
+            'started_at': now,
+            'updated_at': now,
+            'run_after': None,
+            'attempts': BackgroundJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _update_claimed(self, job_id: str, attempt: int, values: Dict) -> bool:
+        """Update the job only while this run's claim holds (running, same attempt)."""
+        updated = BackgroundJob.query.filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == 'running',
+            BackgroundJob.attempts == attempt
+        ).update(values, synchronize_session=False)
+        db.session.commit()
+        return updated == 1
+
+    def _finish(self, job_id: str, attempt: int, event: str, result: Any = None,
+                error: Optional[str] = None) -> Optional[BackgroundJob]:
+        # Inputs (uploaded file contents) are not kept once the job is over, whatever the outcome
+        values = {'finished_at': datetime.now(timezone.utc), 'payload_json': None}
+        if error is None:
+            values.update({
+                'status': 'succeeded',
+                'stage': 'completed',
+                'progress': 100,
+                'error': None,
+                'result_json': json.dumps(result, ensure_ascii=False) if result is not None else None
+            })
+        else:
+            values.update({'status': 'failed', 'stage': 'failed', 'error': error})
+
+        if not self._update_claimed(job_id, attempt, values):
+            print(f"[WARN] Job {job_id} attempt {attempt} finished after losing its lease; result dropped")
+            return None
+
+        job = BackgroundJob.query.get(job_id)
+        self.notify(job, event)
+        return job
+
+    def _retry_delay(self, attempts: int, error: Exception) -> float:
+        """Exponential backoff between attempts; waits out an open LLM circuit."""
+        delay = min(Config.JOB_RETRY_MAX_SECONDS, Config.JOB_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+        retry_in = getattr(error, 'retry_in', None)
+        if retry_in:
+            delay = max(delay, retry_in)
+        return delay
+
+    def _retry(self, job_id: str, attempt: int, event: str, error: Exception):
+        delay = self._retry_delay(attempt, error)
+        if not self._update_claimed(job_id, attempt, {
+            'status': 'queued',
+            'stage': 'retrying',
+            'error': str(error),
+            'run_after': datetime.now(timezone.utc) + timedelta(seconds=delay)
+        }):
+            print(f"[WARN] Job {job_id} attempt {attempt} failed after losing its lease: {str(error)}")
+            return
+
+        job = BackgroundJob.query.get(job_id)
+        print(f"[WARN] Job {job_id} ({job.kind}) attempt {attempt} failed, retrying in {delay:.0f}s: {str(error)}")
+        self.notify(job, event)
+        self._dispatch(job_id, job.kind, delay)
+
+    def _ensure_heartbeat(self):
+        with self._inflight_lock:
+            if self._heartbeat_thread is None:
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, name='job-heartbeat', daemon=True)
+                self._heartbeat_thread.start()
+
+    def _heartbeat(self):
+        """Renew the lease of every job this process is running (one thread per process)."""
+        while True:
+            time.sleep(Config.JOB_HEARTBEAT_SECONDS)
+            with self._inflight_lock:
+                running = dict(self._running)
+            if not running:
+                continue
+
+            try:
+                with self.app.app_context():
+                    now = datetime.now(timezone.utc)
+                    for job_id, attempt in running.items():
+                        BackgroundJob.query.filter(
+                            BackgroundJob.id == job_id,
+                            BackgroundJob.status == 'running',
+                            BackgroundJob.attempts == attempt
+                        ).update({'updated_at': now}, synchronize_session=False)
+                    db.session.commit()
+                    db.session.remove()
+            except Exception as e:
+                print(f"[WARN] Job heartbeat failed: {str(e)}")
+
+    def _run(self, job_id: str):
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return  # already taken by another worker, or not due yet
+
+                job = BackgroundJob.query.get(job_id)
+                kind, attempt = job.kind, job.attempts
+                registration = self._kinds[kind]
+                self.notify(job, registration.event)
+
+                with self._inflight_lock:
+                    self._running[job_id] = attempt
+                self._ensure_heartbeat()
+
+                try:
+                    result = registration.handler(job, JobProgress(self, job, registration.event))
+                except JobLeaseLost as e:
+                    db.session.rollback()
+                    print(f"[WARN] {str(e)}; stopping this run")
+                except Exception as e:
+                    db.session.rollback()
+                    if attempt < registration.max_attempts and not isinstance(e, PermanentJobError):
+                        self._retry(job_id, attempt, registration.event, e)
+                        return
+
+                    print(f"[ERROR] Job {job_id} ({kind}) failed: {str(e)}")
+                    job = self._finish(job_id, attempt, registration.event, error=str(e))
+                    if job and registration.on_failure:
+                        registration.on_failure(job, str(e))
+                else:
+                    if self._finish(job_id, attempt, registration.event, result=result):
+                        print(f"[SUCCESS] Job {job_id} ({kind}) completed")
+
+            except Exception as e:
+                db.session.rollback()
+                print(f"[ERROR] Job worker crashed on {job_id}: {str(e)}")
+            finally:
+                with self._inflight_lock:
+                    self._inflight.discard(job_id)
+                    self._running.pop(job_id, None)
+                db.session.remove()
+
+    def _requeue_stalled(self) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=Config.JOB_LEASE_SECONDS)
+        stalled = BackgroundJob.query.filter(
+            BackgroundJob.status == 'running',
+            BackgroundJob.updated_at < cutoff
+        ).update({'status': 'queued'}, synchronize_session=False)
+        db.session.commit()
+        return stalled
+
+    def _queued_jobs(self):
+        return [
+            (job_id, kind, _as_utc(run_after)) for (job_id, kind, run_after) in
+            db.session.query(BackgroundJob.id, BackgroundJob.kind, BackgroundJob.run_after)
+            .filter_by(status='queued').all()
+            if kind in self._kinds
+        ]
+
+    def resume_pending(self) -> int:
+        """
+        Requeue jobs interrupted by a restart (running with an expired lease)
+        and submit every queued job. Returns the number of jobs submitted.
+        """
+        with self.app.app_context():
+            stalled = self._requeue_stalled()
+            jobs = self._queued_jobs() if Config.JOB_EXECUTOR == 'local' else []
+            db.session.remove()
+
+        now = datetime.now(timezone.utc)
+        for job_id, kind, run_after in jobs:
+            self._dispatch(job_id, kind, (run_after - now).total_seconds() if run_after else 0)
+
+        if jobs or stalled:
+            print(f"[INFO] Resumed {len(jobs)} background job(s) ({stalled} stalled)")
+        return len(jobs)
+
+    def run_worker(self, poll_interval: Optional[float] = None):
+        """
+        Work the queue from a dedicated process (JOB_EXECUTOR=external): poll for
+        due queued jobs and run them on this process's pools. Blocks forever.
+        """
+        poll_interval = poll_interval or Config.JOB_POLL_INTERVAL_SECONDS
+        pools = ', '.join(f"{name}={size}" for name, size in self.pools.items())
+        print(f"[INFO] Job worker started (pools: {pools}, kinds: {', '.join(sorted(self._kinds))})")
+
+        while True:
+            try:
+                with self.app.app_context():
+                    stalled = self._requeue_stalled()
+                    if stalled:
+                        print(f"[INFO] Requeued {stalled} stalled job(s)")
+                    now = datetime.now(timezone.utc)
+                    due = [(job_id, kind) for job_id, kind, run_after in self._queued_jobs()
+                           if run_after is None or run_after <= now]
+                    db.session.remove()
+
+                for job_id, kind in due:
+                    self._submit(job_id, kind)
+            except Exception as e:
+                print(f"[ERROR] Job worker poll failed: {str(e)}")
+
+            time.sleep(poll_interval)
+
+
+# Singleton instance
+job_queue = JobQueue(pools={'default': Config.JOB_WORKERS, 'batch': Config.JOB_BATCH_WORKERS})
+
+
+def get_user_job(job_id: str, user_id: int) -> Optional[BackgroundJob]:
+    """Job by id if it belongs to the user."""
+    job = BackgroundJob.query.get(job_id)
+    if not job or job.user_id != user_id:
+        return None
+    return job
@@ -0,0 +1,90 @@
+"""
+Incremental JSON parsing for TrueMirror
+Parses a JSON array out of an LLM token stream and yields each element as soon
+as it is complete, without waiting for the rest of the response. Works for a
+bare array (`[{...}, ...]`) and for an array wrapped in an object
+(`{"questions": [{...}, ...]}`); anything before the first `[` (markdown
+fences, prose) is ignored.
+"""
+
+import json
+from typing import Any, Iterator
+
+
+class JsonArrayStreamParser:
+    """
+    Feed text chunks with `feed()`; it yields every complete element of the
+    first JSON array in the stream. `complete` becomes True once the array's
+    closing bracket has been seen.
+    """
+
+    def __init__(self):
+        self._buffer = []          # characters of the element being read
+        self._depth = 0            # nesting depth inside the current element
+        self._in_array = False
+        self._in_string = False
+        self._escaped = False
+        self.complete = False
+        self.items = 0
+        self.errors = 0
+
+    def feed(self, chunk: str) -> Iterator[Any]:
+        """Consume a chunk; yield elements completed by it."""
+        for char in chunk:
+            if self.complete:
+                return
+
+            if not self._in_array:
+                if char == '[' and not self._in_string:
+                    self._in_array = True
+                elif char == '"' and not self._escaped:
+                    self._in_string = not self._in_string
+                self._escaped = char == '\\' and not self._escaped
+                continue
+
+            item = self._consume(char)
+            if item is not None:
+                yield item
+
+    def _consume(self, char: str):
+        if self._depth == 0:
+            # Between elements: skip separators, detect the end of the array
+            if char == ']':
+                self.complete = True
+            elif char in '{[':
+                self._depth = 1
+                self._buffer = [char]
+            return None
+
+        self._buffer.append(char)
+
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == '\\':
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+            return None
+
+        if char == '"':
+            self._in_string = True
+        elif char in '{[':
+            self._depth += 1
+        elif char in '}]':
+            self._depth -= 1
+            if self._depth == 0:
+                return self._parse_element()
+        return None
+
+    def _parse_element(self):
+        text = ''.join(self._buffer)
+        self._buffer = []
+        try:
+            element = json.loads(text)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return None
+        self.items += 1
+        return element
+
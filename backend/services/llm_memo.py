@@ -0,0 +1,267 @@
+"""
+LLM Memo for TrueMirror
+Memoizes the slow personalized-setup calls (analyze_files_and_extract_info,
+generate_personalized_questions and the fused analyze_and_generate_questions)
+on a canonical hash of their normalized inputs, so retrying setup after a
+client timeout returns immediately.
+
+Entries expire after LLM_MEMO_TTL_SECONDS and live in a bounded SessionCache
+(shared through Redis when configured). Calls whose model output is unusable
+raise, so only validated results are memoized. Invalidation is explicit: per
+entry, or everything at once by bumping the memo generation.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import Config
+from services.session_cache import SessionCache
+from services.state_store import state_store
+
+GENERATION_KEY = 'llm_memo:generation'
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and line endings so trivially different uploads share a key."""
+    text = (text or '').replace('\r\n', '\n').replace('\r', '\n')
+    lines = [' '.join(line.split()) for line in text.split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+def canonical_hash(payload: Any) -> str:
+    """SHA-256 of a JSON payload serialized with sorted keys and no whitespace."""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class LLMMemo:
+    """Memo table for deterministic-enough LLM calls, keyed by call kind + input hash."""
+
+    def __init__(self, cache: SessionCache, enabled: bool = True):
+        self.cache = cache
+        self.enabled = enabled
+
+    def _generation(self) -> int:
+        return state_store.get(GENERATION_KEY) or 0
+
+    def key(self, kind: str, payload: Dict[str, Any]) -> str:
+        return f"{kind}:{self._generation()}:{canonical_hash(payload)}"
+
+    def get(self, kind: str, payload: Dict[str, Any]) -> Any:
+        if not self.enabled:
+            return None
+        return self.cache.get(self.key(kind, payload))
+
+    def set(self, kind: str, payload: Dict[str, Any], value: Any):
+        if self.enabled:
+            self.cache.set(self.key(kind, payload), value)
+
+    def invalidate(self, kind: str, payload: Dict[str, Any]):
+        """Drop one memoized result."""
+        self.cache.pop(self.key(kind, payload))
+
+    def clear(self) -> int:
+        """Invalidate every memoized result; old entries age out via TTL/LRU."""
+        generation = state_store.incr(GENERATION_KEY)
+        print(f"[INFO] LLM memo cleared (generation {generation})")
+        return generation
+
+
+# Singleton instance
+llm_memo = LLMMemo(
+    SessionCache(
+        'llm_memo',
+        max_bytes=Config.LLM_MEMO_MAX_BYTES,
+        ttl_seconds=Config.LLM_MEMO_TTL_SECONDS,
+        store=state_store
+    ),
+    enabled=Config.LLM_MEMO_ENABLED
+)
+
+
+def _analysis_payload(file_texts: List[str], language: str) -> Dict[str, Any]:
+    from services.azure_gpt_service import gpt_service
+    return {
+        'file_texts': [normalize_text(text) for text in file_texts if text],
+        'language': language,
+        'model': gpt_service.model
+    }
+
+
+def _questions_payload(extracted_info: Dict, style: str, language: str) -> Dict[str, Any]:
+    from services.azure_gpt_service import gpt_service
+    return {
+        'extracted_info': extracted_info,
+        'style': style,
+        'language': language,
+        'model': gpt_service.model
+    }
+
+
+def analyze_files(file_texts: List[str], language: str, fresh: bool = False) -> Dict:
+    """
+    Memoized gpt_service.analyze_files_and_extract_info.
+
+    Args:
+        file_texts: Extracted text of each uploaded file
+        language: Interview language ('vi' or 'en')
+        fresh: Skip the lookup and recompute (the new result replaces the memo)
+    """
+    from services.azure_gpt_service import gpt_service
+
+    payload = _analysis_payload(file_texts, language)
+    if not fresh:
+        cached = llm_memo.get('analysis', payload)
+        if cached is not None:
+            print("[INFO] File analysis served from memo")
+            return cached
+
+    extracted_info = gpt_service.analyze_files_and_extract_info(file_texts, language)
+    llm_memo.set('analysis', payload, extracted_info)
+    return extracted_info
+
+
+def generate_questions(extracted_info: Dict, style: str, language: str, fresh: bool = False,
+                       on_question: Optional[Callable[[Dict, List[Dict]], None]] = None,
+                       published: Optional[Callable[[], bool]] = None) -> List[Dict]:
+    """
+    Memoized gpt_service.generate_personalized_questions.
+
+    Args:
+        extracted_info: Output of analyze_files
+        style: Interview style
+        language: Interview language ('vi' or 'en')
+        fresh: Skip the lookup and recompute (the new result replaces the memo)
+        on_question: Called with (question, questions_so_far) as each question
+                     arrives from the stream (PERSONALIZED_QUESTIONS_STREAMING);
+                     not called when the result comes from the memo
+        published: Returns True once streamed questions are in use by a live
+                   session; from then on the streamed questions are only ever
+                   appended to, never replaced
+    """
+    from services.azure_gpt_service import gpt_service
+
+    payload = _questions_payload(extracted_info, style, language)
+    if not fresh:
+        cached = llm_memo.get('questions', payload)
+        if cached is not None:
+            print("[INFO] Personalized questions served from memo")
+            return cached
+
+    if on_question is not None and Config.PERSONALIZED_QUESTIONS_STREAMING:
+        questions, complete = _stream_questions(extracted_info, style, language, on_question,
+                                                published or (lambda: False))
+        if complete:
+            llm_memo.set('questions', payload, questions)
+        return questions
+
+    questions = gpt_service.generate_personalized_questions(extracted_info, style, language)
+    llm_memo.set('questions', payload, questions)
+    return questions
+
+
+def _stream_questions(extracted_info: Dict, style: str, language: str,
+                      on_question: Callable[[Dict, List[Dict]], None],
+                      published: Callable[[], bool]) -> Tuple[List[Dict], bool]:
+    """
+    Collect streamed questions, reporting each one as it arrives.
+
+    Returns:
+        (questions, complete) where complete is False if the stream broke off or
+        came back short. Before any question is published to a live session,
+        the non-streaming call replaces the set. After that, the streamed
+        questions are kept and only the missing sections are appended from the
+        non-streaming call. If that call fails too, the streamed questions are
+        kept when published or when there are at least 3; otherwise it raises.
+    """
+    from services.azure_gpt_service import gpt_service
+
+    questions = []
+    try:
+        for question in gpt_service.generate_personalized_questions_stream(extracted_info, style, language):
+            questions.append(question)
+            on_question(question, questions)
+    except Exception as e:
+        print(f"[WARN] Question stream failed after {len(questions)} question(s): {str(e)}")
+    else:
+        if len(questions) >= 3:
+            print(f"[SUCCESS] Streamed {len(questions)} personalized questions")
+            return questions, True
+        print(f"[WARN] Question stream returned only {len(questions)} question(s), topping up")
+
+    try:
+        extra = gpt_service.generate_personalized_questions(extracted_info, style, language)
+    except Exception:
+        # Streamed questions already in use (or enough of them) beat failing the setup
+        if published() or len(questions) >= 3:
+            print(f"[WARN] Keeping {len(questions)} streamed question(s); remaining sections failed")
+            return questions, False
+        raise
+
+    if not published():
+        # No live session yet: a complete non-streamed set is better than a partial one
+        return extra, False
+
+    return append_missing_sections(questions, extra), False
+
+
+def append_missing_sections(questions: List[Dict], extra: List[Dict]) -> List[Dict]:
+    """
+    Append the sections of `extra` that come after the ones already in
+    `questions` (sections are matched by order, not by title, since titles
+    differ between generations). `questions` itself is never changed.
+    """
+    streamed_sections = len(dict.fromkeys(question.get('section') for question in questions))
+
+    seen = []
+    merged = list(questions)
+    for question in extra:
+        section = question.get('section')
+        if section not in seen:
+            seen.append(section)
+        if len(seen) > streamed_sections:
+            merged.append(question)
+
+    print(f"[INFO] Topped up {len(merged) - len(questions)} question(s) after {len(questions)} streamed")
+    return merged
+
+
+def analyze_and_generate(file_texts: List[str], style: str, language: str,
+                         fresh: bool = False) -> Tuple[Dict, List[Dict]]:
+    """
+    Memoized gpt_service.analyze_and_generate_questions (fused pipeline).
+
+    The result is stored under the same 'analysis' and 'questions' entries as
+    the two-step calls, so either pipeline mode reuses the other's work.
+
+    Args:
+        file_texts: Extracted text of each uploaded file
+        style: Interview style
+        language: Interview language ('vi' or 'en')
+        fresh: Skip the lookup and recompute (the new result replaces the memo)
+    """
+    from services.azure_gpt_service import gpt_service
+
+    analysis_payload = _analysis_payload(file_texts, language)
+    if not fresh:
+        extracted_info = llm_memo.get('analysis', analysis_payload)
+        if extracted_info is not None:
+            questions = llm_memo.get('questions', _questions_payload(extracted_info, style, language))
+            if questions is not None:
+                print("[INFO] Fused personalized setup served from memo")
+                return extracted_info, questions
+
+    extracted_info, questions = gpt_service.analyze_and_generate_questions(file_texts, style, language)
+    llm_memo.set('analysis', analysis_payload, extracted_info)
+    llm_memo.set('questions', _questions_payload(extracted_info, style, language), questions)
+    return extracted_info, questions
+
+
+def invalidate_analysis(file_texts: List[str], language: str):
+    """Forget the memoized analysis for these inputs."""
+    llm_memo.invalidate('analysis', _analysis_payload(file_texts, language))
+
+
+def invalidate_questions(extracted_info: Dict, style: str, language: str):
+    """Forget the memoized questions for these inputs."""
+    llm_memo.invalidate('questions', _questions_payload(extracted_info, style, language))
@@ -0,0 +1,297 @@
+"""
+Metrics for TrueMirror
+Minimal in-process Prometheus-style registry (counters, gauges, histograms)
+plus the LLM call instrumentation used by AzureGPTService: time-to-first-token,
+total latency, tokens/sec, prompt/completion/cached token usage and error class
+per call type, SQL statement counts and worker resident memory. Rendered in
+text exposition format at /api/metrics.
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120)
+TTFT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 8, 13, 20)
+TOKENS_PER_SEC_BUCKETS = (1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300)
+TOKEN_COUNT_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], le: str = None) -> str:
+    pairs = list(zip(labelnames, values))
+    if le is not None:
+        pairs.append(('le', le))
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self, **labels) -> float:
+        """Sum over every label set that matches the given (partial) labels."""
+        match = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            return sum(value for key, value in self._values.items()
+                       if all(key[index] == expected for index, expected in match))
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time."""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.callback = callback
+
+    def _samples(self) -> List[str]:
+        try:
+            return [f"{self.name} {self.callback()}"]
+        except Exception:
+            return []
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, str(bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, '+Inf')} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {round(state[-2], 6)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float]) -> Gauge:
+        return self.register(Gauge(name, documentation, callback))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def format_stats(prefix: str, stats: Dict, labels: Dict[str, str] = None) -> List[str]:
+    """Render the numeric fields of a stats snapshot dict as gauge samples."""
+    labels = labels or {}
+    label_text = _format_labels(tuple(labels), tuple(labels.values()))
+    return [f"{prefix}_{key}{label_text} {value}"
+            for key, value in stats.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+
+# Singleton registry
+registry = MetricsRegistry()
+
+# LLM call metrics (labelled by call type, e.g. chat_stream, vision_extract)
+llm_requests = registry.counter(
+    'truemirror_llm_requests_total', 'LLM calls by call type and outcome', ('call_type', 'status'))
+llm_errors = registry.counter(
+    'truemirror_llm_errors_total', 'Failed LLM calls by error class', ('call_type', 'error_class'))
+llm_latency = registry.histogram(
+    'truemirror_llm_request_duration_seconds', 'Total LLM call latency', ('call_type',), LATENCY_BUCKETS)
+llm_ttft = registry.histogram(
+    'truemirror_llm_time_to_first_token_seconds', 'Time to first streamed token', ('call_type',), TTFT_BUCKETS)
+llm_tokens_per_second = registry.histogram(
+    'truemirror_llm_tokens_per_second', 'Completion tokens per second of generation', ('call_type',),
+    TOKENS_PER_SEC_BUCKETS)
+llm_tokens = registry.counter(
+    'truemirror_llm_tokens_total', 'Token usage by kind (prompt, completion, cached)', ('call_type', 'kind'))
+llm_completion_tokens = registry.histogram(
+    'truemirror_llm_completion_tokens', 'Completion tokens per call', ('call_type',), TOKEN_COUNT_BUCKETS)
+
+
+class LLMCallTracker:
+    """
+    Records one LLM call. Use via `track_llm_call(call_type)`:
+
+        with track_llm_call('evaluation') as call:
+            response = client.chat.completions.create(...)
+            call.record_usage(response.usage)
+    """
+
+    def __init__(self, call_type: str):
+        self.call_type = call_type
+        self.started = time.monotonic()
+        self.first_token_at = None
+        self.completion_tokens = None
+        self.usage = {}
+
+    def first_token(self):
+        """Mark the first streamed token (only the first call counts)."""
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+            llm_ttft.observe(self.first_token_at - self.started, call_type=self.call_type)
+
+    def record_usage(self, usage):
+        """Record token usage from an OpenAI `usage` object (may be None)."""
+        if not usage:
+            return
+
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+
+        self.completion_tokens = completion_tokens
+        self.usage = {
+            'prompt': prompt_tokens,
+            'completion': completion_tokens,
+            'cached': cached_tokens
+        }
+        for kind, count in self.usage.items():
+            llm_tokens.inc(count, call_type=self.call_type, kind=kind)
+        llm_completion_tokens.observe(completion_tokens, call_type=self.call_type)
+
+    def finish(self, error: BaseException = None):
+        duration = time.monotonic() - self.started
+        llm_latency.observe(duration, call_type=self.call_type)
+
+        if error is not None:
+            error_class = 'Cancelled' if isinstance(error, GeneratorExit) else type(error).__name__
+            llm_requests.inc(call_type=self.call_type, status='error')
+            llm_errors.inc(call_type=self.call_type, error_class=error_class)
+            return
+
+        llm_requests.inc(call_type=self.call_type, status='ok')
+
+        if self.completion_tokens:
+            # Generation rate excludes queueing/prefill when the call was streamed
+            generation_start = self.first_token_at or self.started
+            generation_time = time.monotonic() - generation_start
+            if generation_time > 0:
+                llm_tokens_per_second.observe(self.completion_tokens / generation_time, call_type=self.call_type)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(exc)
+        return False
+
+
+def track_llm_call(call_type: str) -> LLMCallTracker:
+    """Start tracking an LLM call of the given type."""
+    return LLMCallTracker(call_type)
+
+
+def process_rss_bytes() -> float:
+    """Current resident memory of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+registry.gauge('truemirror_process_resident_memory_bytes', 'Resident memory of this worker process', process_rss_bytes)
+
+# SQL statements issued through SQLAlchemy (see instrument_engine)
+db_queries = registry.counter(
+    'truemirror_db_queries_total', 'SQL statements executed, by statement type', ('statement',))
+
+
+def instrument_engine(engine):
+    """Count every SQL statement the engine executes (call once per engine)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        words = statement.split(None, 1)
+        db_queries.inc(statement=words[0].upper() if words else 'OTHER')
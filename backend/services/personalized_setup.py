@@ -0,0 +1,318 @@
+"""
+Personalized Setup Pipeline for TrueMirror
+Background job that turns uploaded files into a personalized interview
+session: text extraction → AI analysis → question generation → session.
+Pages without a usable local text layer are sent to the vision model one
+page per call on a bounded thread pool, so several multi-page files take
+about as long as the slowest page. Results are reassembled in upload/page
+order; a failed page is skipped without failing the rest of the file.
+Questions are streamed, and the session is published (stage 'session_ready')
+once the first section is complete; later sections are appended to it. A
+rerun of a job that already published its session completes that session
+instead of opening a second one.
+PERSONALIZED_PIPELINE_MODE can instead produce the profile and questions in
+one fused call, or A/B split jobs between the two pipelines.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from config import Config
+from models import db, InterviewSession
+from services.job_queue import job_queue
+from services.metrics import registry
+
+# Shared across requests so VISION_MAX_CONCURRENCY caps total in-flight vision calls
+_vision_executor = ThreadPoolExecutor(
+    max_workers=Config.VISION_MAX_CONCURRENCY,
+    thread_name_prefix='vision-extract'
+)
+
+pipeline_runs = registry.counter(
+    'truemirror_personalized_pipeline_total', 'Personalized setup pipelines by mode (A/B arm) and outcome',
+    ('mode', 'outcome'))
+pipeline_duration = registry.histogram(
+    'truemirror_personalized_pipeline_duration_seconds', 'Analysis + question generation time by pipeline mode',
+    ('mode',))
+
+
+def _file_parts(file_data: Dict) -> List[Dict]:
+    """
+    Split a processed upload into ordered parts: text already available
+    locally, or one image per page that still needs the vision model.
+    """
+    if file_data.get('pages'):
+        return [
+            {'text': page['text'], 'image': page['image'], 'cache_part': f"page-{page['page_number'] - 1}"}
+            for page in file_data['pages']
+        ]
+
+    return [
+        {'text': None, 'image': image, 'cache_part': f"page-{page_index}"}
+        for page_index, image in enumerate(file_data['base64_content'] or [])
+    ]
+
+
+def _extract_page(file_data: Dict, part: Dict, page_index: int, page_count: int) -> str:
+    from services.azure_gpt_service import gpt_service
+
+    label = file_data['filename'] if page_count == 1 else f"{file_data['filename']} (page {page_index + 1}/{page_count})"
+
+    return gpt_service.extract_text_from_vision(
+        [part['image']],
+        label,
+        content_hash=file_data.get('content_hash'),
+        cache_part=part['cache_part']
+    )
+
+
+def extract_file_texts(extracted_files: List[Dict]) -> List[str]:
+    """
+    Extract the text of every processed upload, one string per file in input order.
+
+    Args:
+        extracted_files: Output of file_processor.process_multiple_files
+
+    Returns:
+        List of extracted texts (pages joined in order)
+
+    Raises:
+        Exception if no page of some image/PDF file could be read
+    """
+    # Fan out one vision call per page that has no usable local text
+    parts_by_file = []
+    futures = {}
+    for file_index, file_data in enumerate(extracted_files):
+        parts = [] if file_data['text'] else _file_parts(file_data)
+        parts_by_file.append(parts)
+
+        for page_index, part in enumerate(parts):
+            if part['text'] is None:
+                futures[(file_index, page_index)] = _vision_executor.submit(
+                    _extract_page, file_data, part, page_index, len(parts)
+                )
+
+    if futures:
+        print(f"[INFO] Extracting {len(futures)} page(s) with up to {Config.VISION_MAX_CONCURRENCY} concurrent vision calls")
+
+    file_texts = []
+    for file_index, file_data in enumerate(extracted_files):
+        if file_data['text']:
+            # Already extracted (TXT/DOCX, or a PDF with a text layer on every page)
+            file_texts.append(file_data['text'])
+            continue
+
+        parts = parts_by_file[file_index]
+        if not parts:
+            continue
+
+        page_texts = []
+        errors = []
+        for page_index, part in enumerate(parts):
+            if part['text'] is not None:
+                page_texts.append(part['text'])
+                continue
+            try:
+                page_texts.append(futures[(file_index, page_index)].result())
+            except Exception as e:
+                print(f"[WARN] Page {page_index + 1} of {file_data['filename']} failed: {str(e)}")
+                errors.append(str(e))
+
+        if not page_texts:
+            raise Exception(f"Không thể đọc nội dung từ {file_data['filename']}: {errors[0]}")
+
+        file_texts.append("\n\n".join(page_texts))
+
+    return file_texts
+
+
+def choose_pipeline_mode(job_id: str) -> str:
+    """
+    Pipeline for a setup job: 'two_step' or 'fused' per PERSONALIZED_PIPELINE_MODE;
+    in 'ab' mode jobs are split by a stable hash of the job id.
+    """
+    mode = Config.PERSONALIZED_PIPELINE_MODE
+    if mode == 'ab':
+        bucket = int(job_id[:8], 16) % 100
+        return 'fused' if bucket < Config.PERSONALIZED_PIPELINE_FUSED_PERCENT else 'two_step'
+    return mode if mode in ('two_step', 'fused') else 'two_step'
+
+
+def run_personalized_setup(job, progress) -> Dict:
+    """
+    Job handler for kind 'personalized_setup'.
+
+    Payload:
+        files: Output of file_processor.process_multiple_files
+        style, language: Interview configuration
+        fresh_questions: Bypass memoized questions
+
+    Returns:
+        {'session_id': int, 'session': dict}
+    """
+    from services.llm_memo import analyze_and_generate, analyze_files, generate_questions
+
+    payload = job.payload
+    style = payload['style']
+    language = payload['language']
+    extracted_files = payload['files']
+
+    # An earlier attempt already published a session: finish that one, never open a second
+    resumed = _resume_published_session(job, progress, style, language, payload.get('fresh_questions', False))
+    if resumed:
+        return resumed
+
+    progress('processed', 10, file_count=len(extracted_files))
+
+    # Step 2: Extract text from all files (Vision API per page, in parallel)
+    try:
+        file_texts = extract_file_texts(extracted_files)
+    except Exception as e:
+        raise Exception(f'Lỗi đọc file: {str(e)}')
+    progress('extracted', 40)
+
+    # Steps 3-4: Candidate profile + personalized questions, either in one fused
+    # structured call or as analysis followed by (streamed) question generation
+    arm = choose_pipeline_mode(job.id)
+    started = time.monotonic()
+    session_ref = {}
+    custom_questions = None
+    outcome = 'ok'
+
+    if arm == 'fused':
+        try:
+            extracted_info, custom_questions = analyze_and_generate(
+                file_texts,
+                style,
+                language,
+                fresh=payload.get('fresh_questions', False)
+            )
+        except Exception as e:
+            print(f"[WARN] Fused setup failed, falling back to two-step: {str(e)}")
+            outcome = 'fallback'
+        else:
+            progress('analyzed', 60, pipeline=arm, position=extracted_info.get('position'),
+                     industry=extracted_info.get('industry'))
+
+    if custom_questions is None:
+        # Step 3: Analyze files with AI to extract info
+        try:
+            extracted_info = analyze_files(file_texts, language)
+        except Exception as e:
+            raise Exception(f'Lỗi phân tích AI: {str(e)}')
+        progress('analyzed', 60, pipeline=arm, position=extracted_info.get('position'),
+                 industry=extracted_info.get('industry'))
+
+        # Step 4: Generate personalized questions with AI. With streaming, the
+        # session is created as soon as section 1 is complete so the interview can
+        # start while the remaining sections are still being generated.
+        def on_question(question, questions):
+            if session_ref:
+                if question.get('section') != questions[-2].get('section'):
+                    # Previous section just completed; extend the live session
+                    _save_questions(session_ref['session'], questions[:-1])
+                return
+
+            if len(questions) > 1 and question.get('section') != questions[0].get('section'):
+                new_session = _create_session(job.user_id, extracted_info, style, language, questions[:-1])
+                session_ref['session'] = new_session
+                progress(
+                    'session_ready', 75,
+                    result={'session_id': new_session.id, 'session': new_session.to_dict()},
+                    question_count=len(questions) - 1
+                )
+
+        try:
+            custom_questions = generate_questions(
+                extracted_info,
+                style,
+                language,
+                fresh=payload.get('fresh_questions', False),
+                on_question=on_question,
+                published=lambda: bool(session_ref)
+            )
+        except Exception as e:
+            raise Exception(f'Lỗi tạo câu hỏi: {str(e)}')
+
+    pipeline_runs.inc(mode=arm, outcome=outcome)
+    pipeline_duration.observe(time.monotonic() - started, mode=arm)
+    progress('questions_ready', 90, question_count=len(custom_questions))
+
+    # Step 5: Create interview session (or complete the one opened early; the
+    # questions it already has are a prefix of custom_questions, only appended to)
+    if session_ref:
+        new_session = session_ref['session']
+        _save_questions(new_session, custom_questions)
+    else:
+        new_session = _create_session(job.user_id, extracted_info, style, language, custom_questions)
+
+    print(f"[SUCCESS] Personalized interview session created: {new_session.id} for user {job.user_id}")
+
+    return {
+        'session_id': new_session.id,
+        'session': new_session.to_dict()
+    }
+
+
+def _resume_published_session(job, progress, style: str, language: str, fresh: bool) -> Optional[Dict]:
+    """
+    Complete the session an earlier attempt of this job published at
+    'session_ready' (its id is in the job's partial result). The live
+    questions are kept and only the missing sections are appended.
+
+    Returns:
+        The job result, or None if no session was published
+    """
+    from services.llm_memo import generate_questions, append_missing_sections
+
+    session_id = (job.result or {}).get('session_id')
+    session = InterviewSession.query.get(session_id) if session_id else None
+    if not session or session.user_id != job.user_id:
+        return None
+
+    print(f"[INFO] Job {job.id} resuming session {session.id} published by an earlier attempt")
+    extracted_info = json.loads(session.uploaded_files_info or '{}')
+    questions = json.loads(session.custom_questions or '[]')
+
+    try:
+        generated = generate_questions(extracted_info, style, language, fresh=fresh)
+    except Exception as e:
+        raise Exception(f'Lỗi tạo câu hỏi: {str(e)}')
+
+    questions = append_missing_sections(questions, generated)
+    progress('questions_ready', 90, question_count=len(questions))
+    _save_questions(session, questions)
+
+    return {
+        'session_id': session.id,
+        'session': session.to_dict()
+    }
+
+
+def _create_session(user_id: int, extracted_info: Dict, style: str, language: str,
+                    questions: List[Dict]) -> InterviewSession:
+    new_session = InterviewSession(
+        user_id=user_id,
+        mode='personalized',
+        position=extracted_info.get('position', 'N/A'),
+        industry=extracted_info.get('industry', 'N/A'),
+        style=style,
+        language=language,
+        uploaded_files_info=json.dumps(extracted_info, ensure_ascii=False),
+        custom_questions=json.dumps(questions, ensure_ascii=False),
+        status='pending'
+    )
+    db.session.add(new_session)
+    db.session.commit()
+    return new_session
+
+
+def _save_questions(session: InterviewSession, questions: List[Dict]):
+    """Replace the session's questions (its system prompt is recompiled on the next turn)."""
+    session.custom_questions = json.dumps(questions, ensure_ascii=False)
+    db.session.commit()
+    print(f"[INFO] Session {session.id} now has {len(questions)} personalized questions")
+
+
+job_queue.register('personalized_setup', run_personalized_setup, event='setup_progress', max_attempts=2)
@@ -0,0 +1,279 @@
+"""
+Question Bank Service for TrueMirror
+Loads the seeded interview question bank (position → section → question →
+popups/guidelines) with a fixed number of queries, independent of bank size,
+and serves it from an immutable in-process index on the interview hot path.
+
+Reloads are published through the state store as a bank generation, so every
+worker (and node) picks up a reseeded bank within QUESTION_BANK_CHECK_SECONDS;
+lookups in between never leave the process.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from sqlalchemy.orm import selectinload, joinedload
+from config import Config
+from models import db, Industry, JobLevel, Position, QuestionSection, InterviewQuestion
+from services.state_store import state_store
+
+GENERATION_KEY = 'question_bank:generation'
+
+# Session config values → seeded names (compared lower-case)
+JOB_LEVEL_MAP = {
+    'Intern': 'intern',
+    'Junior': 'junior',
+    'Senior': 'senior',
+    'Manager': 'manager'
+}
+
+INDUSTRY_MAP = {
+    'IT': 'it',
+    'Marketing': 'marketing',
+    'Sales': 'sales',
+    'Finance': 'finance',
+    'HR': 'hr'
+}
+
+# Eager-load the whole tree: one SELECT per relationship level, never per row
+POSITION_TREE_OPTIONS = (
+    selectinload(Position.sections)
+    .selectinload(QuestionSection.questions)
+    .selectinload(InterviewQuestion.popup_questions),
+    selectinload(Position.sections)
+    .selectinload(QuestionSection.questions)
+    .selectinload(InterviewQuestion.guidelines),
+)
+
+
+def load_position_tree(industry: str, job_level: str):
+    """
+    Load a position with its sections, questions, popups and guidelines.
+
+    Issues exactly 5 queries (position, sections, questions, popups,
+    guidelines) whatever the number of sections or questions.
+
+    Args:
+        industry: Session industry (e.g. 'IT')
+        job_level: Session position / job level (e.g. 'Senior')
+
+    Returns:
+        Position with relationships populated, or None if not seeded
+    """
+    if not industry or not job_level:
+        return None
+
+    industry_key = INDUSTRY_MAP.get(industry, industry.lower())
+    job_level_key = JOB_LEVEL_MAP.get(job_level, job_level.lower())
+
+    return Position.query.join(Position.industry).join(Position.job_level).filter(
+        db.func.lower(Industry.name) == industry_key,
+        db.func.lower(JobLevel.name) == job_level_key
+    ).options(*POSITION_TREE_OPTIONS).first()
+
+
+class QuestionRecord:
+    """Read-only snapshot of an InterviewQuestion with its popups and guidelines."""
+    __slots__ = (
+        'question_number', 'question_text', 'question_type_text', 'pressure_level_text',
+        'purpose', 'expected_duration_minutes', 'popup_questions', 'must_have', 'should_avoid'
+    )
+
+    def __init__(self, question: InterviewQuestion):
+        self.question_number = question.question_number
+        self.question_text = question.question_text
+        self.question_type_text = question.question_type_text
+        self.pressure_level_text = question.pressure_level_text
+        self.purpose = question.purpose
+        self.expected_duration_minutes = question.expected_duration_minutes
+        self.popup_questions = tuple(p.popup_text for p in question.popup_questions)
+        self.must_have = tuple(g.content for g in question.guidelines if g.guideline_type == 'must_have')
+        self.should_avoid = tuple(g.content for g in question.guidelines if g.guideline_type == 'should_avoid')
+
+
+class SectionRecord:
+    """Read-only snapshot of a QuestionSection."""
+    __slots__ = ('section_number', 'section_name', 'duration_minutes', 'questions')
+
+    def __init__(self, section: QuestionSection):
+        self.section_number = section.section_number
+        self.section_name = section.section_name
+        self.duration_minutes = section.duration_minutes
+        self.questions = tuple(QuestionRecord(q) for q in section.questions)
+
+
+class PositionRecord:
+    """Read-only snapshot of a Position; `context` is the pre-rendered prompt block."""
+    __slots__ = ('name', 'industry', 'job_level', 'language', 'total_duration_minutes', 'sections', 'context')
+
+    def __init__(self, position: Position):
+        self.name = position.name
+        self.industry = position.industry.name.lower()
+        self.job_level = position.job_level.name.lower()
+        self.language = position.language or 'vi'
+        self.total_duration_minutes = position.total_duration_minutes
+        self.sections = tuple(SectionRecord(s) for s in position.sections)
+        self.context = format_position_context(self) if self.sections else None
+
+
+def format_position_context(position) -> str:
+    """Render a position's sections and questions as the system prompt questions block."""
+    context = "=== INTERVIEW QUESTIONS STRUCTURE ===\n\n"
+    context += f"Position: {position.name}\n"
+    context += f"Total Duration: {position.total_duration_minutes} minutes\n"
+    context += f"Language: {'Tiếng Việt' if position.language == 'vi' else 'English'}\n\n"
+
+    for section in position.sections:
+        context += f"SECTION {section.section_number}: {section.section_name}\n"
+        context += f"Duration: {section.duration_minutes} minutes\n\n"
+
+        for q in section.questions:
+            context += f"Question {q.question_number}: {q.question_text}\n"
+            context += f"Type: {q.question_type_text}\n"
+            context += f"Pressure: {q.pressure_level_text}\n"
+            context += f"Purpose: {q.purpose}\n"
+            context += f"Expected Duration: {q.expected_duration_minutes} min\n"
+
+            # Add popup questions
+            if q.popup_questions:
+                context += "POP-UP follow-ups:\n"
+                for popup in q.popup_questions:
+                    context += f"  - {popup}\n"
+
+            # Add guidelines
+            if q.must_have:
+                context += "Must have in answer:\n"
+                for item in q.must_have:
+                    context += f"  ✓ {item}\n"
+
+            if q.should_avoid:
+                context += "Should avoid:\n"
+                for item in q.should_avoid:
+                    context += f"  ✗ {item}\n"
+
+            context += "\n"
+
+    return context
+
+
+class QuestionBankIndex:
+    """Immutable index of PositionRecords keyed by (industry, job level, language)."""
+    __slots__ = ('version', 'generation', 'loaded_at', 'positions', '_by_level')
+
+    def __init__(self, records: list, generation: int = 0):
+        positions = {}
+        by_level = {}
+        digest = hashlib.sha256()
+
+        for record in records:
+            key = (record.industry, record.job_level, record.language)
+            # Keep the first seeded position per key, like the old .first() lookup
+            positions.setdefault(key, record)
+            by_level.setdefault(key[:2], record)
+
+        for key in sorted(positions):
+            digest.update(repr(key).encode('utf-8'))
+            digest.update((positions[key].context or '').encode('utf-8'))
+
+        self.version = digest.hexdigest()[:16]
+        self.generation = generation
+        self.loaded_at = datetime.now(timezone.utc)
+        self.positions = positions
+        self._by_level = by_level
+
+    def lookup(self, industry: str, job_level: str, language: str = None):
+        """Find a position record, falling back to any language for the level."""
+        if not industry or not job_level:
+            return None
+
+        industry_key = INDUSTRY_MAP.get(industry, industry.lower())
+        job_level_key = JOB_LEVEL_MAP.get(job_level, job_level.lower())
+
+        record = self.positions.get((industry_key, job_level_key, language))
+        return record or self._by_level.get((industry_key, job_level_key))
+
+
+class QuestionBank:
+    """
+    Process-wide holder of the current QuestionBankIndex.
+    The index is built from one bulk read and swapped atomically on reload,
+    so readers never see a half-built bank and never touch the database.
+    """
+
+    def __init__(self, check_interval: float = None):
+        self._index = None
+        self._lock = threading.Lock()
+        self.check_interval = check_interval if check_interval is not None else Config.QUESTION_BANK_CHECK_SECONDS
+        self._checked_at = 0.0  # monotonic time of the last published-generation check
+
+    def _generation(self) -> int:
+        return state_store.get(GENERATION_KEY) or 0
+
+    def load(self, generation: int = None) -> QuestionBankIndex:
+        """
+        Build a fresh index from the database and swap it in.
+        Must be called inside an app context.
+
+        Args:
+            generation: Published bank generation the index is built for
+                        (read from the state store when omitted)
+        """
+        if generation is None:
+            generation = self._generation()
+
+        with self._lock:
+            # Another thread already caught up while this one waited
+            current = self._index
+            if current is not None and current.generation >= generation:
+                return current
+
+            positions = Position.query.options(
+                joinedload(Position.industry),
+                joinedload(Position.job_level),
+                *POSITION_TREE_OPTIONS
+            ).order_by(Position.id).all()
+
+            index = QuestionBankIndex([PositionRecord(p) for p in positions], generation)
+            self._index = index
+
+        print(f"[INFO] Question bank loaded: {len(index.positions)} positions, "
+              f"version={index.version}, generation={generation}")
+        return index
+
+    def reload(self) -> QuestionBankIndex:
+        """
+        Reseeding replaces the whole bank: bump the published generation so
+        every worker rebuilds its index, then rebuild this one.
+        """
+        return self.load(state_store.incr(GENERATION_KEY))
+
+    @property
+    def index(self) -> QuestionBankIndex:
+        index = self._index
+        if index is None:
+            self._checked_at = time.monotonic()
+            return self.load()
+
+        # Another worker may have reloaded the bank: check at most every check_interval
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return index
+        self._checked_at = now
+
+        generation = self._generation()
+        if generation > index.generation:
+            return self.load(generation)
+        return index
+
+    @property
+    def version(self) -> str:
+        return self.index.version
+
+    def get_position(self, industry: str, job_level: str, language: str = None):
+        """Dictionary lookup of a position record (no DB I/O once loaded)."""
+        return self.index.lookup(industry, job_level, language)
+
+
+# Singleton instance
+question_bank = QuestionBank()
@@ -0,0 +1,305 @@
+"""
+LLM Resilience for TrueMirror
+Wraps Azure OpenAI calls with:
+- Jittered exponential backoff for 429/408/409/5xx and connection errors,
+  honoring the provider's Retry-After / retry-after-ms headers
+- A per-deployment circuit breaker that fails fast while the provider is down
+  (open after N consecutive failed calls, one trial call after a cool-down).
+  A call counts once however many attempts it made, and throttling (429) is
+  left to backoff and the retry budget: it never trips the breaker
+- A retry budget (retries may add at most a fraction of recent calls), so
+  retries cannot multiply load during an outage
+
+Only the request itself is retried: once a stream has started yielding tokens,
+a failure is raised to the caller. State is per process.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from config import Config
+from services.metrics import registry
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+llm_retries = registry.counter(
+    'truemirror_llm_retries_total', 'LLM request retries by deployment and reason', ('deployment', 'reason'))
+llm_retry_budget_exhausted = registry.counter(
+    'truemirror_llm_retry_budget_exhausted_total', 'Retries skipped because the retry budget was spent', ('deployment',))
+llm_circuit_rejections = registry.counter(
+    'truemirror_llm_circuit_rejections_total', 'LLM calls rejected while the circuit was open', ('deployment',))
+llm_circuit_transitions = registry.counter(
+    'truemirror_llm_circuit_transitions_total', 'Circuit breaker state changes', ('deployment', 'state'))
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit is open."""
+
+    def __init__(self, deployment: str, retry_in: float):
+        super().__init__(f"LLM deployment '{deployment}' is unavailable, retry in {retry_in:.0f}s")
+        self.deployment = deployment
+        self.retry_in = retry_in
+
+
+def status_code(error: Exception) -> Optional[int]:
+    return getattr(error, 'status_code', None)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Transient provider errors: throttling, timeouts, 5xx and dropped connections."""
+    if openai is not None and isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    status = status_code(error)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the provider (retry-after-ms, or Retry-After in seconds or as an HTTP date)."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (0-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed → open → half_open → closed."""
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        if state != self.state:
+            self.state = state
+            llm_circuit_transitions.inc(deployment=self.name, state=state)
+            print(f"[WARN] LLM circuit for {self.name} is now {state}")
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == 'closed':
+                return
+
+            retry_in = self.opened_at + self.recovery_seconds - time.monotonic()
+            if self.state == 'open' and retry_in <= 0:
+                self._transition('half_open')
+
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True  # exactly one trial call
+                return
+
+        llm_circuit_rejections.inc(deployment=self.name)
+        raise CircuitOpenError(self.name, max(0.0, retry_in))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._transition('closed')
+
+    def release(self):
+        """End a call that says nothing about provider health (e.g. throttled) without changing state."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition('open')
+
+    def stats(self) -> Dict:
+        return {
+            'circuit_open': int(self.state == 'open'),
+            'circuit_half_open': int(self.state == 'half_open'),
+            'consecutive_failures': self.failures
+        }
+
+
+class RetryBudget:
+    """Allow retries up to `ratio` of the calls seen in the last `window` seconds (plus a small floor)."""
+
+    def __init__(self, ratio: float, min_retries: int, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self):
+        """Count one logical call (retries are not calls, so they do not raise the budget)."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        """Reserve one retry; False when the budget is spent."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = max(self.min_retries, int(len(self._requests) * self.ratio))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+
+class ResilientCaller:
+    """Retry/backoff + circuit breaker + retry budget for one deployment."""
+
+    def __init__(self, deployment: str):
+        self.deployment = deployment
+        self.breaker = CircuitBreaker(
+            deployment, Config.LLM_CIRCUIT_FAILURE_THRESHOLD, Config.LLM_CIRCUIT_RECOVERY_SECONDS)
+        self.budget = RetryBudget(Config.LLM_RETRY_BUDGET_RATIO, Config.LLM_RETRY_BUDGET_MIN)
+
+    def _next_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Delay before the next attempt, or None if the error should be raised."""
+        if not is_retryable(error):
+            return None
+        if attempt >= Config.LLM_MAX_RETRIES or self.breaker.state == 'open':
+            return None
+
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None and retry_after > Config.LLM_RETRY_AFTER_MAX_SECONDS:
+            return None  # provider asked for a longer pause than a user should wait
+
+        if not self.budget.try_spend():
+            llm_retry_budget_exhausted.inc(deployment=self.deployment)
+            print(f"[WARN] Retry budget for {self.deployment} exhausted, not retrying")
+            return None
+
+        delay = backoff_delay(attempt, Config.LLM_BACKOFF_BASE_SECONDS, Config.LLM_BACKOFF_MAX_SECONDS)
+        if retry_after is not None:
+            delay = retry_after + delay * 0.1  # honor the provider, small jitter to spread clients
+
+        reason = str(status_code(error) or type(error).__name__)
+        llm_retries.inc(deployment=self.deployment, reason=reason)
+        print(f"[WARN] LLM call to {self.deployment} failed ({reason}), retry {attempt + 1} in {delay:.2f}s")
+        return delay
+
+    def _start(self):
+        self.breaker.allow()
+        self.budget.record_request()
+
+    def _record_outcome(self, error: Exception = None):
+        """Report the logical call's final outcome to the breaker (once per call, not per attempt)."""
+        if error is None or not is_retryable(error):
+            self.breaker.record_success()  # the provider answered (even a 400): it is not down
+        elif status_code(error) == 429:
+            self.breaker.release()  # throttled, not down
+        else:
+            self.breaker.record_failure()
+
+    def call(self, func, *args, **kwargs):
+        """Call func with retries (synchronous)."""
+        self._start()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._next_delay(e, attempt)
+                    if delay is None:
+                        self._record_outcome(e)
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                self._record_outcome()
+                return result
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                self.breaker.release()  # cancelled/interrupted: outcome unknown, free a half-open trial
+            raise
+
+    async def acall(self, func, *args, **kwargs):
+        """Await func with retries (async clients)."""
+        self._start()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._next_delay(e, attempt)
+                    if delay is None:
+                        self._record_outcome(e)
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+                self._record_outcome()
+                return result
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                self.breaker.release()  # cancelled/interrupted: outcome unknown, free a half-open trial
+            raise
+
+
+_callers = {}
+_callers_lock = threading.Lock()
+
+
+def get_caller(deployment: str) -> ResilientCaller:
+    """Shared ResilientCaller per deployment (one breaker and budget per deployment)."""
+    with _callers_lock:
+        caller = _callers.get(deployment)
+        if caller is None:
+            caller = _callers[deployment] = ResilientCaller(deployment)
+        return caller
+
+
+def circuit_stats() -> Dict[str, Dict]:
+    """Breaker state per deployment (for /api/metrics)."""
+    with _callers_lock:
+        return {deployment: caller.breaker.stats() for deployment, caller in _callers.items()}
@@ -0,0 +1,218 @@
+"""
+Session Cache for TrueMirror
+Bounded in-memory cache for live interview state shared by the SSE (chat_routes)
+and WebSocket (websocket_routes) paths: max-bytes budget, idle TTL per entry,
+LRU eviction and hit/miss/eviction counters. Evicted entries are reloaded
+transparently from the database by the caller-supplied loader.
+
+When a shared state store (Redis) is configured, entries live there instead,
+so every worker sees the same interview state; TTL is enforced by the store.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from config import Config
+from services.conversation_store import load_messages
+from services.state_store import StateStore, state_store
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class SessionCache:
+    """
+    Thread-safe LRU cache bounded by total bytes.
+
+    Entries expire after `ttl_seconds` without access (abandoned interviews),
+    and the least recently used entries are evicted once `max_bytes` is exceeded.
+    If `store` is a shared StateStore, entries are kept there instead of locally.
+    """
+
+    def __init__(self, name: str, max_bytes: int, ttl_seconds: int, store: StateStore = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.store = store if store is not None and store.shared else None
+
+        # key -> [value, size, expires_at]; order = least → most recently used
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _store_key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        return entry
+
+    def _purge_expired(self, now: float):
+        # Sliding TTL keeps expiry times ordered like the LRU list
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[2] > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing its TTL) or `default`."""
+        if self.store:
+            value = self.store.get(self._store_key(key))
+            with self._lock:
+                if value is None:
+                    self.misses += 1
+                    return default
+                self.hits += 1
+            return value
+
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._remove(key)
+                    self.expirations += 1
+                self.misses += 1
+                return default
+
+            entry[2] = now + self.ttl_seconds
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting LRU entries to stay within budget."""
+        if self.store:
+            self.store.set(self._store_key(key), value, ttl=self.ttl_seconds)
+            return
+
+        size = estimate_size(value)
+
+        with self._lock:
+            now = time.monotonic()
+            self._remove(key)
+            self._purge_expired(now)
+
+            if size > self.max_bytes:
+                print(f"[WARN] {self.name} cache entry {key} ({size} bytes) exceeds budget, not cached")
+                return
+
+            self._entries[key] = [value, size, now + self.ttl_seconds]
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Any]) -> Any:
+        """Return the cached value, loading (and caching) it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = loader(key)
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value."""
+        if self.store:
+            value = self.store.get(self._store_key(key))
+            self.store.delete(self._store_key(key))
+            return value if value is not None else default
+
+        with self._lock:
+            entry = self._remove(key)
+            return entry[0] if entry is not None else default
+
+    def __contains__(self, key: Hashable) -> bool:
+        if self.store:
+            return self.store.get(self._store_key(key)) is not None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[2] > time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current memory usage."""
+        with self._lock:
+            return {
+                'name': self.name,
+                'backend': 'shared' if self.store else 'local',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+# Shared instances for both SSE and WebSocket paths (cross-worker when Redis is configured)
+conversation_cache = SessionCache(
+    'conversations',
+    max_bytes=Config.CONVERSATION_CACHE_MAX_BYTES,
+    ttl_seconds=Config.SESSION_CACHE_TTL_SECONDS,
+    store=state_store
+)
+question_state_cache = SessionCache(
+    'question_state',
+    max_bytes=Config.SESSION_STATE_CACHE_MAX_BYTES,
+    ttl_seconds=Config.SESSION_CACHE_TTL_SECONDS,
+    store=state_store
+)
+system_prompt_cache = SessionCache(
+    'system_prompts',
+    max_bytes=Config.SESSION_STATE_CACHE_MAX_BYTES,
+    ttl_seconds=Config.SESSION_CACHE_TTL_SECONDS,
+    store=state_store
+)
+
+
+def get_conversation_history(session_id: int) -> list:
+    """Get conversation history from cache, reloading from the database on a miss."""
+    return conversation_cache.get_or_load(session_id, load_messages)
+
+
+def clear_session(session_id: int):
+    """Drop all cached state for a finished session."""
+    conversation_cache.pop(session_id)
+    question_state_cache.pop(session_id)
+    system_prompt_cache.pop(session_id)
+
+
+def default_question_state() -> Dict[str, Any]:
+    """Initial question-flow state for a session."""
+    return {
+        'current_question_index': 0,
+        'current_section': 1,
+        'questions_asked': [],
+        'awaiting_answer': False,
+        'popup_mode': False
+    }
+
+
+def get_question_state(session_id: int) -> Optional[Dict[str, Any]]:
+    """Question-flow state for a session (re-initialized if evicted)."""
+    return question_state_cache.get_or_load(session_id, lambda _: default_question_state())
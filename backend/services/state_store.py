@@ -0,0 +1,167 @@
+"""
+State Store for TrueMirror
+Pluggable key/value + set store for live interview state (conversation cache,
+question state, room membership) so several gunicorn workers or nodes can
+serve the same interview.
+
+Backends:
+- memory://          process-local (development, tests, single worker)
+- redis://, rediss:// shared across workers/nodes (any Redis-protocol server)
+"""
+
+import json
+import threading
+import time
+from typing import Any, Optional, Set
+from config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class StateStore:
+    """Interface for live-state backends. Values must be JSON-serializable."""
+
+    # True when every worker sees the same data
+    shared = False
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Atomically add to an integer value (missing counts as 0); returns the new value."""
+        raise NotImplementedError
+
+    def add_member(self, key: str, member: str, ttl: Optional[int] = None):
+        raise NotImplementedError
+
+    def remove_member(self, key: str, member: str):
+        raise NotImplementedError
+
+    def members(self, key: str) -> Set[str]:
+        raise NotImplementedError
+
+
+class MemoryStateStore(StateStore):
+    """In-process stand-in with the same semantics as the Redis backend (TTL included)."""
+
+    def __init__(self):
+        self._data = {}      # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _live(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def _expiry(self, ttl: Optional[int]):
+        return time.monotonic() + ttl if ttl else None
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._live(key)
+            # Round-trip through JSON so callers get a private copy, as with Redis
+            return json.loads(entry[0]) if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with self._lock:
+            self._data[key] = (json.dumps(value, ensure_ascii=False), self._expiry(ttl))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._live(key)
+            value = (json.loads(entry[0]) if entry else 0) + amount
+            self._data[key] = (json.dumps(value), entry[1] if entry else None)
+            return value
+
+    def add_member(self, key: str, member: str, ttl: Optional[int] = None):
+        with self._lock:
+            entry = self._live(key)
+            members = set(entry[0]) if entry else set()
+            members.add(member)
+            self._data[key] = (frozenset(members), self._expiry(ttl))
+
+    def remove_member(self, key: str, member: str):
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                members = set(entry[0])
+                members.discard(member)
+                self._data[key] = (frozenset(members), entry[1])
+
+    def members(self, key: str) -> Set[str]:
+        with self._lock:
+            entry = self._live(key)
+            return set(entry[0]) if entry else set()
+
+
+class RedisStateStore(StateStore):
+    """Shared backend for any Redis-protocol server (Redis, Valkey, KeyDB...)."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = 'truemirror:'):
+        if not redis:
+            raise Exception("Cần cài package redis để dùng Redis state store")
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.client.set(self._key(key), json.dumps(value, ensure_ascii=False), ex=ttl)
+
+    def delete(self, key: str):
+        self.client.delete(self._key(key))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        # An integer's JSON form is its decimal string, so get() reads it back as usual
+        return self.client.incrby(self._key(key), amount)
+
+    def add_member(self, key: str, member: str, ttl: Optional[int] = None):
+        pipe = self.client.pipeline()
+        pipe.sadd(self._key(key), member)
+        if ttl:
+            pipe.expire(self._key(key), ttl)
+        pipe.execute()
+
+    def remove_member(self, key: str, member: str):
+        self.client.srem(self._key(key), member)
+
+    def members(self, key: str) -> Set[str]:
+        return set(self.client.smembers(self._key(key)))
+
+
+def create_state_store(url: Optional[str]) -> StateStore:
+    """Build a state store from a URL (memory:// when unset)."""
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        print("[INFO] Using Redis state store (shared across workers)")
+        return RedisStateStore(url)
+
+    return MemoryStateStore()
+
+
+# Singleton instance
+state_store = create_state_store(Config.STATE_STORE_URL)
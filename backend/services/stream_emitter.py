@@ -0,0 +1,297 @@
+"""
+Stream Emitter for TrueMirror
+Coalesces model deltas into frames by time window and byte size before they are
+emitted to the client, instead of one Socket.IO packet (plus an artificial
+sleep) per token. Smoothness comes from frame pacing, not from slowing the
+upstream read.
+
+- ChunkCoalescer: for streams read on a regular thread. Window deadlines are
+  kept by one process-wide FrameFlusher thread, never a thread per stream.
+- AsyncChunkCoalescer: for streams read on the shared event loop. Deadlines are
+  loop timers and frames are emitted off the loop, in order.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict
+from config import Config
+
+
+class StreamMetrics:
+    """Process-wide frame counters for streamed responses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.deltas = 0
+        self.frames = 0
+        self.bytes = 0
+        self.stream_seconds = 0.0
+
+    def record_frame(self, size: int, deltas: int):
+        with self._lock:
+            self.frames += 1
+            self.bytes += size
+            self.deltas += deltas
+
+    def record_stream(self, duration: float):
+        with self._lock:
+            self.streams += 1
+            self.stream_seconds += duration
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'streams': self.streams,
+                'deltas': self.deltas,
+                'frames': self.frames,
+                'bytes': self.bytes,
+                'frames_per_sec': round(self.frames / self.stream_seconds, 2) if self.stream_seconds else 0.0,
+                'bytes_per_frame': round(self.bytes / self.frames, 1) if self.frames else 0.0,
+                'deltas_per_frame': round(self.deltas / self.frames, 2) if self.frames else 0.0
+            }
+
+
+class FrameFlusher:
+    """
+    Process-wide deadline heap for ChunkCoalescers. One thread waits for the
+    earliest window to close and hands the flush to a small pool, so a slow
+    emit on one stream never holds up the frames of the others.
+    """
+
+    def __init__(self, max_workers: int):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='frame-flush')
+
+    def schedule(self, deadline: float, coalescer: 'ChunkCoalescer'):
+        """Flush `coalescer` once time.monotonic() reaches `deadline`."""
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._seq), coalescer))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='frame-flusher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                wait = self._heap[0][0] - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, _, coalescer = heapq.heappop(self._heap)
+            self._pool.submit(coalescer._on_deadline)
+
+
+class ChunkCoalescer:
+    """
+    Buffer text deltas and hand them to `send` as frames.
+
+    A frame is flushed when `flush_interval_ms` has elapsed since the previous
+    frame or the buffer reaches `max_bytes`. The first delta is flushed
+    immediately so time-to-first-chunk is not delayed. The first buffered delta
+    also registers the window's deadline with the FrameFlusher, so buffered text
+    never waits on the next delta to go out.
+
+    `push` never sends: frames go out on the flusher's pool, one at a time and
+    in order, so the producer never waits on an emit. Text pushed while a frame
+    is in flight goes out at the next deadline. `close` sends the tail itself
+    and returns once it is out.
+    """
+
+    def __init__(self, send: Callable[[str], None], flush_interval_ms: int = None,
+                 max_bytes: int = None, metrics: StreamMetrics = None, flusher: FrameFlusher = None):
+        self.send = send
+        self.flush_interval = (flush_interval_ms if flush_interval_ms is not None
+                               else Config.STREAM_FLUSH_INTERVAL_MS) / 1000
+        self.max_bytes = max_bytes if max_bytes is not None else Config.STREAM_FLUSH_MAX_BYTES
+        self.metrics = metrics if metrics is not None else stream_metrics
+        self.flusher = flusher if flusher is not None else frame_flusher
+
+        self._parts = []
+        self._bytes = 0
+        self._last_flush = 0.0
+        self._started = time.monotonic()
+        self._armed = False      # a deadline for the buffered text is in the flusher
+        self._closed = False
+        self._lock = threading.Lock()       # buffer
+        self._send_lock = threading.Lock()  # the frame in flight
+
+    def push(self, delta: str):
+        """Add a delta; flush if the time window or byte budget is reached."""
+        if not delta:
+            return
+
+        with self._lock:
+            self._parts.append(delta)
+            self._bytes += len(delta.encode('utf-8'))
+            now = time.monotonic()
+            if self._bytes >= self.max_bytes or now - self._last_flush >= self.flush_interval:
+                # Due now: may join a later deadline already pending, which then finds nothing to send
+                self._armed = True
+                deadline = now
+            else:
+                deadline = self._arm()
+
+        if deadline is not None:
+            self.flusher.schedule(deadline, self)
+
+    def flush(self):
+        """Send the buffered text as one frame (waits for a frame in flight)."""
+        self._deliver(block=True)
+
+    def _arm(self):
+        """Deadline to register for the buffered text, if none is pending (hold _lock)."""
+        if self._armed or self._closed or not self._parts:
+            return None
+        self._armed = True
+        return self._last_flush + self.flush_interval
+
+    def _on_deadline(self):
+        with self._lock:
+            self._armed = False
+        self._deliver(block=False)
+
+    def _deliver(self, block: bool):
+        # A busy send lock means another frame is going out; its sender re-arms
+        # the deadline for whatever is buffered once it is done
+        if not self._send_lock.acquire(blocking=block):
+            return
+        try:
+            with self._lock:
+                if not self._parts:
+                    return
+                text = ''.join(self._parts)
+                self.metrics.record_frame(self._bytes, len(self._parts))
+                self._parts = []
+                self._bytes = 0
+                self._last_flush = time.monotonic()
+            self.send(text)
+        finally:
+            self._send_lock.release()
+            with self._lock:
+                deadline = self._arm()
+            if deadline is not None:
+                self.flusher.schedule(deadline, self)
+
+    def close(self):
+        """Flush the tail and record the stream duration."""
+        self.flush()
+        with self._lock:
+            self._closed = True
+        self.metrics.record_stream(time.monotonic() - self._started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class AsyncChunkCoalescer:
+    """
+    ChunkCoalescer for streams read on an event loop.
+
+    The window deadline is a `loop.call_later` timer and frames go through a
+    queue to one sender task, which calls the blocking `send` via `run_blocking`
+    (e.g. stream_runner.run_blocking). The loop never waits on a lock or an emit.
+    Use as `async with AsyncChunkCoalescer(...) as frames:` and call `frames.push`.
+    """
+
+    def __init__(self, send: Callable[[str], None], run_blocking: Callable[..., Awaitable],
+                 flush_interval_ms: int = None, max_bytes: int = None, metrics: StreamMetrics = None):
+        self.send = send
+        self.run_blocking = run_blocking
+        self.flush_interval = (flush_interval_ms if flush_interval_ms is not None
+                               else Config.STREAM_FLUSH_INTERVAL_MS) / 1000
+        self.max_bytes = max_bytes if max_bytes is not None else Config.STREAM_FLUSH_MAX_BYTES
+        self.metrics = metrics if metrics is not None else stream_metrics
+
+        self._parts = []
+        self._bytes = 0
+        self._last_flush = 0.0
+        self._started = time.monotonic()
+        self._timer = None
+        self._loop = None
+        self._frames = None
+        self._sender = None
+
+    def push(self, delta: str):
+        """Add a delta; flush if the time window or byte budget is reached."""
+        if not delta:
+            return
+
+        self._parts.append(delta)
+        self._bytes += len(delta.encode('utf-8'))
+
+        wait = self.flush_interval - (time.monotonic() - self._last_flush)
+        if self._bytes >= self.max_bytes or wait <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(wait, self.flush)
+
+    def flush(self):
+        """Queue the buffered text as one frame."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._parts:
+            return
+
+        text = ''.join(self._parts)
+        self.metrics.record_frame(self._bytes, len(self._parts))
+        self._parts = []
+        self._bytes = 0
+        self._last_flush = time.monotonic()
+        self._frames.put_nowait(text)
+
+    async def _send_frames(self):
+        while True:
+            text = await self._frames.get()
+            if text is None:
+                return
+            try:
+                await self.run_blocking(self.send, text)
+            except Exception as e:
+                print(f"[WARN] Failed to emit stream frame: {str(e)}")
+
+    async def aclose(self):
+        """Flush the tail, wait for every frame to be sent and record the stream duration."""
+        self.flush()
+        self._frames.put_nowait(None)
+        await self._sender
+        self.metrics.record_stream(time.monotonic() - self._started)
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._frames = asyncio.Queue()
+        self._sender = self._loop.create_task(self._send_frames())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+        return False
+
+
+# Singletons
+stream_metrics = StreamMetrics()
+frame_flusher = FrameFlusher(max_workers=Config.STREAM_FLUSH_WORKERS)
+
+
+def get_stream_config() -> Dict:
+    """Current coalescing configuration."""
+    return {
+        'flush_interval_ms': Config.STREAM_FLUSH_INTERVAL_MS,
+        'max_bytes': Config.STREAM_FLUSH_MAX_BYTES
+    }
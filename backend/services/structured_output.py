@@ -0,0 +1,236 @@
+"""
+Structured Outputs for TrueMirror
+JSON schemas for the personalized-setup LLM calls, sent as a `json_schema`
+response_format so the model is constrained to valid, complete JSON, and
+validators compiled once at import time to check what comes back.
+
+Uses `jsonschema` when installed; otherwise a small built-in validator that
+covers the subset of JSON Schema used here (type, properties, required,
+additionalProperties, items, enum). Parse and schema failures are
+counted on /api/metrics.
+"""
+
+import json
+from typing import Any, Callable, Dict, List
+from services.metrics import registry
+
+try:
+    from jsonschema import Draft202012Validator
+except ImportError:
+    Draft202012Validator = None
+
+parse_failures = registry.counter(
+    'truemirror_llm_parse_failures_total', 'Structured LLM responses that failed to parse or validate',
+    ('call_type', 'reason'))
+parse_repairs = registry.counter(
+    'truemirror_llm_parse_repairs_total', 'Repair retries after a structured response failed', ('call_type', 'outcome'))
+
+STRING_LIST = {'type': 'array', 'items': {'type': 'string'}}
+
+EXTRACTED_INFO_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'position': {'type': 'string'},
+        'industry': {'type': 'string'},
+        'candidate_skills': STRING_LIST,
+        'experience_level': {'type': 'string'},
+        'job_requirements': {'type': 'string'},
+        'candidate_background': {'type': 'string'},
+        'key_focus_areas': STRING_LIST
+    },
+    'required': [
+        'position', 'industry', 'candidate_skills', 'experience_level',
+        'job_requirements', 'candidate_background', 'key_focus_areas'
+    ],
+    'additionalProperties': False
+}
+
+QUESTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'section': {'type': 'string'},
+        'question_text': {'type': 'string'},
+        'question_type': {'type': 'string', 'enum': ['Behavioral', 'Technical', 'Situational']},
+        'purpose': {'type': 'string'},
+        'expected_duration_minutes': {'type': 'integer'},
+        'guidelines': {
+            'type': 'object',
+            'properties': {
+                'must_have': STRING_LIST,
+                'should_avoid': STRING_LIST
+            },
+            'required': ['must_have', 'should_avoid'],
+            'additionalProperties': False
+        },
+        'popup_questions': STRING_LIST
+    },
+    'required': [
+        'section', 'question_text', 'question_type', 'purpose',
+        'expected_duration_minutes', 'guidelines', 'popup_questions'
+    ],
+    'additionalProperties': False
+}
+
+PERSONALIZED_QUESTIONS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'questions': {'type': 'array', 'items': QUESTION_SCHEMA}
+    },
+    'required': ['questions'],
+    'additionalProperties': False
+}
+
+FUSED_SETUP_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'profile': EXTRACTED_INFO_SCHEMA,
+        'questions': {'type': 'array', 'items': QUESTION_SCHEMA}
+    },
+    'required': ['profile', 'questions'],
+    'additionalProperties': False
+}
+
+_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'number': (int, float),
+    'boolean': bool
+}
+
+
+class StructuredOutputError(Exception):
+    """Model output that is not valid JSON or does not match the schema."""
+
+    def __init__(self, reason: str, errors: List[str]):
+        super().__init__(f"{reason}: {'; '.join(errors[:5])}")
+        self.reason = reason  # 'json' or 'schema'
+        self.errors = errors
+
+
+def _compile_subset(schema: Dict) -> Callable[[Any, str], List[str]]:
+    """Compile a schema into a checker returning error messages (empty when valid)."""
+    checks = []
+
+    schema_type = schema.get('type')
+    if schema_type == 'integer':
+        checks.append(lambda value, path: [] if isinstance(value, int) and not isinstance(value, bool)
+                      else [f"{path}: expected integer"])
+    elif schema_type in _TYPES:
+        expected = _TYPES[schema_type]
+        checks.append(lambda value, path: [] if isinstance(value, expected) and
+                      (schema_type == 'boolean' or not isinstance(value, bool))
+                      else [f"{path}: expected {schema_type}"])
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+        checks.append(lambda value, path: [] if value in allowed else [f"{path}: must be one of {allowed}"])
+
+    if schema_type == 'object':
+        properties = {name: _compile_subset(sub) for name, sub in schema.get('properties', {}).items()}
+        required = schema.get('required', [])
+        closed = schema.get('additionalProperties') is False
+
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}: missing '{name}'" for name in required if name not in value]
+            for name, item in value.items():
+                if name in properties:
+                    errors.extend(properties[name](item, f"{path}.{name}"))
+                elif closed:
+                    errors.append(f"{path}: unexpected '{name}'")
+            return errors
+        checks.append(check_object)
+
+    if schema_type == 'array':
+        item_check = _compile_subset(schema.get('items', {}))
+
+        def check_array(value, path):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for index, item in enumerate(value):
+                errors.extend(item_check(item, f"{path}[{index}]"))
+            return errors
+        checks.append(check_array)
+
+    def check(value, path='$'):
+        errors = []
+        for rule in checks:
+            errors.extend(rule(value, path))
+            if errors:
+                break  # type mismatch makes the remaining rules meaningless
+        return errors
+    return check
+
+
+def compile_validator(schema: Dict) -> Callable[[Any], List[str]]:
+    """Precompile a schema; the returned function lists validation errors."""
+    if Draft202012Validator is not None:
+        validator = Draft202012Validator(schema)
+        return lambda value: [
+            f"$.{'.'.join(str(p) for p in error.absolute_path)}: {error.message}" for error in validator.iter_errors(value)
+        ]
+    return _compile_subset(schema)
+
+
+class StructuredOutput:
+    """A named response schema: request format, validation and repair prompt."""
+
+    def __init__(self, name: str, schema: Dict):
+        self.name = name
+        self.schema = schema
+        self._validate = compile_validator(schema)
+
+    @property
+    def response_format(self) -> Dict:
+        """response_format argument for chat.completions.create."""
+        return {
+            'type': 'json_schema',
+            'json_schema': {'name': self.name, 'schema': self.schema, 'strict': True}
+        }
+
+    def errors(self, value: Any) -> List[str]:
+        return self._validate(value)
+
+    def parse(self, text: str, call_type: str) -> Any:
+        """
+        Parse and validate a model response.
+
+        Raises:
+            StructuredOutputError (also counted in truemirror_llm_parse_failures_total)
+        """
+        text = (text or '').strip()
+        if text.startswith('```'):
+            # Only reachable when the schema was not enforced (STRUCTURED_OUTPUTS_ENABLED off)
+            text = text.split('\n', 1)[-1].rsplit('```', 1)[0]
+
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            parse_failures.inc(call_type=call_type, reason='json')
+            raise StructuredOutputError('json', [str(e)])
+
+        errors = self.errors(value)
+        if errors:
+            parse_failures.inc(call_type=call_type, reason='schema')
+            raise StructuredOutputError('schema', errors)
+        return value
+
+    def repair_prompt(self, error: StructuredOutputError) -> str:
+        """Follow-up message asking the model to fix only what failed."""
+        problems = '\n'.join(f"- {message}" for message in error.errors[:10])
+        return (
+            "Your previous response could not be used because it "
+            f"{'is not valid JSON' if error.reason == 'json' else 'does not match the required schema'}:\n"
+            f"{problems}\n\n"
+            "Return the corrected JSON only, keeping all valid content unchanged. "
+            "No markdown, no explanation."
+        )
+
+
+extracted_info_output = StructuredOutput('extracted_info', EXTRACTED_INFO_SCHEMA)
+personalized_questions_output = StructuredOutput('personalized_questions', PERSONALIZED_QUESTIONS_SCHEMA)
+question_output = StructuredOutput('personalized_question', QUESTION_SCHEMA)
+fused_setup_output = StructuredOutput('personalized_setup', FUSED_SETUP_SCHEMA)
@@ -0,0 +1,166 @@
+"""
+Vision Cache for TrueMirror
+Content-addressed, disk-backed cache for vision text extraction results.
+Entries are keyed by SHA-256 of the uploaded file bytes plus the extraction
+prompt version and model, so re-uploading the same CV skips the vision call.
+The directory is bounded by total bytes; least recently used entries are
+evicted first. Recency and sizes are tracked in memory (an LRU index plus a
+running byte total, seeded by one directory walk on first use, ordered by file
+mtime, which hits keep refreshing), so writes and stats never walk the disk.
+Each process evicts from its own index; entries another process wrote are
+picked up when this process reads them.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from config import Config
+
+
+def hash_bytes(content: bytes) -> str:
+    """SHA-256 hex digest of raw file content."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class VisionCache:
+    """Bounded on-disk store of extracted text, one UTF-8 file per entry."""
+
+    SUFFIX = '.txt'
+
+    def __init__(self, directory: str, max_bytes: int, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._index = None  # key -> size in bytes, least recently used first
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(content_hash: str, prompt_version: str, model: str, part: str = '') -> str:
+        """Cache key for one extraction (optionally one part, e.g. a PDF page)."""
+        raw = f"{content_hash}|{prompt_version}|{model}|{part}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        # Shard by prefix so no directory grows unbounded
+        return os.path.join(self.directory, key[:2], key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text for a key, or None."""
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path)  # recency survives restarts
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._track(key, len(text.encode('utf-8')))
+        return text
+
+    def set(self, key: str, text: str):
+        """Store text for a key, then evict LRU entries beyond the byte budget."""
+        if not self.enabled or not text:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Vision cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self.writes += 1
+            self._track(key, len(text.encode('utf-8')))
+            self._enforce_budget()
+
+    def _load_index(self):
+        """Seed the LRU index from disk, oldest mtime first (once per process; hold _lock)."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[:-len(self.SUFFIX)], stat.st_size))
+
+        self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._bytes = sum(self._index.values())
+
+    def _ensure_index(self):
+        if self._index is None:
+            self._load_index()
+
+    def _track(self, key: str, size: int):
+        """Record a key as most recently used (hold _lock)."""
+        self._ensure_index()
+        self._bytes += size - self._index.pop(key, 0)
+        self._index[key] = size
+
+    def _enforce_budget(self):
+        while self._bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                continue  # already gone (another process evicted it)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        """Drop one entry."""
+        with self._lock:
+            if self._index is not None:
+                self._bytes -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current usage (from the in-memory index)."""
+        with self._lock:
+            if self.enabled:
+                self._ensure_index()
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._index) if self._index is not None else 0,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'evictions': self.evictions
+            }
+
+
+# Singleton instance
+vision_cache = VisionCache(
+    Config.VISION_CACHE_DIR,
+    max_bytes=Config.VISION_CACHE_MAX_BYTES,
+    enabled=Config.VISION_CACHE_ENABLED
+)
@@ -0,0 +1,60 @@
+"""
+Shared pytest fixtures for the TrueMirror backend.
+Tests run against an in-memory SQLite database with a minimal Flask app.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Config reads these at import time; tests never reach the real services
+os.environ.setdefault('AZURE_OPENAI_KEY', 'test-key')
+os.environ.setdefault('AZURE_OPENAI_BASE_URL', 'http://127.0.0.1:9/v1')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from models import db
+
+
+@pytest.fixture
+def app():
+    """Flask app bound to a fresh in-memory database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def statement_counter(app):
+    """Counts the SQL statements a call sends to the database."""
+
+    class StatementCounter:
+        def __init__(self):
+            self.count = 0
+
+        def __call__(self, conn, cursor, statement, parameters, context, executemany):
+            self.count += 1
+
+        def measure(self, fn, *args, **kwargs):
+            """Run fn in a clean session and return (result, statements executed)."""
+            db.session.expire_all()
+            self.count = 0
+            event.listen(db.engine, 'before_cursor_execute', self)
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', self)
+            return result, self.count
+
+    return StatementCounter()
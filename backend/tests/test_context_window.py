@@ -0,0 +1,113 @@
+"""
+Context window tests: the prompt stays within the session's token budget,
+the rolling summary replaces folded turns, and messages cut by the budget
+are queued for the next background fold.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from config import Config
+from services.context_window import (
+    build_context_messages, estimate_tokens, pending_fold, truncation_key
+)
+from services.state_store import state_store
+
+SYSTEM_PROMPT = 'Bạn là người phỏng vấn.'
+
+
+@pytest.fixture
+def interview(monkeypatch):
+    """Session stub with a small standard budget; clears its truncation marker afterwards."""
+    monkeypatch.setattr(Config, 'CONTEXT_TOKEN_BUDGETS', {'standard': 300, 'personalized': 600})
+    monkeypatch.setattr(Config, 'CONTEXT_KEEP_TURNS', 2)
+    monkeypatch.setattr(Config, 'CONTEXT_SUMMARY_MIN_TURNS', 2)
+    session = SimpleNamespace(id=9001, mode='standard', context_summary=None, context_summary_upto=0)
+    state_store.delete(truncation_key(session.id))
+    yield session
+    state_store.delete(truncation_key(session.id))
+
+
+def dialogue(turns: int, chars: int = 100):
+    messages = [{'role': 'system', 'content': SYSTEM_PROMPT}]
+    for turn in range(turns):
+        messages.append({'role': 'assistant', 'content': f'Q{turn} ' + 'q' * chars})
+        messages.append({'role': 'user', 'content': f'A{turn} ' + 'a' * chars})
+    return messages
+
+
+def prompt_tokens(messages):
+    return estimate_tokens(SYSTEM_PROMPT) + sum(estimate_tokens(msg['content']) for msg in messages)
+
+
+def test_short_conversation_is_sent_verbatim(interview):
+    history = dialogue(2)
+
+    messages = build_context_messages(interview, history, SYSTEM_PROMPT)
+
+    assert [msg['content'] for msg in messages] == [msg['content'] for msg in history[1:]]
+    assert state_store.get(truncation_key(interview.id)) is None
+
+
+def test_long_conversation_is_cut_to_the_budget(interview):
+    history = dialogue(20)
+
+    messages = build_context_messages(interview, history, SYSTEM_PROMPT)
+
+    assert prompt_tokens(messages) <= 300
+    # The newest messages are kept, in order
+    assert messages[-1]['content'] == history[-1]['content']
+    assert [msg['content'] for msg in messages] == [msg['content'] for msg in history[-len(messages):]]
+
+    kept_from = 40 - len(messages)
+    assert state_store.get(truncation_key(interview.id)) == kept_from
+
+
+def test_budget_depends_on_the_session_mode(interview):
+    history = dialogue(20)
+    standard = build_context_messages(interview, history, SYSTEM_PROMPT)
+
+    interview.mode = 'personalized'
+    personalized = build_context_messages(interview, history, SYSTEM_PROMPT)
+
+    assert len(personalized) > len(standard)
+    assert prompt_tokens(personalized) <= 600
+
+
+def test_latest_message_is_kept_even_over_budget(interview):
+    history = dialogue(1, chars=5000)
+
+    messages = build_context_messages(interview, history, SYSTEM_PROMPT)
+
+    assert messages == [{'role': 'user', 'content': history[-1]['content']}]
+
+
+def test_summary_replaces_folded_turns(interview):
+    history = dialogue(3)
+    interview.context_summary = 'Ứng viên đã giới thiệu bản thân.'
+    interview.context_summary_upto = 4
+
+    messages = build_context_messages(interview, history, SYSTEM_PROMPT)
+
+    assert messages[0]['role'] == 'system'
+    assert interview.context_summary in messages[0]['content']
+    assert [msg['content'] for msg in messages[1:]] == [msg['content'] for msg in history[5:]]
+
+
+def test_pending_fold_batches_turns_outside_the_window(interview):
+    # 2 kept turns + 1 older turn: below the 2-turn fold batch
+    assert pending_fold(interview, dialogue(3)) == []
+
+    history = dialogue(4)
+    assert pending_fold(interview, history) == history[1:5]
+
+
+def test_budget_cut_is_folded_without_batching(interview):
+    history = dialogue(20)
+    messages = build_context_messages(interview, history, SYSTEM_PROMPT)
+    kept_from = 40 - len(messages)
+
+    to_fold = pending_fold(interview, history)
+
+    # Everything the prompt dropped, even inside the verbatim window
+    assert to_fold == history[1:1 + max(kept_from, 40 - Config.CONTEXT_KEEP_TURNS * 2)]
@@ -0,0 +1,193 @@
+"""
+Job queue tests: enqueue dedup (including the race the unique index
+catches), the conditional claim, lease-guarded writes and retries.
+Jobs are run inline with JOB_EXECUTOR=external so nothing is dispatched
+to the worker pools.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from config import Config
+from models import db, BackgroundJob
+from services.job_queue import JobLeaseLost, JobQueue, PermanentJobError
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_EXECUTOR', 'external')
+    queue = JobQueue(pools={'default': 1, 'batch': 1})
+    queue.init_app(app)
+    monkeypatch.setattr(queue, '_ensure_heartbeat', lambda: None)
+    return queue
+
+
+def reload(job_id: str) -> BackgroundJob:
+    db.session.expire_all()
+    return db.session.get(BackgroundJob, job_id)
+
+
+def test_enqueue_returns_the_active_job_for_the_same_target(queue):
+    queue.register('evaluate', lambda job, progress: None)
+
+    first = queue.enqueue('evaluate', 1, {'n': 1}, target='42')
+    second = queue.enqueue('evaluate', 1, {'n': 2}, target='42')
+    other_target = queue.enqueue('evaluate', 1, {'n': 3}, target='43')
+    untargeted = [queue.enqueue('evaluate', 1, {}) for _ in range(2)]
+
+    assert second.id == first.id
+    assert other_target.id != first.id
+    assert untargeted[0].id != untargeted[1].id
+    assert BackgroundJob.query.count() == 4
+
+
+def test_enqueue_race_is_resolved_by_the_unique_index(queue, monkeypatch):
+    queue.register('evaluate', lambda job, progress: None)
+    first = queue.enqueue('evaluate', 1, {}, target='42')
+
+    # The second request checked before the first one committed: only the index stops it
+    real_find_active = queue.find_active
+    checks = []
+
+    def find_active_after_race(*args):
+        checks.append(args)
+        return None if len(checks) == 1 else real_find_active(*args)
+
+    monkeypatch.setattr(queue, 'find_active', find_active_after_race)
+
+    second = queue.enqueue('evaluate', 1, {}, target='42')
+
+    assert second.id == first.id
+    assert len(checks) == 2
+    assert BackgroundJob.query.count() == 1
+
+
+def test_finished_job_does_not_block_a_new_one(queue):
+    queue.register('evaluate', lambda job, progress: {'ok': True})
+    first = queue.enqueue('evaluate', 1, {}, target='42')
+    queue._run(first.id)
+
+    second = queue.enqueue('evaluate', 1, {}, target='42')
+
+    assert second.id != first.id
+
+
+def test_claim_is_taken_once_and_respects_run_after(queue):
+    queue.register('evaluate', lambda job, progress: None)
+    job = queue.enqueue('evaluate', 1, {})
+
+    assert queue._claim(job.id)
+    assert not queue._claim(job.id)
+    assert reload(job.id).status == 'running'
+    assert reload(job.id).attempts == 1
+
+    later = queue.enqueue('evaluate', 1, {})
+    BackgroundJob.query.filter_by(id=later.id).update(
+        {'run_after': datetime.now(timezone.utc) + timedelta(minutes=5)})
+    db.session.commit()
+    assert not queue._claim(later.id)
+
+
+def test_writes_need_the_current_claim(queue):
+    queue.register('evaluate', lambda job, progress: None)
+    job = queue.enqueue('evaluate', 1, {})
+    queue._claim(job.id)
+
+    assert queue._update_claimed(job.id, 1, {'stage': 'analyzed'})
+    assert not queue._update_claimed(job.id, 0, {'stage': 'stale'})
+    assert reload(job.id).stage == 'analyzed'
+
+
+def test_successful_run_stores_the_result_and_clears_the_payload(queue):
+    stages = []
+
+    def handler(job, progress):
+        progress('analyzed', 50)
+        stages.append(reload(job.id).stage)
+        return {'session_id': 7}
+
+    queue.register('setup', handler)
+    job = queue.enqueue('setup', 1, {'files': ['cv.pdf']})
+
+    queue._run(job.id)
+
+    job = reload(job.id)
+    assert stages == ['analyzed']
+    assert (job.status, job.progress, job.result) == ('succeeded', 100, {'session_id': 7})
+    assert job.payload_json is None
+
+
+def test_failed_attempt_is_retried_then_fails_for_good(queue):
+    failures = []
+
+    def handler(job, progress):
+        raise RuntimeError('provider down')
+
+    queue.register('setup', handler, max_attempts=2, on_failure=lambda job, error: failures.append(error))
+    job = queue.enqueue('setup', 1, {'files': []})
+
+    queue._run(job.id)
+    retrying = reload(job.id)
+    assert (retrying.status, retrying.stage, retrying.attempts) == ('queued', 'retrying', 1)
+    assert retrying.run_after is not None
+    assert retrying.payload_json is not None  # the next attempt needs its inputs
+
+    BackgroundJob.query.filter_by(id=job.id).update({'run_after': None})
+    db.session.commit()
+    queue._run(job.id)
+
+    failed = reload(job.id)
+    assert (failed.status, failed.attempts, failed.error) == ('failed', 2, 'provider down')
+    assert failed.payload_json is None
+    assert failures == ['provider down']
+
+
+def test_permanent_error_is_not_retried(queue):
+    def handler(job, progress):
+        raise PermanentJobError('session deleted')
+
+    queue.register('setup', handler, max_attempts=3)
+    job = queue.enqueue('setup', 1, {})
+
+    queue._run(job.id)
+
+    assert reload(job.id).status == 'failed'
+    assert reload(job.id).attempts == 1
+
+
+def test_run_that_lost_its_lease_does_not_finish_the_job(queue):
+    def handler(job, progress):
+        # Requeued as stalled and claimed again by another worker meanwhile
+        BackgroundJob.query.filter_by(id=job.id).update({'attempts': 2})
+        db.session.commit()
+        progress('analyzed', 50)
+        return {'session_id': 7}
+
+    queue.register('setup', handler)
+    job = queue.enqueue('setup', 1, {})
+
+    queue._run(job.id)
+
+    job = reload(job.id)
+    assert (job.status, job.stage, job.result) == ('running', 'queued', None)
+
+
+def test_progress_raises_once_the_lease_is_lost(queue):
+    raised = []
+
+    def handler(job, progress):
+        BackgroundJob.query.filter_by(id=job.id).update({'status': 'queued'})
+        db.session.commit()
+        try:
+            progress('analyzed', 50)
+        except JobLeaseLost as e:
+            raised.append(e)
+            raise
+
+    queue.register('setup', handler)
+    job = queue.enqueue('setup', 1, {})
+
+    queue._run(job.id)
+
+    assert len(raised) == 1
+    assert reload(job.id).status == 'queued'
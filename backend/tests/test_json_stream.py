@@ -0,0 +1,84 @@
+"""
+JsonArrayStreamParser tests: elements must come out whole and in order
+however the LLM stream splits the text, including inside strings and
+escape sequences.
+"""
+
+import json
+
+import pytest
+from services.json_stream import JsonArrayStreamParser
+
+QUESTIONS = [
+    {'section': 'Giới thiệu', 'question_text': 'Hãy giới thiệu về bản thân.'},
+    {'section': 'Kỹ thuật', 'question_text': 'Giải thích {"a": [1, 2]} và dấu \\ trong "JSON".'},
+    {'section': 'Kỹ thuật', 'question_text': 'Closing ] and } inside a string', 'tags': ['x', {'y': [1]}]},
+]
+
+
+def parse(chunks):
+    """Feed chunks one by one; return (elements, parser)."""
+    parser = JsonArrayStreamParser()
+    elements = []
+    for chunk in chunks:
+        elements.extend(parser.feed(chunk))
+    return elements, parser
+
+
+def split_every(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64])
+def test_elements_survive_any_chunk_boundary(size):
+    text = json.dumps({'questions': QUESTIONS}, ensure_ascii=False)
+
+    elements, parser = parse(split_every(text, size))
+
+    assert elements == QUESTIONS
+    assert parser.complete
+    assert parser.items == len(QUESTIONS)
+    assert parser.errors == 0
+
+
+def test_chunk_split_inside_escape_sequence():
+    text = json.dumps([{'q': 'a "quoted" \\ path'}, {'q': 'next'}])
+    backslash = text.index('\\')
+
+    elements, _ = parse([text[:backslash + 1], text[backslash + 1:]])
+
+    assert elements == [{'q': 'a "quoted" \\ path'}, {'q': 'next'}]
+
+
+def test_element_is_yielded_before_the_array_closes():
+    parser = JsonArrayStreamParser()
+
+    first = list(parser.feed('```json\n[{"q": "one"}, {"q": '))
+
+    assert first == [{'q': 'one'}]
+    assert not parser.complete
+    assert list(parser.feed('"two"}]\n```')) == [{'q': 'two'}]
+    assert parser.complete
+
+
+def test_brackets_in_strings_before_the_array_are_ignored():
+    text = '{"note": "see [1] and \\"[2]\\"", "questions": [{"q": "one"}]}'
+
+    elements, parser = parse(split_every(text, 5))
+
+    assert elements == [{'q': 'one'}]
+    assert parser.complete
+
+
+def test_invalid_element_is_counted_and_skipped():
+    elements, parser = parse(['[{"q": "one"}, {"q": tru}, {"q": "three"}]'])
+
+    assert elements == [{'q': 'one'}, {'q': 'three'}]
+    assert parser.errors == 1
+
+
+def test_text_after_the_array_is_ignored():
+    elements, parser = parse(['[{"q": "one"}]', ' [{"q": "ignored"}]'])
+
+    assert elements == [{'q': 'one'}]
+    assert parser.items == 1
@@ -0,0 +1,97 @@
+"""
+Query-count tests for the question bank: loading the position tree and
+serving standard-mode questions must cost the same number of statements
+whatever the size of the seeded bank.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from models import (
+    db, Industry, JobLevel, Position, QuestionSection,
+    InterviewQuestion, QuestionGuideline, PopupQuestion
+)
+from services.question_bank import QuestionBank, load_position_tree
+import routes.websocket_routes as websocket_routes
+
+
+def seed_bank(sections: int, questions_per_section: int):
+    """Seed one IT / Senior position with the given number of sections and questions."""
+    position = Position(
+        name='Backend Engineer',
+        industry=Industry(name='IT'),
+        job_level=JobLevel(name='Senior'),
+        language='vi',
+        total_duration_minutes=45
+    )
+    db.session.add(position)
+
+    for s in range(1, sections + 1):
+        section = QuestionSection(position=position, section_number=s,
+                                  section_name=f'Section {s}', duration_minutes=10)
+        db.session.add(section)
+
+        for q in range(1, questions_per_section + 1):
+            question = InterviewQuestion(
+                section=section,
+                question_id_code=f'IT_SENIOR_{s:02d}_{q:02d}',
+                question_text=f'Question {s}.{q}',
+                question_type_text='Technical',
+                pressure_level_text='Medium',
+                purpose='Check fundamentals',
+                expected_duration_minutes=3,
+                question_number=q
+            )
+            db.session.add_all([
+                question,
+                PopupQuestion(question=question, popup_text=f'Follow-up {s}.{q}', order_number=1),
+                QuestionGuideline(question=question, guideline_type='must_have', content='Concrete example'),
+                QuestionGuideline(question=question, guideline_type='should_avoid', content='Vague answer')
+            ])
+
+    db.session.commit()
+
+
+def standard_session():
+    return SimpleNamespace(id=1, mode='standard', custom_questions=None,
+                           industry='IT', position='Senior', language='vi')
+
+
+def measure_bank(statement_counter, monkeypatch, sections: int, questions_per_section: int):
+    """Seed a bank and return (tree statements, load statements, lookup statements, context)."""
+    seed_bank(sections, questions_per_section)
+
+    position, tree_statements = statement_counter.measure(load_position_tree, 'IT', 'Senior')
+    assert len(position.sections) == sections
+
+    bank = QuestionBank()
+    monkeypatch.setattr(websocket_routes, 'question_bank', bank)
+    _, load_statements = statement_counter.measure(bank.load)
+
+    context, lookup_statements = statement_counter.measure(
+        websocket_routes.get_questions_for_session, standard_session()
+    )
+    assert context.count('Follow-up ') == sections * questions_per_section
+    return tree_statements, load_statements, lookup_statements
+
+
+@pytest.mark.parametrize('sections, questions_per_section', [(1, 1), (6, 5)])
+def test_position_tree_loads_in_five_statements(app, statement_counter, sections, questions_per_section):
+    seed_bank(sections, questions_per_section)
+
+    _, statements = statement_counter.measure(load_position_tree, 'IT', 'Senior')
+
+    # position, sections, questions, popups, guidelines
+    assert statements == 5
+
+
+def test_statement_count_does_not_grow_with_bank_size(app, statement_counter, monkeypatch):
+    small = measure_bank(statement_counter, monkeypatch, sections=1, questions_per_section=1)
+
+    db.drop_all()
+    db.create_all()
+    large = measure_bank(statement_counter, monkeypatch, sections=6, questions_per_section=5)
+
+    assert small == large
+    # Standard-mode questions come from the in-memory index
+    assert large[2] == 0
@@ -0,0 +1,194 @@
+"""
+Resilience tests: circuit breaker transitions (including throttling and
+cancelled trial calls) and the retry budget. Backoff sleeps are patched out.
+"""
+
+import asyncio
+import time
+
+import pytest
+import services.resilience as resilience
+from config import Config
+from services.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, RetryBudget
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+
+def failing(status_code: int):
+    def call():
+        raise ProviderError(status_code)
+    return call
+
+
+@pytest.fixture
+def caller(monkeypatch):
+    """ResilientCaller without retries: each call is one attempt, breaker opens after 2 failures."""
+    monkeypatch.setattr(Config, 'LLM_MAX_RETRIES', 0)
+    monkeypatch.setattr(Config, 'LLM_CIRCUIT_FAILURE_THRESHOLD', 2)
+    monkeypatch.setattr(Config, 'LLM_CIRCUIT_RECOVERY_SECONDS', 30)
+    return ResilientCaller('test-deployment')
+
+
+def expire_cool_down(breaker: CircuitBreaker):
+    breaker.opened_at = time.monotonic() - breaker.recovery_seconds - 1
+
+
+def test_breaker_opens_after_consecutive_failures(caller):
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            caller.call(failing(503))
+
+    assert caller.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError) as error:
+        caller.call(lambda: 'not called')
+    assert 0 < error.value.retry_in <= 30
+
+
+def test_success_resets_the_failure_count(caller):
+    with pytest.raises(ProviderError):
+        caller.call(failing(503))
+    assert caller.call(lambda: 'ok') == 'ok'
+    with pytest.raises(ProviderError):
+        caller.call(failing(503))
+
+    assert caller.breaker.state == 'closed'
+
+
+def test_client_errors_do_not_count_as_failures(caller):
+    for _ in range(3):
+        with pytest.raises(ProviderError):
+            caller.call(failing(400))
+
+    assert caller.breaker.state == 'closed'
+    assert caller.breaker.failures == 0
+
+
+def test_throttling_never_trips_the_breaker(caller):
+    for _ in range(5):
+        with pytest.raises(ProviderError):
+            caller.call(failing(429))
+
+    assert caller.breaker.state == 'closed'
+
+
+def test_half_open_allows_one_trial_then_closes(caller):
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            caller.call(failing(503))
+    expire_cool_down(caller.breaker)
+
+    caller.breaker.allow()  # the trial call
+    assert caller.breaker.state == 'half_open'
+    with pytest.raises(CircuitOpenError):
+        caller.breaker.allow()  # a second call while the trial is in flight
+
+    caller.breaker.record_success()
+    assert caller.breaker.state == 'closed'
+
+
+def test_failed_trial_reopens_the_breaker(caller):
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            caller.call(failing(503))
+    expire_cool_down(caller.breaker)
+
+    with pytest.raises(ProviderError):
+        caller.call(failing(500))
+
+    assert caller.breaker.state == 'open'
+
+
+def test_throttled_trial_keeps_half_open_and_frees_the_slot(caller):
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            caller.call(failing(503))
+    expire_cool_down(caller.breaker)
+
+    with pytest.raises(ProviderError):
+        caller.call(failing(429))
+
+    assert caller.breaker.state == 'half_open'
+    assert caller.call(lambda: 'ok') == 'ok'
+    assert caller.breaker.state == 'closed'
+
+
+def test_cancelled_trial_frees_the_half_open_slot(caller):
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            caller.call(failing(503))
+    expire_cool_down(caller.breaker)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def ok():
+        return 'ok'
+
+    async def scenario():
+        trial = asyncio.create_task(caller.acall(hang))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert caller.breaker.state == 'half_open'
+        return await caller.acall(ok)
+
+    assert asyncio.run(scenario()) == 'ok'
+    assert caller.breaker.state == 'closed'
+
+
+def test_retries_transient_errors_then_succeeds(monkeypatch, caller):
+    monkeypatch.setattr(Config, 'LLM_MAX_RETRIES', 3)
+    monkeypatch.setattr(resilience.time, 'sleep', lambda seconds: None)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError(503)
+        return 'ok'
+
+    assert caller.call(flaky) == 'ok'
+    assert len(attempts) == 3
+    assert caller.breaker.failures == 0
+
+
+def test_retry_budget_floor_and_ratio():
+    budget = RetryBudget(ratio=0.5, min_retries=2)
+
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()  # floor spent, no calls recorded
+
+    for _ in range(10):
+        budget.record_request()
+    spent = sum(budget.try_spend() for _ in range(10))
+    assert spent == 3  # 50% of 10 calls, 2 already used
+
+
+def test_retry_budget_window_expires():
+    budget = RetryBudget(ratio=0.0, min_retries=1, window=0.05)
+
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    time.sleep(0.06)
+    assert budget.try_spend()
+
+
+def test_exhausted_budget_stops_retrying(monkeypatch, caller):
+    monkeypatch.setattr(Config, 'LLM_MAX_RETRIES', 5)
+    monkeypatch.setattr(resilience.time, 'sleep', lambda seconds: None)
+    caller.budget = RetryBudget(ratio=0.0, min_retries=1)
+    attempts = []
+
+    def down():
+        attempts.append(1)
+        raise ProviderError(503)
+
+    with pytest.raises(ProviderError):
+        caller.call(down)
+
+    assert len(attempts) == 2  # first attempt + the one retry the budget allows
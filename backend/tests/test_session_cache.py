@@ -0,0 +1,125 @@
+"""
+SessionCache tests: LRU eviction by the byte budget, sliding idle TTL and
+reloading through get_or_load. The clock is patched so TTLs are exact.
+"""
+
+import pytest
+import services.session_cache as session_cache
+from services.session_cache import SessionCache, estimate_size
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_cache.time, 'monotonic', clock)
+    return clock
+
+
+def history(text: str):
+    return [{'role': 'user', 'content': text}]
+
+
+def cache_for(entries: int, ttl_seconds: int = 60) -> SessionCache:
+    """A cache whose byte budget fits exactly `entries` equally sized histories."""
+    return SessionCache('test', max_bytes=entries * estimate_size(history('x' * 100)), ttl_seconds=ttl_seconds)
+
+
+def test_evicts_least_recently_used_when_over_budget(clock):
+    cache = cache_for(2)
+    cache.set(1, history('a' * 100))
+    cache.set(2, history('b' * 100))
+
+    assert cache.get(1) is not None  # 1 is now the most recently used
+    cache.set(3, history('c' * 100))
+
+    assert 2 not in cache
+    assert 1 in cache and 3 in cache
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+
+
+def test_byte_total_follows_replacements_and_pops(clock):
+    cache = cache_for(4)
+    cache.set(1, history('a' * 100))
+    cache.set(1, history('a' * 10))
+    cache.set(2, history('b' * 100))
+
+    assert cache.stats()['bytes'] == estimate_size(history('a' * 10)) + estimate_size(history('b' * 100))
+
+    cache.pop(1)
+    cache.pop(2)
+    assert cache.stats()['bytes'] == 0
+
+
+def test_entry_larger_than_budget_is_not_cached(clock):
+    cache = cache_for(1)
+    cache.set(1, history('a' * 100))
+
+    cache.set(2, history('b' * 10000))
+
+    assert 2 not in cache
+    assert 1 in cache
+
+
+def test_idle_entries_expire(clock):
+    cache = cache_for(2, ttl_seconds=60)
+    cache.set(1, history('a'))
+
+    clock.now += 61
+
+    assert cache.get(1) is None
+    stats = cache.stats()
+    assert stats['expirations'] == 1
+    assert stats['entries'] == 0 and stats['bytes'] == 0
+
+
+def test_access_slides_the_ttl(clock):
+    cache = cache_for(2, ttl_seconds=60)
+    cache.set(1, history('a'))
+
+    for _ in range(3):
+        clock.now += 45
+        assert cache.get(1) is not None
+
+    clock.now += 61
+    assert 1 not in cache
+
+
+def test_expired_entries_are_purged_on_write(clock):
+    cache = cache_for(3, ttl_seconds=60)
+    cache.set(1, history('a'))
+    cache.set(2, history('b'))
+
+    clock.now += 61
+    cache.set(3, history('c'))
+
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert stats['expirations'] == 2
+    assert stats['evictions'] == 0
+
+
+def test_get_or_load_reloads_after_eviction(clock):
+    cache = cache_for(1)
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return history(str(key) * 100)
+
+    cache.get_or_load(1, loader)
+    cache.get_or_load(1, loader)
+    cache.get_or_load(2, loader)  # evicts 1
+    cache.get_or_load(1, loader)
+
+    assert loads == [1, 2, 1]
+    assert cache.stats()['hits'] == 1
@@ -0,0 +1,18 @@
+"""
+Background job worker for TrueMirror.
+
+With JOB_EXECUTOR=external the web process only enqueues jobs (personalized
+setup, evaluations, overall assessments); run one or more of these workers
+next to it. Set SOCKETIO_MESSAGE_QUEUE (Redis) so the workers' progress and
+completion events reach clients connected to the web process.
+
+Usage:
+    JOB_EXECUTOR=external python worker.py
+"""
+
+from app import app  # noqa: F401 (creates the app and registers job handlers)
+from services.job_queue import job_queue
+
+if __name__ == '__main__':
+    # create_app() already bound the app and Socket.IO server to the queue
+    job_queue.run_worker()
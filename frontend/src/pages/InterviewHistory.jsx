@@ -14,6 +14,8 @@ dayjs.extend(utc)
 dayjs.extend(timezone)
 dayjs.locale('vi')
 
+const ASSESSMENT_POLL_INTERVAL_MS = 2000
+
 const InterviewHistory = () => {
   const navigate = useNavigate()
   const { user } = useAuth()
@@ -57,15 +59,34 @@ const InterviewHistory = () => {
     }
   }
 
-  const handleGenerateAssessment = async () => {
+  // Assessment generation runs as a background job; poll it until it finishes
+  const waitForJob = async (job) => {
+    let state = job
+    while (state.status === 'queued' || state.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, ASSESSMENT_POLL_INTERVAL_MS))
+      const response = await api.get(`/api/interview/jobs/${job.id}`)
+      state = response.data.job
+    }
+    return state
+  }
+
+  // Default: fold in interviews evaluated since the last update; rebuild: regenerate from all of them
+  const handleGenerateAssessment = async (rebuild = false) => {
     try {
       setGeneratingAssessment(true)
       setError('')
-      const response = await api.post('/api/interview/history/generate-assessment')
+      const response = await api.post('/api/interview/history/generate-assessment', { rebuild })
+      const job = await waitForJob(response.data.job)
+
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Assessment job failed')
+      }
 
       // Update with new assessment content
-      if (response.data.assessment) {
-        setAssessment(response.data.assessment.assessment_content)
+      if (job.result?.assessment) {
+        setAssessment(job.result.assessment.assessment_content)
+      } else if (job.result?.message) {
+        setAssessment(job.result.message)
       }
     } catch (error) {
       console.error('[ERROR] Generate assessment failed:', error)
@@ -145,13 +166,22 @@ const InterviewHistory = () => {
             <div className="h-6"></div>
 
             <button
-              onClick={handleGenerateAssessment}
+              onClick={() => handleGenerateAssessment(false)}
               disabled={generatingAssessment || history.length === 0}
               className="btn-primary text-base md:text-lg px-8 py-3"
             >
               {generatingAssessment ? '⏳ Đang tạo đánh giá...' : '🔄 Cập nhật đánh giá'}
             </button>
 
+            {assessment && !generatingAssessment && (
+              <button
+                onClick={() => handleGenerateAssessment(true)}
+                className="mt-3 text-sm text-gray-500 underline hover:text-brand-navy"
+              >
+                Tạo lại từ tất cả các buổi phỏng vấn
+              </button>
+            )}
+
             <div className="h-6"></div>
 
             {/* Assessment Display */}
@@ -73,6 +73,7 @@ const InterviewRoom = () => {
   const messagesEndRef = useRef(null)
   const socketRef = useRef(null)
   const currentAIMessageRef = useRef('')  // Track current AI message being streamed
+  const evaluationRef = useRef('')  // Track final evaluation being streamed
   const textareaRef = useRef(null)
 
   // Get translation text based on session language
@@ -228,32 +229,73 @@ const InterviewRoom = () => {
       navigate('/dashboard')
     })
 
+    // Evaluation job started (again, after a retry) - clear any partially streamed text
+    socket.on('evaluation_started', () => {
+      evaluationRef.current = ''
+      setMessages(prev => prev.map(msg => (
+        msg.isEvaluation ? { ...msg, content: msg.placeholder } : msg
+      )))
+    })
+
+    // Evaluation streaming chunks - fill the evaluation message in place
+    socket.on('evaluation_chunk', (data) => {
+      evaluationRef.current += data.chunk
+      const content = `## 📊 ĐÁNH GIÁ TỔNG KẾT\n\n${evaluationRef.current}`
+
+      setMessages(prev => prev.map(msg => (
+        msg.isEvaluation ? { ...msg, content } : msg
+      )))
+    })
+
     // Session evaluated - for evaluate button (show results)
     socket.on('session_evaluated', (data) => {
       console.log('[WebSocket] Session evaluated')
       setIsEvaluating(false)
       setHasEvaluated(true)
+      evaluationRef.current = ''
 
-      // Add evaluation message
-      if (data.evaluation) {
-        const evaluationContent = `## 📊 ĐÁNH GIÁ TỔNG KẾT\n\n${data.evaluation}\n\n---\n\n✅ **Cảm ơn bạn đã tham gia buổi phỏng vấn!**`
-
-        // Log markdown to terminal for debugging
-        console.log('[EVALUATION MARKDOWN]')
-        console.log('='.repeat(80))
-        console.log(evaluationContent)
-        console.log('='.repeat(80))
-        console.log('[RAW MARKDOWN - Copy this to check structure]')
-        console.log(JSON.stringify(evaluationContent))
-
-        setMessages(prev => [...prev, {
-          role: 'assistant',
-          content: evaluationContent,
-          timestamp: new Date().toISOString()
-        }])
+      // Replace the streamed evaluation with the saved message
+      if (data.message) {
+        setMessages(prev => [
+          ...prev.filter(msg => !msg.isEvaluation),
+          {
+            role: 'assistant',
+            content: data.message.content,
+            timestamp: data.message.timestamp
+          }
+        ])
       }
     })
 
+    // Evaluation failed: nothing was saved, drop the partial evaluation so it can be retried
+    socket.on('evaluation_error', (data) => {
+      console.error('[WebSocket] Evaluation error:', data.message)
+      evaluationRef.current = ''
+      setMessages(prev => prev.filter(msg => !msg.isEvaluation))
+      setError(data.message)
+      setIsEvaluating(false)
+    })
+
+    // AI reply failed (provider down or throttled): nothing was saved, so drop the
+    // partial reply and put the unanswered message back in the input box
+    socket.on('ai_error', (data) => {
+      console.error('[WebSocket] AI error:', data.message)
+      currentAIMessageRef.current = ''
+      setMessages(prev => {
+        const updated = [...prev]
+        if (updated.length && updated[updated.length - 1].role === 'assistant') {
+          updated.pop()
+        }
+        if (updated.length && updated[updated.length - 1].role === 'user') {
+          const unanswered = updated.pop()
+          setInputValue(unanswered.content)
+        }
+        return updated
+      })
+      setError(data.message)
+      setIsLoading(false)
+    })
+
     // Error handling
     socket.on('error', (data) => {
       console.error('[WebSocket] Error:', data.message)
@@ -344,12 +386,15 @@ const InterviewRoom = () => {
       return
     }
 
-    // Show evaluation loading message
+    // Show evaluation loading message (replaced by streamed chunks as they arrive)
     setIsEvaluating(true)
+    evaluationRef.current = ''
     setMessages(prev => [...prev, {
       role: 'assistant',
       content: t('evaluating'),
-      timestamp: new Date().toISOString()
+      placeholder: t('evaluating'),
+      timestamp: new Date().toISOString(),
+      isEvaluation: true
     }])
 
     // Send evaluate event via WebSocket
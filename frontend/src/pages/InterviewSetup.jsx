@@ -1,10 +1,24 @@
 import React, { useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { useAuth } from '../contexts/AuthContext'
+import { io } from 'socket.io-client'
 import api from '../utils/api'
 import FileUploader from '../components/FileUploader'
 import './InterviewSetup.css'
 
+// Progress labels for the personalized setup job stages
+const SETUP_STAGE_LABELS = {
+  queued: 'Đang chờ xử lý...',
+  processed: 'Đang đọc nội dung files...',
+  extracted: 'AI đang phân tích hồ sơ...',
+  analyzed: 'AI đang tạo bộ câu hỏi...',
+  session_ready: 'Đã sẵn sàng phần 1, đang mở phòng phỏng vấn...',
+  questions_ready: 'Đang tạo phiên phỏng vấn...',
+  completed: 'Hoàn tất!'
+}
+
+const SETUP_POLL_INTERVAL_MS = 3000
+
 const InterviewSetup = () => {
   const navigate = useNavigate()
   const { token } = useAuth()
@@ -79,6 +93,55 @@ const InterviewSetup = () => {
     return Object.keys(newErrors).length === 0
   }
 
+  // Follow a personalized setup job: Socket.IO progress events, with polling as a fallback
+  const waitForSetupJob = (job) => new Promise((resolve, reject) => {
+    const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000'
+    const socket = io(API_URL, {
+      transports: ['websocket', 'polling'],
+      auth: { token }
+    })
+
+    let settled = false
+    let pollTimer = null
+
+    const finish = (callback, value) => {
+      if (settled) return
+      settled = true
+      clearInterval(pollTimer)
+      socket.disconnect()
+      callback(value)
+    }
+
+    const handleJobState = (state) => {
+      if (SETUP_STAGE_LABELS[state.stage]) {
+        setProcessingStage(SETUP_STAGE_LABELS[state.stage])
+      }
+
+      // The session opens once section 1 exists; later sections keep generating server-side
+      if (state.status === 'succeeded' || (state.status === 'running' && state.result?.session_id)) {
+        finish(resolve, state.result)
+      } else if (state.status === 'failed') {
+        const jobError = new Error(state.error || 'Không thể tạo phiên phỏng vấn')
+        jobError.isJobError = true
+        finish(reject, jobError)
+      }
+    }
+
+    socket.on('connect', () => {
+      socket.emit('watch_job', { job_id: job.id, token })
+    })
+    socket.on('setup_progress', handleJobState)
+
+    pollTimer = setInterval(async () => {
+      try {
+        const res = await api.get(`/api/interview/jobs/${job.id}`)
+        handleJobState(res.data.job)
+      } catch (err) {
+        console.warn('[WARN] Poll setup job failed:', err)
+      }
+    }, SETUP_POLL_INTERVAL_MS)
+  })
+
   const handleSubmit = async (e) => {
     e.preventDefault()
 
@@ -88,12 +151,13 @@ const InterviewSetup = () => {
     setServerError('')
 
     try {
-      let response
+      let sessionId
 
       if (mode === 'standard') {
         // Standard mode: POST JSON
-        response = await api.post('/api/interview/setup', formData)
+        const response = await api.post('/api/interview/setup', formData)
         console.log('[INFO] Interview session created:', response.data.session)
+        sessionId = response.data.session.id
       } else {
         // Personalized mode: POST multipart/form-data
         setAiProcessing(true)
@@ -111,24 +175,31 @@ const InterviewSetup = () => {
         formDataMultipart.append('language', formData.language)
 
         try {
-          response = await api.post('/api/interview/setup/personalized', formDataMultipart, {
+          // Server validates files and returns 202 with a background job
+          const response = await api.post('/api/interview/setup/personalized', formDataMultipart, {
             headers: {
               'Content-Type': 'multipart/form-data'
             }
           })
 
-          console.log('[INFO] Personalized interview session created:', response.data.session)
+          setProcessingStage(SETUP_STAGE_LABELS[response.data.job.stage] || SETUP_STAGE_LABELS.queued)
+          const result = await waitForSetupJob(response.data.job)
+
+          console.log('[INFO] Personalized interview session created:', result.session)
+          sessionId = result.session_id
         } finally {
           setAiProcessing(false)
         }
       }
 
       // Navigate to interview room with session ID
-      navigate(`/interview/${response.data.session.id}`)
+      navigate(`/interview/${sessionId}`)
 
     } catch (error) {
       setAiProcessing(false)
-      if (error.response?.data?.error) {
+      if (error.isJobError) {
+        setServerError(error.message)
+      } else if (error.response?.data?.error) {
         setServerError(error.response.data.error)
       } else {
         setServerError('Đã xảy ra lỗi. Vui lòng thử lại sau.')